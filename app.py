@@ -1,25 +1,179 @@
-from dotenv import load_dotenv
-
-# Muat variabel dari file .env
-load_dotenv()
-
 import json
 import os
+from dataclasses import asdict
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import streamlit as st
+from dotenv import load_dotenv
 
-from src.ai_service import (
-    generate_cover_letter,
+# Muat variabel dari file .env sebelum modul src (ai_service membaca GEMINI_API_KEY saat diimpor)
+load_dotenv()
+
+from src.ai_service import (  # noqa: E402
     generate_cv_suggestions,
-    generate_follow_up_email,
-    generate_thank_you_email,
+    response_cache,
+)
+from src.attachments import (  # noqa: E402
+    Attachment,
+    AttachmentSource,
+    letter_attachment,
+)
+from src.bulk_email import (  # noqa: E402
+    BulkEmail,
+    DeliveryReport,
+    DeliveryResult,
+    bulk_emails_from_batch,
+    send_bulk,
+)
+from src.cv_cache import get_cv_cache  # noqa: E402
+from src.email_outbox import (  # noqa: E402
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    STATUS_SENDING,
+    STATUS_SENT,
+    EmailOutbox,
+    get_outbox,
+)
+from src.email_sender import (  # noqa: E402
+    build_message,
+    send_email_with_attachments,
+    smtp_settings_from_env,
 )
-from src.cv_parser import extract_text_from_pdf
-from src.email_sender import send_email_with_attachments
-from src.history_manager import init_db, load_history, save_application
-from src.job_parser import scrape_job_description
+from src.generation_jobs import (  # noqa: E402
+    JOB_COVER_LETTER,
+    JOB_FOLLOW_UP_EMAIL,
+    JOB_THANK_YOU_EMAIL,
+    cancel_job,
+    get_generation_queue,
+    submit_cover_letter_job,
+)
+from src.history_manager import (  # noqa: E402
+    HISTORY_PAGE_SIZE,
+    HistoryPage,
+    init_db,
+    query_history,
+)
+from src.job_queue import (  # noqa: E402
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    Job,
+    JobQueue,
+)
+from src.match_scorer import MatchResult  # noqa: E402
+from src.session_files import session_store  # noqa: E402
+
+# Selang waktu (detik) UI memeriksa status pekerjaan yang sedang berjalan
+JOB_POLL_INTERVAL_S: float = 1.0
+JOB_LABELS: Dict[str, str] = {
+    JOB_COVER_LETTER: "Surat Lamaran",
+    JOB_THANK_YOU_EMAIL: "Email Ucapan Terima Kasih",
+    JOB_FOLLOW_UP_EMAIL: "Email Tindak Lanjut",
+}
+
+
+def _job_owner() -> str:
+    # Pekerjaan hanya terlihat oleh sesi yang membuatnya. Token ini tidak pernah ditaruh di URL
+    owner: Optional[str] = st.session_state.get("job_owner")
+    if not owner:
+        owner = session_store(st.session_state).id
+    st.session_state["job_owner"] = owner
+    return owner
+
+
+def _track_job(job_id: int) -> None:
+    # URL hanya membawa id pekerjaan dan token resume sekali pakai, jadi hasilnya tetap bisa
+    # diambil setelah browser di-refresh tanpa membocorkan token sesi pemilik
+    st.session_state["active_job_id"] = job_id
+    st.query_params["job"] = str(job_id)
+    token = get_generation_queue().issue_resume_token(job_id, _job_owner())
+    if token:
+        st.query_params["resume"] = token
+    elif "resume" in st.query_params:
+        del st.query_params["resume"]
+
+
+def _active_job_id() -> Optional[int]:
+    job_id = st.session_state.get("active_job_id")
+    if job_id is not None:
+        return job_id
+    if "job" not in st.query_params:
+        return None
+    try:
+        job_id = int(st.query_params["job"])
+    except ValueError:
+        job_id = None
+    token = st.query_params.get("resume")
+    if job_id is None or not token or not get_generation_queue().resume(job_id, token, _job_owner()):
+        _forget_job()
+        return None
+    _track_job(job_id)
+    return job_id
+
+
+def _forget_job() -> None:
+    job_id = st.session_state.pop("active_job_id", None)
+    if job_id is not None:
+        get_generation_queue().revoke_resume_token(job_id, _job_owner())
+    for param in ("job", "resume"):
+        if param in st.query_params:
+            del st.query_params[param]
+
+
+def _apply_job_result(job: Job) -> None:
+    _forget_job()
+    label = JOB_LABELS.get(job.kind, job.kind)
+    if job.status == JOB_CANCELLED:
+        st.info(f"Pembuatan {label} dibatalkan.")
+        return
+    if job.status == JOB_FAILED or job.result is None:
+        st.error(f"Gagal membuat {label}: {job.error}")
+        return
+
+    result: Dict[str, Any] = job.result
+    st.session_state["output_type_display"] = label
+    st.session_state["email_subject"] = result["email_subject"]
+    if job.kind != JOB_COVER_LETTER:
+        st.session_state["generated_output"] = result["text"]
+        return
+
+    for warning in result.get("warnings") or []:
+        st.warning(warning)
+    st.session_state["generated_output"] = result["cover_letter"]
+    st.session_state["match_score"] = result["match_score"]
+    st.session_state["match_keywords"] = (
+        MatchResult(result["match_score"], result["matched_keywords"], result["missing_keywords"])
+        if result.get("matched_keywords") is not None
+        else None
+    )
+    st.session_state["saved_application_id"] = result["application_id"]
+    st.session_state["saved_file_path"] = result["file_path"]
+    st.session_state["current_posisi"] = result["posisi"]
+    st.session_state["current_perusahaan"] = result["perusahaan"]
+    st.session_state["current_cv_text"] = result["cv_text"]
+    st.session_state["current_job_desc_text"] = result["job_desc_text"]
+    st.session_state["cv_suggestions"] = result["cv_suggestions"]
+
+
+@st.experimental_fragment(run_every=JOB_POLL_INTERVAL_S)
+def _job_progress(job_id: int) -> None:
+    # Hanya bagian ini yang dijalankan ulang saat polling; seluruh skrip dirender ulang setelah pekerjaan selesai
+    queue: JobQueue = get_generation_queue()
+    job: Optional[Job] = queue.get(job_id, _job_owner())
+    if job is None or job.finished:
+        st.rerun()
+        return
+    label = JOB_LABELS.get(job.kind, job.kind)
+    if job.status == JOB_QUEUED:
+        st.progress(0.0, text=f"{label} #{job.id} menunggu giliran...")
+        if st.button("Batalkan", key=f"cancel_job_{job.id}") and cancel_job(queue, job.id, _job_owner()):
+            st.rerun()
+    else:
+        st.progress(job.progress, text=f"{label} #{job.id}: {job.message or 'Memproses...'}")
+    if job.partial:
+        st.text(job.partial)
 
 
 def main_gui() -> None:
@@ -45,19 +199,80 @@ def main_gui() -> None:
     st.sidebar.header("Data Pelamar (dari config.json)")
     st.sidebar.json(config)  # Tampilkan data config di sidebar
 
-    # Tampilkan riwayat lamaran di sidebar
+    # Tampilkan riwayat lamaran di sidebar: hanya halaman terbaru yang dimuat, sisanya sesuai permintaan
     st.sidebar.header("Riwayat Lamaran")
-    history: List[Dict[str, Any]] = load_history()
-    if history:
-        for entry in history:
+    history_search: str = st.sidebar.text_input(
+        "Cari perusahaan atau posisi", key="history_search"
+    )
+    if st.session_state.get("history_search_applied") != history_search:
+        st.session_state["history_search_applied"] = history_search
+        st.session_state["history_pages"] = 1
+    history_pages: int = st.session_state.setdefault("history_pages", 1)
+    history: HistoryPage = query_history(
+        search=history_search or None, limit=HISTORY_PAGE_SIZE * history_pages
+    )
+    if history.entries:
+        for entry in history.entries:
             st.sidebar.write(
                 f"- {entry['company']} ({entry['position']}) - {entry['timestamp'][:10]}"
             )
+        if history.has_more and st.sidebar.button("Muat lebih banyak", key="history_more"):
+            st.session_state["history_pages"] = history_pages + 1
+            st.rerun()
+    elif history_search:
+        st.sidebar.info("Tidak ada riwayat yang cocok.")
     else:
         st.sidebar.info("Belum ada riwayat lamaran.")
 
+    cache_stats: Dict[str, Any] = response_cache.stats()
+    st.sidebar.caption(
+        f"Cache AI: {cache_stats['hits']} hit / {cache_stats['misses']} miss"
+    )
+    cv_cache_stats: Dict[str, Any] = get_cv_cache().stats()
+    st.sidebar.caption(
+        f"Cache CV: {cv_cache_stats['memory_hits'] + cv_cache_stats['disk_hits']} hit / "
+        f"{cv_cache_stats['misses']} miss"
+    )
+
+    # Status antrean email; worker dijalankan lagi bila masih ada email tertunda (mis. setelah restart)
+    outbox: EmailOutbox = get_outbox(config.get("email"))
+    outbox_counts: Dict[str, int] = outbox.counts()
+    if outbox_counts:
+        st.sidebar.header("Status Email")
+        if outbox_counts.get(STATUS_QUEUED) and (
+            outbox.settings.password or outbox.settings.security == "none"
+        ):
+            outbox.start()
+        st.sidebar.caption(
+            f"Antre: {outbox_counts.get(STATUS_QUEUED, 0) + outbox_counts.get(STATUS_SENDING, 0)} / "
+            f"Terkirim: {outbox_counts.get(STATUS_SENT, 0)} / Gagal: {outbox_counts.get(STATUS_FAILED, 0)}"
+        )
+        for message in outbox.recent(5):
+            st.sidebar.write(f"- #{message.id} {message.to_email}: {message.status}")
+            if message.status == STATUS_FAILED and message.last_error:
+                st.sidebar.caption(message.last_error)
+        if st.sidebar.button("Perbarui status email", key="refresh_outbox"):
+            st.rerun()
+
+    # Status antrean pekerjaan; worker dijalankan lagi setelah restart sehingga pekerjaan tertunda dilanjutkan
+    job_queue: JobQueue = get_generation_queue()
+    job_counts: Dict[str, int] = job_queue.counts(_job_owner())
+    if job_counts:
+        st.sidebar.header("Status Pekerjaan")
+        st.sidebar.caption(
+            f"Antre: {job_counts.get(JOB_QUEUED, 0)} / Berjalan: {job_counts.get(JOB_RUNNING, 0)} / "
+            f"Gagal: {job_counts.get(JOB_FAILED, 0)}"
+        )
+        for job in job_queue.recent(5, _job_owner()):
+            st.sidebar.write(f"- #{job.id} {JOB_LABELS.get(job.kind, job.kind)}: {job.status}")
+            if job.status == JOB_FAILED and job.error:
+                st.sidebar.caption(job.error)
+            if job.finished and job.result and st.sidebar.button("Tampilkan", key=f"show_job_{job.id}"):
+                _track_job(job.id)
+                st.rerun()
+
     # Tabs untuk navigasi
-    tab1, tab2 = st.tabs(["Buat Output", "Edit Data Pelamar"])
+    tab1, tab2, tab3 = st.tabs(["Buat Output", "Edit Data Pelamar", "Kirim Massal"])
 
     with tab1:
         st.header("Pilih Jenis Output")
@@ -67,6 +282,7 @@ def main_gui() -> None:
             key="output_type_selector",
         )
 
+        uploaded_cv = None
         if output_type == "Surat Lamaran":
             uploaded_cv = st.file_uploader(
                 "Unggah CV Anda (PDF)", type="pdf"
@@ -91,11 +307,21 @@ def main_gui() -> None:
                     placeholder="Contoh: https://example.com/job",
                     key="job_url_cl",
                 )
+                job_desc_manual: str = st.text_area(
+                    "Deskripsi Pekerjaan (Opsional, dipakai bila URL kosong atau gagal dianalisis)",
+                    height=150,
+                    key="job_desc_cl",
+                )
                 writing_style: str = st.selectbox(
                     "Pilih Gaya Penulisan",
                     ["Formal", "Kreatif", "Percaya Diri"],
                     key="style_cl",
                 )
+                bundle_mode: bool = st.checkbox(
+                    "Mode gabungan: surat, skor, dan saran CV dalam satu panggilan AI",
+                    value=True,
+                    key="bundle_mode_cl",
+                )
 
                 submitted: bool = st.form_submit_button("Buat Surat Lamaran")
 
@@ -105,81 +331,25 @@ def main_gui() -> None:
                     elif not uploaded_cv:
                         st.error("Silakan unggah CV Anda.")
                     else:
-                        st.info(
-                            "Membuat surat lamaran dengan AI... (ini mungkin butuh beberapa detik)"
-                        )
-
-                        # Save the uploaded CV to a temporary file
-                        with open("temp_cv.pdf", "wb") as f:
-                            f.write(uploaded_cv.getbuffer())
-
-                        cv_text: Optional[str] = extract_text_from_pdf("temp_cv.pdf")
-                        if not cv_text:
-                            st.warning(
-                                "Gagal mengekstrak teks dari CV. Surat lamaran mungkin kurang detail."
-                            )
-
-                        job_desc_text: Optional[str] = None
-                        if job_url:
-                            st.info(
-                                f"Menganalisis deskripsi pekerjaan dari URL: {job_url}"
-                            )
-                            try:
-                                job_desc_text = scrape_job_description(job_url)
-                                if not job_desc_text or len(job_desc_text.strip()) < 50:
-                                    st.warning(
-                                        "Gagal menganalisis deskripsi pekerjaan dari URL atau teks terlalu pendek. Silakan masukkan secara manual di bawah."
-                                    )
-                                    job_desc_text = st.text_area(
-                                        "Masukkan Deskripsi Pekerjaan Secara Manual:",
-                                        height=200,
-                                        key="manual_job_desc_cl",
-                                    )
-                            except Exception as e:
-                                st.error(
-                                    f"Terjadi kesalahan saat scraping URL: {e}. Silakan masukkan deskripsi pekerjaan secara manual."
-                                )
-                                job_desc_text = st.text_area(
-                                    "Masukkan Deskripsi Pekerjaan Secara Manual:",
-                                    height=200,
-                                    key="manual_job_desc_cl_error",
-                                )
-                        else:
-                            job_desc_text = st.text_area(
-                                "Masukkan Deskripsi Pekerjaan Secara Manual (Opsional):",
-                                height=200,
-                                key="manual_job_desc_cl_no_url",
-                            )
-
-                        if not job_desc_text or len(job_desc_text.strip()) < 50:
-                            st.warning(
-                                "Deskripsi pekerjaan kosong atau terlalu pendek. AI mungkin tidak dapat memberikan hasil yang optimal."
-                            )
-
-                        surat_lamaran_data: Dict[str, Any] = generate_cover_letter(
+                        # Parsing CV, scraping, dan pemanggilan AI dijalankan worker latar belakang;
+                        # UI hanya memantau status pekerjaan sehingga tidak tertahan oleh latensi model
+                        job_id: Optional[int] = submit_cover_letter_job(
                             config,
                             posisi,
                             perusahaan,
                             sumber_lowongan,
-                            cv_text,
-                            job_desc_text,
-                            writing_style,
-                        )
-
-                        st.session_state["generated_output"] = surat_lamaran_data.get(
-                            "cover_letter", "Gagal membuat surat lamaran."
-                        )
-                        st.session_state["match_score"] = surat_lamaran_data.get(
-                            "match_score", 0
-                        )
-                        st.session_state["output_type_display"] = "Surat Lamaran"
-                        st.session_state["current_posisi"] = posisi
-                        st.session_state["current_perusahaan"] = perusahaan
-                        st.session_state["current_cv_text"] = cv_text
-                        st.session_state["current_job_desc_text"] = job_desc_text
-                        st.session_state["email_subject"] = (
-                            f"Lamaran Kerja - {posisi} - {config['nama']}"
+                            uploaded_cv.getvalue(),
+                            cv_name=uploaded_cv.name,
+                            job_url=job_url,
+                            job_desc=job_desc_manual,
+                            writing_style=writing_style,
+                            bundle_mode=bundle_mode,
+                            owner=_job_owner(),
                         )
+                        if job_id is None:
+                            st.error("Gagal memasukkan permintaan ke antrean.")
+                        else:
+                            _track_job(job_id)
 
         elif output_type == "Email Ucapan Terima Kasih":
             with st.form("thank_you_email_form"):
@@ -199,22 +369,22 @@ def main_gui() -> None:
                     if not posisi_email or not perusahaan_email:
                         st.error("Posisi dan Perusahaan wajib diisi.")
                     else:
-                        st.info("Membuat email ucapan terima kasih...")
-                        generated_email: str = generate_thank_you_email(
-                            config,
-                            posisi_email,
-                            perusahaan_email,
-                            tanggal_wawancara.strftime("%d %B %Y")
-                            if tanggal_wawancara
-                            else None,
-                        )
-                        st.session_state["generated_output"] = generated_email
-                        st.session_state["output_type_display"] = (
-                            "Email Ucapan Terima Kasih"
-                        )
-                        st.session_state["email_subject"] = (
-                            f"Terima Kasih - {posisi_email} - {config['nama']}"
+                        job_id = get_generation_queue().submit(
+                            JOB_THANK_YOU_EMAIL,
+                            {
+                                "config": config,
+                                "posisi": posisi_email,
+                                "perusahaan": perusahaan_email,
+                                "tanggal_wawancara": tanggal_wawancara.strftime("%d %B %Y")
+                                if tanggal_wawancara
+                                else None,
+                            },
+                            owner=_job_owner(),
                         )
+                        if job_id is None:
+                            st.error("Gagal memasukkan permintaan ke antrean.")
+                        else:
+                            _track_job(job_id)
 
         elif output_type == "Email Tindak Lanjut":
             with st.form("follow_up_email_form"):
@@ -230,20 +400,33 @@ def main_gui() -> None:
                     if not posisi_email or not perusahaan_email:
                         st.error("Posisi dan Perusahaan wajib diisi.")
                     else:
-                        st.info("Membuat email tindak lanjut...")
-                        generated_email = generate_follow_up_email(
-                            config,
-                            posisi_email,
-                            perusahaan_email,
-                            tanggal_lamar.strftime("%d %B %Y")
-                            if tanggal_lamar
-                            else None,
-                        )
-                        st.session_state["generated_output"] = generated_email
-                        st.session_state["output_type_display"] = "Email Tindak Lanjut"
-                        st.session_state["email_subject"] = (
-                            f"Tindak Lanjut Lamaran - {posisi_email} - {config['nama']}"
+                        job_id = get_generation_queue().submit(
+                            JOB_FOLLOW_UP_EMAIL,
+                            {
+                                "config": config,
+                                "posisi": posisi_email,
+                                "perusahaan": perusahaan_email,
+                                "tanggal_lamar": tanggal_lamar.strftime("%d %B %Y")
+                                if tanggal_lamar
+                                else None,
+                            },
+                            owner=_job_owner(),
                         )
+                        if job_id is None:
+                            st.error("Gagal memasukkan permintaan ke antrean.")
+                        else:
+                            _track_job(job_id)
+
+        # Pekerjaan yang sedang berjalan dipantau di sini; hasilnya dimuat ke tampilan output setelah selesai
+        active_job_id: Optional[int] = _active_job_id()
+        if active_job_id is not None:
+            active_job: Optional[Job] = get_generation_queue().get(active_job_id, _job_owner())
+            if active_job is None:
+                _forget_job()
+            elif active_job.finished:
+                _apply_job_result(active_job)
+            else:
+                _job_progress(active_job_id)
 
         # Bagian tampilan output (di luar form, tapi di dalam tab1)
         if (
@@ -260,9 +443,23 @@ def main_gui() -> None:
                     value=f"{st.session_state['match_score']}%",
                     delta_color="normal",
                 )
+                match_keywords: Optional[MatchResult] = st.session_state.get(
+                    "match_keywords"
+                )
+                if match_keywords:
+                    if match_keywords.matched_keywords:
+                        st.caption(
+                            "Kata kunci yang cocok: "
+                            + ", ".join(match_keywords.matched_keywords)
+                        )
+                    if match_keywords.missing_keywords:
+                        st.caption(
+                            "Kata kunci yang belum ada di CV: "
+                            + ", ".join(match_keywords.missing_keywords)
+                        )
 
                 st.subheader("Saran Perbaikan CV")
-                if st.button(
+                if not st.session_state.get("cv_suggestions") and st.button(
                     "Dapatkan Saran Perbaikan CV", key="get_cv_suggestions_button"
                 ):
                     if st.session_state.get("current_cv_text") and st.session_state.get(
@@ -289,23 +486,12 @@ def main_gui() -> None:
                     with st.expander("Lihat Saran Perbaikan CV untuk Posisi Ini"):
                         st.markdown(st.session_state["cv_suggestions"])
 
-            # Simpan output ke file (hanya untuk Surat Lamaran) dan tambahkan ke riwayat
+            # Surat lamaran sudah disimpan ke store beralamat konten dan riwayat oleh worker, sekali per generasi
             if st.session_state["output_type_display"] == "Surat Lamaran":
-                output_dir: str = os.path.join(os.path.dirname(__file__), "output")
-                os.makedirs(output_dir, exist_ok=True)
-                nama_file_output: str = f"surat_lamaran_{st.session_state['current_perusahaan'].replace(' ', '_')}_{st.session_state['current_posisi'].replace(' ', '_')}.txt"
-                full_file_path: str = os.path.join(output_dir, nama_file_output)
-                try:
-                    with open(full_file_path, "w") as f:
-                        f.write(st.session_state["generated_output"])
-                    st.success(f"Output berhasil disimpan di: {full_file_path}")
-                    save_application(
-                        st.session_state["current_perusahaan"],
-                        st.session_state["current_posisi"],
-                        full_file_path,
-                    )  # Simpan ke DB
-                except Exception as e:
-                    st.error(f"Gagal menyimpan output: {e}")
+                if st.session_state.get("saved_application_id") is not None:
+                    st.success(f"Output berhasil disimpan di: {st.session_state.get('saved_file_path')}")
+                else:
+                    st.error("Gagal menyimpan output ke riwayat.")
 
             # Opsi kirim email
             st.subheader("Kirim Output via Email")
@@ -318,22 +504,52 @@ def main_gui() -> None:
                         "email_subject", "Tanpa Subjek"
                     )
                     body_to_send: str = st.session_state["generated_output"]
-                    attachments_to_send: List[str] = []
+                    attachments_to_send: List[AttachmentSource] = []
 
                     if st.session_state["output_type_display"] == "Surat Lamaran":
+                        # Surat dilampirkan sebagai PDF (dirender sekali per isi surat) dan CV langsung dari memori
                         attachments_to_send.append(
-                            full_file_path
-                        )  # Lampirkan surat lamaran yang baru disimpan
+                            letter_attachment(
+                                st.session_state["current_perusahaan"],
+                                st.session_state["current_posisi"],
+                                body_to_send,
+                            )
+                        )
                         if uploaded_cv:
-                            attachments_to_send.append("temp_cv.pdf")
-
-                    send_email_with_attachments(
-                        subject_to_send,
-                        body_to_send,
-                        email_tujuan,
-                        config["email"],
-                        attachments_to_send,
-                    )
+                            attachments_to_send.append(
+                                Attachment(uploaded_cv.name, uploaded_cv.getvalue())
+                            )
+
+                    outbox = get_outbox(config["email"])
+                    if outbox.settings.password or outbox.settings.security == "none":
+                        # Email diantrekan dan dikirim worker latar belakang lewat koneksi SMTP yang dipakai ulang
+                        message_id: Optional[int] = outbox.enqueue(
+                            build_message(
+                                subject_to_send,
+                                body_to_send,
+                                email_tujuan,
+                                config["email"],
+                                attachments_to_send,
+                            ),
+                            application_id=st.session_state.get("saved_application_id")
+                            if st.session_state["output_type_display"] == "Surat Lamaran"
+                            else None,
+                        )
+                        if message_id is not None:
+                            outbox.start()
+                            st.success(
+                                f"Email #{message_id} masuk antrean pengiriman. Lihat statusnya di sidebar."
+                            )
+                        else:
+                            st.error("Gagal memasukkan email ke antrean.")
+                    else:
+                        send_email_with_attachments(
+                            subject_to_send,
+                            body_to_send,
+                            email_tujuan,
+                            config["email"],
+                            attachments_to_send,
+                        )
                 else:
                     st.warning("Alamat email tujuan tidak boleh kosong.")
 
@@ -402,6 +618,74 @@ def main_gui() -> None:
             st.session_state["config_updated"] = False
             st.experimental_rerun()  # Memaksa Streamlit untuk me-rerun seluruh skrip
 
+    with tab3:
+        st.header("Kirim Massal")
+        st.write(
+            "Kirim banyak surat lamaran hasil `batch.py` sekaligus. "
+            "Setiap baris JSONL harus memiliki kolom `email_tujuan`."
+        )
+        batch_file = st.file_uploader(
+            "Unggah hasil batch (JSONL)", type=["jsonl"], key="bulk_batch_file"
+        )
+        bulk_cv = st.file_uploader(
+            "Lampirkan CV (PDF, opsional)", type="pdf", key="bulk_cv_file"
+        )
+        col_connections, col_rate = st.columns(2)
+        max_connections: int = col_connections.number_input(
+            "Koneksi SMTP paralel", min_value=1, max_value=4, value=2, key="bulk_connections"
+        )
+        rate_per_minute: int = col_rate.number_input(
+            "Maksimum email per menit", min_value=1, max_value=120, value=20, key="bulk_rate"
+        )
+
+        if batch_file and st.button("Kirim Semua", key="bulk_send_button"):
+            store = session_store(st.session_state)
+            # CV yang sama di-encode sekali dan bagian MIME-nya dipakai ulang untuk setiap email
+            bulk_attachments: List[AttachmentSource] = (
+                [Attachment(bulk_cv.name, bulk_cv.getvalue())] if bulk_cv else []
+            )
+            # Surat dicatat ke riwayat (sekali per surat) agar statusnya menjadi "sent" setelah terkirim
+            bulk_emails: List[BulkEmail] = bulk_emails_from_batch(
+                store.path_for(batch_file.name, batch_file.getvalue()),
+                config,
+                bulk_attachments,
+                record_history=True,
+            )
+            smtp_settings = smtp_settings_from_env(config["email"])
+            if not bulk_emails:
+                st.warning("Tidak ada surat yang siap dikirim di file ini.")
+            elif not smtp_settings.password and smtp_settings.security != "none":
+                st.error("EMAIL_PASSWORD belum diatur di file .env.")
+            else:
+                bulk_progress = st.progress(0.0)
+
+                def show_delivery(done: int, total: int, result: DeliveryResult) -> None:
+                    bulk_progress.progress(
+                        done / total, text=f"{done}/{total} - {result.to_email}: {result.status}"
+                    )
+
+                st.session_state["bulk_report"] = send_bulk(
+                    bulk_emails,
+                    config["email"],
+                    smtp_settings,
+                    max_connections=int(max_connections),
+                    rate_per_minute=float(rate_per_minute),
+                    on_progress=show_delivery,
+                )
+
+        bulk_report: Optional[DeliveryReport] = st.session_state.get("bulk_report")
+        if bulk_report:
+            st.subheader("Laporan Pengiriman")
+            st.text(bulk_report.summary())
+            st.dataframe([asdict(result) for result in bulk_report.results])
+            st.download_button(
+                "Unduh laporan (CSV)",
+                bulk_report.to_csv(),
+                file_name="laporan_kirim_massal.csv",
+                mime="text/csv",
+                key="bulk_report_download",
+            )
+
 
 if __name__ == "__main__":
     main_gui()
@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Muat variabel dari file .env
+load_dotenv()
+
+from src.batch_generator import generate_batch, load_batch_items  # noqa: E402
+from src.cv_cache import load_cv_text  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Buat surat lamaran untuk banyak lowongan sekaligus."
+    )
+    parser.add_argument(
+        "input",
+        help="File CSV/JSONL berisi kolom posisi, perusahaan, sumber_lowongan, job_url/job_desc",
+    )
+    parser.add_argument("--cv", required=True, help="Path ke CV (PDF)")
+    parser.add_argument(
+        "--output",
+        default=os.path.join("output", "batch_surat_lamaran.jsonl"),
+        help="File JSONL tujuan hasil (ditulis per item saat selesai)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Jumlah pemanggilan AI paralel"
+    )
+    parser.add_argument("--style", default="Formal", help="Gaya penulisan surat")
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"),
+        help="Path ke config.json",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    try:
+        with open(args.config, "r") as f:
+            config: Dict[str, Any] = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: gagal memuat config.json ({e}).")
+        return 1
+
+    items = load_batch_items(args.input)
+    if not items:
+        print("Tidak ada lowongan valid di file input.")
+        return 1
+
+    # CV diparse sekali dan dipakai bersama oleh seluruh item
+    cv_text: Optional[str] = load_cv_text(args.cv)
+    if not cv_text:
+        print("Peringatan: gagal mengekstrak teks dari CV. Surat lamaran mungkin kurang detail.")
+
+    print(f"Memproses {len(items)} lowongan dengan konkurensi {args.concurrency}...")
+    report = generate_batch(
+        config,
+        items,
+        cv_text,
+        args.output,
+        max_workers=args.concurrency,
+        writing_style=args.style,
+    )
+    print(report.summary())
+    print(f"Hasil disimpan di: {args.output}")
+    return 0 if report.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
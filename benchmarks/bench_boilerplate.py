@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from src.prompt_budget import estimate_tokens  # noqa: E402
+from src.text_cleaner import strip_boilerplate  # noqa: E402
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "fixtures", "job_pages"
+)
+
+
+def body_text(html: str) -> str:
+    # Perilaku lama: seluruh teks body, termasuk navigasi, banner cookie, dan footer
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.body.get_text(separator=" ", strip=True) if soup.body else ""
+
+
+def _time_generation(config: Dict, description: str) -> float:
+    from src.ai_service import generate_cover_letter
+
+    started = time.perf_counter()
+    generate_cover_letter(
+        config,
+        config.get("posisi", "Posisi"),
+        config.get("perusahaan", "Perusahaan"),
+        "Benchmark",
+        None,
+        description,
+    )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Ukur pengurangan token prompt setelah boilerplate halaman lowongan dibuang."
+    )
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Folder berisi halaman HTML dan expected.json")
+    parser.add_argument("--live", action="store_true", help="Ukur juga latensi Gemini (butuh GEMINI_API_KEY)")
+    parser.add_argument("--config", default="config.json", help="Data pelamar untuk mode --live")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.fixtures, "expected.json"), "r", encoding="utf-8") as f:
+        names: List[str] = sorted(json.load(f))
+
+    config: Optional[Dict] = None
+    if args.live:
+        # Cache respons dimatikan agar setiap panggilan benar-benar sampai ke API
+        os.environ["GEMINI_CACHE_DISABLED"] = "true"
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+    header = f"{'halaman':<20} {'token lama':>10} {'token baru':>10} {'hemat':>6} {'bersih ms':>9}"
+    if config is not None:
+        header += f" {'latensi lama':>12} {'latensi baru':>12}"
+    print(header)
+
+    savings: List[float] = []
+    for name in names:
+        with open(os.path.join(args.fixtures, name), "r", encoding="utf-8") as f:
+            html = f.read()
+        legacy = body_text(html)
+        started = time.perf_counter()
+        cleaned = strip_boilerplate(html)
+        clean_ms = (time.perf_counter() - started) * 1000
+
+        legacy_tokens = estimate_tokens(legacy)
+        cleaned_tokens = estimate_tokens(cleaned)
+        saved = 1 - cleaned_tokens / legacy_tokens if legacy_tokens else 0.0
+        savings.append(saved)
+        line = f"{name:<20} {legacy_tokens:>10} {cleaned_tokens:>10} {saved:>6.0%} {clean_ms:>9.2f}"
+        if config is not None:
+            line += f" {_time_generation(config, legacy):>11.2f}s {_time_generation(config, cleaned):>11.2f}s"
+        print(line)
+
+    print(f"Rata-rata token prompt yang dihemat per lowongan: {statistics.mean(savings):.0%}")
+
+
+if __name__ == "__main__":
+    main()
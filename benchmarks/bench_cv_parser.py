@@ -0,0 +1,70 @@
+import argparse
+import io
+import os
+import sys
+import time
+from typing import Callable, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import PyPDF2  # noqa: E402
+
+from src.cv_parser import extract_text_from_pdf  # noqa: E402
+
+CV_PATH = os.path.join(os.path.dirname(__file__), "..", "CV Kerja.pdf")
+
+
+def legacy_extract(data: bytes) -> Optional[str]:
+    # Perilaku lama: extract_text() dua kali per halaman dan penggabungan dengan +=
+    text = ""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    for page_num in range(len(reader.pages)):
+        page = reader.pages[page_num]
+        if page.extract_text():
+            text += page.extract_text()
+    return text
+
+
+def synthetic_pdf(source: bytes, page_count: int) -> bytes:
+    # Gandakan halaman CV untuk mensimulasikan portofolio panjang
+    reader = PyPDF2.PdfReader(io.BytesIO(source))
+    writer = PyPDF2.PdfWriter()
+    for i in range(page_count):
+        writer.add_page(reader.pages[i % len(reader.pages)])
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def _timed(func: Callable[[], Optional[str]]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ekstraksi teks CV dari PDF.")
+    parser.add_argument("--cv", default=CV_PATH, help="PDF sumber (default: CV Kerja.pdf)")
+    parser.add_argument("--pages", type=int, nargs="*", default=[50, 100, 200], help="Jumlah halaman PDF sintetis")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Jumlah proses untuk mode paralel")
+    parser.add_argument("--skip-legacy", action="store_true", help="Lewati cara lama (lambat untuk PDF besar)")
+    args = parser.parse_args()
+
+    with open(args.cv, "rb") as f:
+        source = f.read()
+
+    documents: List[tuple] = [(os.path.basename(args.cv), source)]
+    documents.extend((f"sintetis {n} hal.", synthetic_pdf(source, n)) for n in args.pages)
+
+    print(f"Proses paralel: {args.workers}")
+    print(f"{'dokumen':<22} {'halaman':>7} {'lama s':>8} {'serial s':>9} {'paralel s':>10}")
+    for name, data in documents:
+        page_count = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+        legacy_s = float("nan") if args.skip_legacy else _timed(lambda: legacy_extract(data))
+        serial_s = _timed(lambda: extract_text_from_pdf(data))
+        parallel_s = _timed(lambda: extract_text_from_pdf(data, max_workers=args.workers))
+        print(f"{name:<22} {page_count:>7} {legacy_s:>8.2f} {serial_s:>9.2f} {parallel_s:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
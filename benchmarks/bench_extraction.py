@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from src.job_extractors import HTML_PARSER, extract_job_description  # noqa: E402
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "fixtures", "job_pages"
+)
+
+
+def legacy_extract(html: str, url: Optional[str] = None) -> Optional[str]:
+    # Perilaku lama: pohon penuh dengan html.parser, lalu fallback ke seluruh body
+    soup = BeautifulSoup(html, "html.parser")
+    element = soup.find("div", class_="job-description")
+    if element:
+        return element.get_text(separator=" ", strip=True)
+    if soup.body:
+        return soup.body.get_text(separator=" ", strip=True)
+    return None
+
+
+def _time_per_page(func: Callable[[], Optional[str]], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def _quality(text: Optional[str], expected: Dict[str, List[str]]) -> Dict[str, float]:
+    text = text or ""
+    phrases = expected.get("phrases", [])
+    noise = expected.get("noise", [])
+    return {
+        "recall": sum(p in text for p in phrases) / len(phrases) if phrases else 1.0,
+        "noise": sum(n in text for n in noise),
+        "chars": len(text),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Bandingkan waktu parse dan kualitas ekstraksi deskripsi lowongan."
+    )
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Folder berisi halaman HTML dan expected.json")
+    parser.add_argument("--repeat", type=int, default=50, help="Jumlah pengulangan per halaman")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.fixtures, "expected.json"), "r", encoding="utf-8") as f:
+        expected = json.load(f)
+
+    print(f"Parser HTML: {HTML_PARSER}")
+    print(f"{'halaman':<20} {'lama ms':>8} {'baru ms':>8} {'recall':>13} {'noise':>9} {'karakter':>13}")
+    totals = {"legacy": 0.0, "new": 0.0}
+    for name, spec in sorted(expected.items()):
+        with open(os.path.join(args.fixtures, name), "r", encoding="utf-8") as f:
+            html = f.read()
+        url = spec.get("url")
+        legacy_ms = _time_per_page(lambda: legacy_extract(html), args.repeat)
+        new_ms = _time_per_page(lambda: extract_job_description(html, url), args.repeat)
+        totals["legacy"] += legacy_ms
+        totals["new"] += new_ms
+        old_q = _quality(legacy_extract(html), spec)
+        new_q = _quality(extract_job_description(html, url), spec)
+        print(
+            f"{name:<20} {legacy_ms:>8.2f} {new_ms:>8.2f} "
+            f"{old_q['recall']:>6.0%}->{new_q['recall']:<5.0%} "
+            f"{old_q['noise']:>3}->{new_q['noise']:<3} "
+            f"{old_q['chars']:>6}->{new_q['chars']:<6}"
+        )
+    speedup = totals["legacy"] / totals["new"] if totals["new"] else 0.0
+    print(f"Total per putaran: lama {totals['legacy']:.2f} ms, baru {totals['new']:.2f} ms ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
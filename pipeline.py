@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Muat variabel dari file .env
+load_dotenv()
+
+from src.cv_cache import load_cv_text  # noqa: E402
+from src.job_pipeline import run_pipeline  # noqa: E402
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Peringkatkan banyak lowongan terhadap CV secara lokal, "
+            "lalu buat surat lamaran hanya untuk N lowongan teratas."
+        )
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="File daftar URL (.txt), feed JSON/JSONL/CSV, atau halaman lowongan tersimpan (.html)",
+    )
+    parser.add_argument("--cv", required=True, help="Path ke CV (PDF)")
+    parser.add_argument("--top", type=int, default=10, help="Jumlah lowongan teratas yang dibuatkan surat")
+    parser.add_argument("--min-score", type=int, default=0, help="Skor minimum untuk dibuatkan surat")
+    parser.add_argument(
+        "--report",
+        default=os.path.join("output", "peringkat_lowongan.csv"),
+        help="File CSV laporan peringkat",
+    )
+    parser.add_argument(
+        "--letters",
+        default=os.path.join("output", "surat_lamaran_teratas.jsonl"),
+        help="File JSONL hasil surat lamaran",
+    )
+    parser.add_argument("--scrape-concurrency", type=int, default=8, help="Jumlah scraping paralel")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jumlah pemanggilan AI paralel")
+    parser.add_argument("--style", default="Formal", help="Gaya penulisan surat")
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"),
+        help="Path ke config.json",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    try:
+        with open(args.config, "r") as f:
+            config: Dict[str, Any] = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: gagal memuat config.json ({e}).")
+        return 1
+
+    cv_text: Optional[str] = load_cv_text(args.cv)
+    if not cv_text:
+        print("Peringatan: gagal mengekstrak teks dari CV. Peringkat hanya memakai keahlian di config.json.")
+
+    batch_report = run_pipeline(
+        args.inputs,
+        config,
+        cv_text,
+        top_n=args.top,
+        report_path=args.report,
+        letters_path=args.letters,
+        min_score=args.min_score,
+        scrape_workers=args.scrape_concurrency,
+        generate_workers=args.concurrency,
+        writing_style=args.style,
+    )
+    print(f"Laporan peringkat disimpan di: {args.report}")
+    if batch_report is None:
+        print("Tidak ada lowongan yang memenuhi syarat untuk dibuatkan surat.")
+        return 0
+    print(batch_report.summary())
+    print(f"Surat lamaran disimpan di: {args.letters}")
+    return 0 if batch_report.failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Jalankan CoverLetter-Bot sebagai layanan HTTP (tanpa Streamlit)."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Alamat yang didengarkan")
+    parser.add_argument("--port", type=int, default=8000, help="Port HTTP")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Jumlah proses worker (skala horizontal)"
+    )
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"),
+        help="Path ke config.json",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # Muat variabel dari file .env; proses worker uvicorn mewarisi environment ini
+    load_dotenv()
+    args = parse_args(argv)
+
+    try:
+        with open(args.config, "r") as f:
+            json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: gagal memuat config.json ({e}).")
+        return 1
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("Error: layanan HTTP membutuhkan paket fastapi dan uvicorn (pip install fastapi uvicorn).")
+        return 1
+
+    # Setiap proses worker membuat aplikasinya sendiri dan membaca config dari path yang sama
+    os.environ["SERVICE_CONFIG_PATH"] = os.path.abspath(args.config)
+    uvicorn.run(
+        "src.service_api:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,21 @@
+import asyncio
 import json
 import os
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 import google.generativeai as genai
 
+from src.cv_parser import get_cv_profile
+from src.paths import project_path
+from src.prompt_budget import TokenCounter, estimate_tokens, fit_prompt_inputs, model_token_counter
+from src.response_cache import ResponseCache
+from src.stream_parser import CoverLetterStreamParser
+from src.text_cleaner import clean_text
+
 # Konfigurasi API Key Gemini dari environment variable
 api_key: Optional[str] = os.getenv("GEMINI_API_KEY")
 if not api_key:
@@ -20,8 +32,235 @@ if not api_key:
     )
 genai.configure(api_key=api_key)
 
+MODEL_NAME: str = "gemini-1.5-flash"
+FAILED_COVER_LETTER: str = "Gagal membuat surat lamaran. Silakan coba lagi."
+# Batas waktu default (detik) untuk varian async; None berarti tanpa batas
+DEFAULT_TIMEOUT_S: float = float(os.getenv("GEMINI_TIMEOUT_S", "60"))
 
-def generate_cover_letter(
+
+# Batas token gabungan untuk teks CV + deskripsi pekerjaan di dalam prompt (0 = tanpa batas)
+PROMPT_INPUT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_INPUT_TOKEN_BUDGET", "4000"))
+
+# Pengaturan generasi ikut menjadi bagian kunci cache; kosong berarti default model
+GENERATION_CONFIG: Dict[str, Any] = {}
+
+# Cache respons persisten agar rerun Streamlit / submit ulang dengan input sama tidak memanggil API lagi
+response_cache = ResponseCache(
+    path=project_path(os.getenv("GEMINI_CACHE_PATH") or "response_cache.db"),
+    max_entries=int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "1000")),
+    max_age_s=float(os.getenv("GEMINI_CACHE_MAX_AGE_HOURS", "168")) * 3600,
+    enabled=os.getenv("GEMINI_CACHE_DISABLED", "").lower() not in ("1", "true", "yes"),
+)
+
+
+@lru_cache(maxsize=None)
+def get_model(model_name: str = MODEL_NAME) -> genai.GenerativeModel:
+    # Klien model dipakai ulang agar pemanggilan berulang (mis. mode batch) tidak membuat klien baru
+    return genai.GenerativeModel(model_name)
+
+
+def _token_counter() -> TokenCounter:
+    # "model" memakai count_tokens dari Gemini (satu panggilan API per teks), default estimasi lokal
+    if os.getenv("PROMPT_TOKEN_COUNTER", "local").lower() == "model":
+        return model_token_counter(get_model())
+    return estimate_tokens
+
+
+def _fit_inputs(
+    cv_text: Optional[str], job_desc_text: Optional[str], context: str
+) -> Tuple[Optional[str], Optional[str]]:
+    # Deskripsi yang ditempel pengguna juga bisa berisi baris ganda dan spasi berlebih
+    job_desc_text = clean_text(job_desc_text) or None
+    # CV dikirim dalam bentuk ringkas per bagian (header dan bagian yang dikenali)
+    if cv_text:
+        cv_text = get_cv_profile(cv_text).to_prompt_text()
+    return fit_prompt_inputs(
+        cv_text, job_desc_text, PROMPT_INPUT_TOKEN_BUDGET, context, _token_counter()
+    )
+
+
+@dataclass
+class TokenUsage:
+    """Jumlah token yang ditagih Gemini (dari usage_metadata); respons dari cache tidak dihitung."""
+
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+# Setiap generasi (termasuk task/thread turunannya) mengumpulkan pemakaian tokennya sendiri
+_current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("gemini_token_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[TokenUsage]:
+    usage = TokenUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def _token_count(metadata: Any, name: str) -> int:
+    value = getattr(metadata, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def _record_usage(response: Any) -> None:
+    usage = _current_usage.get()
+    metadata = getattr(response, "usage_metadata", None)
+    if usage is None or metadata is None:
+        return
+    usage.prompt_tokens += _token_count(metadata, "prompt_token_count")
+    usage.output_tokens += _token_count(metadata, "candidates_token_count")
+
+
+def _cache_key(prompt: str) -> str:
+    return ResponseCache.make_key(MODEL_NAME, prompt, GENERATION_CONFIG)
+
+
+def _request_kwargs() -> Dict[str, Any]:
+    return {"generation_config": GENERATION_CONFIG} if GENERATION_CONFIG else {}
+
+
+def _cache_if_valid(
+    key: str, text: str, validate: Optional[Callable[[str], Any]] = None
+) -> None:
+    if validate is not None:
+        try:
+            validate(text)
+        except Exception:
+            return
+    response_cache.set(key, text)
+
+
+def _generate_text(prompt: str) -> str:
+    key = _cache_key(prompt)
+    cached: Optional[str] = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    response = get_model().generate_content(prompt, **_request_kwargs())
+    _record_usage(response)
+    text: str = response.text
+    response_cache.set(key, text)
+    return text
+
+
+async def _agenerate_text(prompt: str, timeout: Optional[float] = DEFAULT_TIMEOUT_S) -> str:
+    key = _cache_key(prompt)
+    cached: Optional[str] = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    request = get_model().generate_content_async(prompt, **_request_kwargs())
+    # wait_for membatalkan permintaan yang melewati batas waktu; CancelledError tetap diteruskan
+    response = await asyncio.wait_for(request, timeout)
+    _record_usage(response)
+    text: str = response.text
+    response_cache.set(key, text)
+    return text
+
+
+def _stream_text(
+    prompt: str, validate: Optional[Callable[[str], Any]] = None
+) -> Iterator[str]:
+    key = _cache_key(prompt)
+    cached: Optional[str] = response_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    response = get_model().generate_content(prompt, stream=True, **_request_kwargs())
+    parts: List[str] = []
+    chunk: Any = None
+    for chunk in response:
+        text: str = chunk.text
+        if text:
+            parts.append(text)
+            yield text
+    # Chunk terakhir membawa total token untuk seluruh stream
+    _record_usage(chunk)
+    # Hanya respons yang selesai penuh yang disimpan ke cache
+    _cache_if_valid(key, "".join(parts), validate)
+
+
+async def _astream_text(
+    prompt: str,
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
+    validate: Optional[Callable[[str], Any]] = None,
+) -> AsyncIterator[str]:
+    key = _cache_key(prompt)
+    cached: Optional[str] = response_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline: Optional[float] = loop.time() + timeout if timeout is not None else None
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - loop.time())
+
+    response = await asyncio.wait_for(
+        get_model().generate_content_async(prompt, stream=True, **_request_kwargs()),
+        remaining(),
+    )
+    chunks = response.__aiter__()
+    parts: List[str] = []
+    last_chunk: Any = None
+    while True:
+        # Batas waktu berlaku untuk keseluruhan stream, bukan per chunk
+        try:
+            last_chunk = await asyncio.wait_for(chunks.__anext__(), remaining())
+        except StopAsyncIteration:
+            break
+        text: str = last_chunk.text
+        if text:
+            parts.append(text)
+            yield text
+    _record_usage(last_chunk)
+    _cache_if_valid(key, "".join(parts), validate)
+
+
+# Skor kecocokan dari AI hanya diminta bila tidak ada deskripsi pekerjaan; jika ada, pemanggil
+# memakai skor lokal dari match_scorer sehingga token untuk skor AI terbuang percuma
+_SCORED_COVER_LETTER_OUTPUT_FORMAT: str = """**Format Output:** Berikan respons dalam format JSON dengan dua kunci: "cover_letter" (berisi teks surat lamaran) dan "match_score" (berisi skor numerik dari 1-100).
+
+    **Contoh Output JSON:**
+    ```json
+    {
+        "cover_letter": "Yth. Bapak/Ibu Pimpinan HRD...",
+        "match_score": 85
+    }
+    ```"""
+
+_COVER_LETTER_OUTPUT_FORMAT: str = """**Format Output:** Berikan respons dalam format JSON dengan satu kunci: "cover_letter" (berisi teks surat lamaran).
+
+    **Contoh Output JSON:**
+    ```json
+    {
+        "cover_letter": "Yth. Bapak/Ibu Pimpinan HRD..."
+    }
+    ```"""
+
+_APPLICATION_BUNDLE_OUTPUT_FORMAT: str = """**Tugas Tambahan:** Sebagai konsultan karier, berikan juga saran konkret dan actionable untuk memperbaiki CV pelamar agar lebih relevan dengan posisi ini (penyesuaian kata kunci, penyorotan pengalaman relevan, detail yang terlewat). Jika CV sudah sangat cocok, berikan pujian dan saran minimal.
+
+    **Format Output:** Berikan respons dalam format JSON dengan dua kunci: "cover_letter" (berisi teks surat lamaran) dan "cv_suggestions" (berisi daftar string, satu saran per elemen).
+
+    **Contoh Output JSON:**
+    ```json
+    {
+        "cover_letter": "Yth. Bapak/Ibu Pimpinan HRD...",
+        "cv_suggestions": [
+            "Tambahkan detail kuantitatif pada pengalaman magang di Funcom.",
+            "Sertakan kata kunci 'Manajemen Proyek' jika relevan dengan pengalaman Anda."
+        ]
+    }
+    ```"""
+
+
+def _build_cover_letter_prompt(
     config: Dict[str, Any],
     posisi: str,
     perusahaan: str,
@@ -29,23 +268,31 @@ def generate_cover_letter(
     cv_text: Optional[str] = None,
     job_desc_text: Optional[str] = None,
     writing_style: str = "Formal",
-) -> Dict[str, Any]:
-    model = genai.GenerativeModel("gemini-1.5-flash")
-
+    output_format: str = _COVER_LETTER_OUTPUT_FORMAT,
+) -> str:
     keahlian_teknis: str = ", ".join(config["keahlian"]["teknis"])
     keahlian_non_teknis: str = ", ".join(config["keahlian"]["non_teknis"])
 
+    # Potong CV dan deskripsi pekerjaan ke anggaran token, bagian paling relevan dipertahankan
+    cv_text, job_desc_text = _fit_inputs(
+        cv_text, job_desc_text, f"{posisi} {keahlian_teknis} {keahlian_non_teknis}"
+    )
+
     cv_info: str = f"Berikut adalah ringkasan CV pelamar:\n{cv_text}\n" if cv_text else ""
     job_info: str = (
         f"Berikut adalah deskripsi pekerjaan yang dianalisis:\n{job_desc_text}\n"
         if job_desc_text
         else ""
     )
+    score_task: str = ""
+    if not job_desc_text and output_format == _COVER_LETTER_OUTPUT_FORMAT:
+        score_task = " Selain surat lamaran, berikan juga skor kecocokan numerik (dari 1 hingga 100) antara profil pelamar dengan deskripsi pekerjaan."
+        output_format = _SCORED_COVER_LETTER_OUTPUT_FORMAT
 
     prompt: str = f"""
     **Peran:** Anda adalah seorang asisten karier profesional yang bertugas untuk membuat surat lamaran kerja yang personal, relevan, dan persuasif.
 
-    **Tugas:** Buatkan sebuah surat lamaran kerja yang ditujukan kepada pimpinan HRD di perusahaan **{perusahaan}** untuk posisi **{posisi}**. Lowongan ini ditemukan melalui **{sumber_lowongan}**. Selain surat lamaran, berikan juga skor kecocokan numerik (dari 1 hingga 100) antara profil pelamar dengan deskripsi pekerjaan.
+    **Tugas:** Buatkan sebuah surat lamaran kerja yang ditujukan kepada pimpinan HRD di perusahaan **{perusahaan}** untuk posisi **{posisi}**. Lowongan ini ditemukan melalui **{sumber_lowongan}**.{score_task}
 
     Gunakan informasi dari data pelamar berikut untuk menyusun surat lamaran yang paling efektif:
 
@@ -65,36 +312,240 @@ def generate_cover_letter(
     * Jelaskan bagaimana kombinasi keahlian teknis (desain grafis) dan non-teknis (komunikasi, kerja tim) menjadikan pelamar kandidat yang kuat.
     * Pastikan surat lamaran ini menyoroti semangat pelamar untuk belajar dan berkontribusi secara nyata di lingkungan kerja.
 
-    **Format Output:** Berikan respons dalam format JSON dengan dua kunci: "cover_letter" (berisi teks surat lamaran) dan "match_score" (berisi skor numerik dari 1-100).
-
-    **Contoh Output JSON:**
-    ```json
-    {{
-        "cover_letter": "Yth. Bapak/Ibu Pimpinan HRD...",
-        "match_score": 85
-    }}
-    ```
+    {output_format}
     """
+    return prompt
+
+
+def _parse_cover_letter_response(response_text: str) -> Dict[str, Any]:
+    response_text = response_text.strip()
+    if response_text.startswith("```json") and response_text.endswith("```"):
+        response_text = response_text[7:-3].strip()
+    return json.loads(response_text)
+
+
+def _failed_cover_letter(prompt: str, error: BaseException) -> Dict[str, Any]:
+    # Jangan simpan respons yang gagal diparse agar percobaan berikutnya memanggil API lagi
+    response_cache.delete(_cache_key(prompt))
+    print(f"Error saat memanggil Gemini API atau parsing respons: {error}")
+    return {
+        "cover_letter": FAILED_COVER_LETTER,
+        "match_score": 0,
+    }
+
+
+def generate_cover_letter(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_text: Optional[str] = None,
+    job_desc_text: Optional[str] = None,
+    writing_style: str = "Formal",
+) -> Dict[str, Any]:
+    prompt = _build_cover_letter_prompt(
+        config, posisi, perusahaan, sumber_lowongan, cv_text, job_desc_text, writing_style
+    )
+    try:
+        return _parse_cover_letter_response(_generate_text(prompt))
+    except Exception as e:
+        return _failed_cover_letter(prompt, e)
+
+
+async def agenerate_cover_letter(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_text: Optional[str] = None,
+    job_desc_text: Optional[str] = None,
+    writing_style: str = "Formal",
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
+) -> Dict[str, Any]:
+    prompt = _build_cover_letter_prompt(
+        config, posisi, perusahaan, sumber_lowongan, cv_text, job_desc_text, writing_style
+    )
     try:
-        response = model.generate_content(prompt)
-        response_text: str = response.text.strip()
-        if response_text.startswith("```json") and response_text.endswith("```"):
-            response_text = response_text[7:-3].strip()
+        return _parse_cover_letter_response(await _agenerate_text(prompt, timeout))
+    except Exception as e:
+        return _failed_cover_letter(prompt, e)
 
-        parsed_response: Dict[str, Any] = json.loads(response_text)
-        return parsed_response
+
+def stream_cover_letter(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_text: Optional[str] = None,
+    job_desc_text: Optional[str] = None,
+    writing_style: str = "Formal",
+) -> Iterator[CoverLetterStreamParser]:
+    # Menghasilkan parser yang sama setelah setiap chunk; baca .letter dan .match_score secara langsung
+    prompt = _build_cover_letter_prompt(
+        config, posisi, perusahaan, sumber_lowongan, cv_text, job_desc_text, writing_style
+    )
+    parser = CoverLetterStreamParser()
+    try:
+        for chunk in _stream_text(prompt, validate=_parse_cover_letter_response):
+            yield parser.feed(chunk)
     except Exception as e:
-        print(f"Error saat memanggil Gemini API atau parsing respons: {e}")
+        print(f"Error saat streaming dari Gemini API: {e}")
+
+
+async def astream_cover_letter(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_text: Optional[str] = None,
+    job_desc_text: Optional[str] = None,
+    writing_style: str = "Formal",
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
+) -> AsyncIterator[CoverLetterStreamParser]:
+    prompt = _build_cover_letter_prompt(
+        config, posisi, perusahaan, sumber_lowongan, cv_text, job_desc_text, writing_style
+    )
+    parser = CoverLetterStreamParser()
+    try:
+        async for chunk in _astream_text(
+            prompt, timeout, validate=_parse_cover_letter_response
+        ):
+            yield parser.feed(chunk)
+    except Exception as e:
+        print(f"Error saat streaming dari Gemini API: {e}")
+
+
+def cover_letter_from_stream(parser: CoverLetterStreamParser) -> Dict[str, Any]:
+    try:
+        return parser.result()
+    except ValueError as e:
+        print(f"Error saat parsing respons streaming: {e}")
         return {
-            "cover_letter": "Gagal membuat surat lamaran. Silakan coba lagi.",
+            "cover_letter": FAILED_COVER_LETTER,
             "match_score": 0,
         }
 
 
-def generate_cv_suggestions(
+def _validate_application_bundle(data: Any) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise ValueError("Respons gabungan bukan objek JSON.")
+
+    cover_letter = data.get("cover_letter")
+    if not isinstance(cover_letter, str) or not cover_letter.strip():
+        raise ValueError("Kunci 'cover_letter' kosong atau tidak valid.")
+
+    # Skor tidak diminta di prompt gabungan (pemanggil memakai skor lokal), tapi tetap diperiksa bila ada
+    match_score = data.get("match_score", 0)
+    if isinstance(match_score, bool) or not isinstance(match_score, (int, float, str)):
+        raise ValueError("Kunci 'match_score' tidak valid.")
+    match_score = int(float(match_score))
+    if not 0 <= match_score <= 100:
+        raise ValueError("Kunci 'match_score' harus bernilai 0-100.")
+
+    suggestions = data.get("cv_suggestions")
+    if isinstance(suggestions, list) and all(isinstance(item, str) for item in suggestions):
+        suggestions = "\n".join(f"- {item.strip().lstrip('-').strip()}" for item in suggestions)
+    if not isinstance(suggestions, str) or not suggestions.strip():
+        raise ValueError("Kunci 'cv_suggestions' kosong atau tidak valid.")
+
+    return {
+        "cover_letter": cover_letter,
+        "match_score": match_score,
+        "cv_suggestions": suggestions,
+        "bundled": True,
+    }
+
+
+def _parse_application_bundle(response_text: str) -> Dict[str, Any]:
+    return _validate_application_bundle(_parse_cover_letter_response(response_text))
+
+
+def generate_application_bundle(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_text: str,
+    job_desc_text: str,
+    writing_style: str = "Formal",
+) -> Dict[str, Any]:
+    # Satu panggilan untuk surat dan saran CV; CV dan deskripsi pekerjaan hanya dikirim sekali
+    prompt = _build_cover_letter_prompt(
+        config,
+        posisi,
+        perusahaan,
+        sumber_lowongan,
+        cv_text,
+        job_desc_text,
+        writing_style,
+        output_format=_APPLICATION_BUNDLE_OUTPUT_FORMAT,
+    )
+    try:
+        return _parse_application_bundle(_generate_text(prompt))
+    except Exception as e:
+        response_cache.delete(_cache_key(prompt))
+        print(f"Respons gabungan tidak valid ({e}), beralih ke pemanggilan terpisah.")
+
+    letter = generate_cover_letter(
+        config, posisi, perusahaan, sumber_lowongan, cv_text, job_desc_text, writing_style
+    )
+    return {
+        **letter,
+        "cv_suggestions": generate_cv_suggestions(cv_text, job_desc_text, config),
+        "bundled": False,
+    }
+
+
+async def agenerate_application_bundle(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_text: str,
+    job_desc_text: str,
+    writing_style: str = "Formal",
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
+) -> Dict[str, Any]:
+    prompt = _build_cover_letter_prompt(
+        config,
+        posisi,
+        perusahaan,
+        sumber_lowongan,
+        cv_text,
+        job_desc_text,
+        writing_style,
+        output_format=_APPLICATION_BUNDLE_OUTPUT_FORMAT,
+    )
+    try:
+        return _parse_application_bundle(await _agenerate_text(prompt, timeout))
+    except Exception as e:
+        response_cache.delete(_cache_key(prompt))
+        print(f"Respons gabungan tidak valid ({e}), beralih ke pemanggilan terpisah.")
+
+    letter, suggestions = await asyncio.gather(
+        agenerate_cover_letter(
+            config,
+            posisi,
+            perusahaan,
+            sumber_lowongan,
+            cv_text,
+            job_desc_text,
+            writing_style,
+            timeout,
+        ),
+        agenerate_cv_suggestions(cv_text, job_desc_text, config, timeout),
+    )
+    return {**letter, "cv_suggestions": suggestions, "bundled": False}
+
+
+def _build_cv_suggestions_prompt(
     cv_text: str, job_desc_text: str, config: Dict[str, Any]
 ) -> str:
-    model = genai.GenerativeModel("gemini-1.5-flash")
+    cv_text, job_desc_text = _fit_inputs(
+        cv_text,
+        job_desc_text,
+        " ".join(config["keahlian"]["teknis"] + config["keahlian"]["non_teknis"]),
+    )
 
     prompt: str = f"""
     **Peran:** Anda adalah seorang konsultan karier yang ahli dalam mengoptimalkan CV.
@@ -115,19 +566,37 @@ def generate_cv_suggestions(
         - "Tambahkan detail kuantitatif pada pengalaman magang di Funcom, misalnya 'meningkatkan engagement Instagram sebesar X%'"
         - "Sertakan kata kunci 'Manajemen Proyek' jika relevan dengan pengalaman Anda."
     """
+    return prompt
+
+
+def generate_cv_suggestions(
+    cv_text: str, job_desc_text: str, config: Dict[str, Any]
+) -> str:
+    prompt = _build_cv_suggestions_prompt(cv_text, job_desc_text, config)
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return _generate_text(prompt)
     except Exception as e:
         print(f"Error saat memanggil Gemini API untuk saran CV: {e}")
         return "Gagal mendapatkan saran perbaikan CV."
 
 
-def generate_thank_you_email(
-    config: Dict[str, Any], posisi: str, perusahaan: str, tanggal_wawancara: Optional[str] = None
+async def agenerate_cv_suggestions(
+    cv_text: str,
+    job_desc_text: str,
+    config: Dict[str, Any],
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
 ) -> str:
-    model = genai.GenerativeModel("gemini-1.5-flash")
+    prompt = _build_cv_suggestions_prompt(cv_text, job_desc_text, config)
+    try:
+        return await _agenerate_text(prompt, timeout)
+    except Exception as e:
+        print(f"Error saat memanggil Gemini API untuk saran CV: {e}")
+        return "Gagal mendapatkan saran perbaikan CV."
+
 
+def _build_thank_you_email_prompt(
+    config: Dict[str, Any], posisi: str, perusahaan: str, tanggal_wawancara: Optional[str] = None
+) -> str:
     prompt: str = f"""
     **Peran:** Anda adalah seorang asisten karier yang membantu membuat email profesional.
 
@@ -146,19 +615,56 @@ def generate_thank_you_email(
     * Sertakan tanggal wawancara jika disediakan.
     * Format output adalah teks email lengkap.
     """
+    return prompt
+
+
+def generate_thank_you_email(
+    config: Dict[str, Any], posisi: str, perusahaan: str, tanggal_wawancara: Optional[str] = None
+) -> str:
+    prompt = _build_thank_you_email_prompt(config, posisi, perusahaan, tanggal_wawancara)
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return _generate_text(prompt)
     except Exception as e:
         print(f"Error saat memanggil Gemini API untuk email terima kasih: {e}")
         return "Gagal membuat email ucapan terima kasih."
 
 
-def generate_follow_up_email(
-    config: Dict[str, Any], posisi: str, perusahaan: str, tanggal_lamar: Optional[str] = None
+async def agenerate_thank_you_email(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    tanggal_wawancara: Optional[str] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
 ) -> str:
-    model = genai.GenerativeModel("gemini-1.5-flash")
+    prompt = _build_thank_you_email_prompt(config, posisi, perusahaan, tanggal_wawancara)
+    try:
+        return await _agenerate_text(prompt, timeout)
+    except Exception as e:
+        print(f"Error saat memanggil Gemini API untuk email terima kasih: {e}")
+        return "Gagal membuat email ucapan terima kasih."
+
+
+def stream_thank_you_email(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    tanggal_wawancara: Optional[str] = None,
+) -> Iterator[str]:
+    prompt = _build_thank_you_email_prompt(config, posisi, perusahaan, tanggal_wawancara)
+    produced = False
+    try:
+        for chunk in _stream_text(prompt):
+            produced = True
+            yield chunk
+    except Exception as e:
+        print(f"Error saat memanggil Gemini API untuk email terima kasih: {e}")
+        if not produced:
+            yield "Gagal membuat email ucapan terima kasih."
+
 
+def _build_follow_up_email_prompt(
+    config: Dict[str, Any], posisi: str, perusahaan: str, tanggal_lamar: Optional[str] = None
+) -> str:
     prompt: str = f"""
     **Peran:** Anda adalah seorang asisten karier yang membantu membuat email profesional.
 
@@ -176,9 +682,48 @@ def generate_follow_up_email(
     * Tegaskan kembali minat pada posisi.
     * Format output adalah teks email lengkap.
     """
+    return prompt
+
+
+def generate_follow_up_email(
+    config: Dict[str, Any], posisi: str, perusahaan: str, tanggal_lamar: Optional[str] = None
+) -> str:
+    prompt = _build_follow_up_email_prompt(config, posisi, perusahaan, tanggal_lamar)
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return _generate_text(prompt)
     except Exception as e:
         print(f"Error saat memanggil Gemini API untuk email tindak lanjut: {e}")
         return "Gagal membuat email tindak lanjut."
+
+
+async def agenerate_follow_up_email(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    tanggal_lamar: Optional[str] = None,
+    timeout: Optional[float] = DEFAULT_TIMEOUT_S,
+) -> str:
+    prompt = _build_follow_up_email_prompt(config, posisi, perusahaan, tanggal_lamar)
+    try:
+        return await _agenerate_text(prompt, timeout)
+    except Exception as e:
+        print(f"Error saat memanggil Gemini API untuk email tindak lanjut: {e}")
+        return "Gagal membuat email tindak lanjut."
+
+
+def stream_follow_up_email(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    tanggal_lamar: Optional[str] = None,
+) -> Iterator[str]:
+    prompt = _build_follow_up_email_prompt(config, posisi, perusahaan, tanggal_lamar)
+    produced = False
+    try:
+        for chunk in _stream_text(prompt):
+            produced = True
+            yield chunk
+    except Exception as e:
+        print(f"Error saat memanggil Gemini API untuk email tindak lanjut: {e}")
+        if not produced:
+            yield "Gagal membuat email tindak lanjut."
@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from src.paths import PROJECT_ROOT, project_path
+
+ARTIFACT_DIR: str = os.path.join(PROJECT_ROOT, "output", "artifacts")
+# Berkas sekecil ini tidak sebanding dengan biaya kompresi
+MIN_COMPRESS_BYTES: int = 256
+COMPRESSED_SUFFIX: str = ".gz"
+
+
+@dataclass
+class Artifact:
+    digest: str
+    path: str
+    size: int
+    compressed: bool = False
+    created: bool = False
+
+
+class ArtifactStore:
+    """Penyimpanan berkas beralamat konten (SHA-256): isi yang sama hanya ditulis sekali ke disk."""
+
+    def __init__(
+        self,
+        root: str = ARTIFACT_DIR,
+        compress: bool = True,
+        min_compress_bytes: int = MIN_COMPRESS_BYTES,
+    ) -> None:
+        # Path absolut agar path yang disimpan di riwayat dan pekerjaan tetap valid dari direktori mana pun
+        self.root = os.path.abspath(root)
+        self.compress = compress
+        self.min_compress_bytes = min_compress_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, digest: str, suffix: str, compressed: bool) -> str:
+        # Dua karakter pertama hash menjadi subfolder agar satu folder tidak berisi ribuan berkas
+        name = digest + suffix + (COMPRESSED_SUFFIX if compressed else "")
+        return os.path.join(self.root, digest[:2], name)
+
+    def find(self, digest: str, suffix: str = "") -> Optional[str]:
+        # Berkas bisa tersimpan terkompresi atau tidak, tergantung pengaturan saat ditulis
+        for compressed in (True, False):
+            path = self._path(digest, suffix, compressed)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, data: Union[bytes, str], suffix: str = "") -> Artifact:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = self.digest(data)
+        with self._lock:
+            existing = self.find(digest, suffix)
+            if existing is not None:
+                return Artifact(
+                    digest, existing, len(data), existing.endswith(COMPRESSED_SUFFIX)
+                )
+
+            compressed = self.compress and len(data) >= self.min_compress_bytes
+            # mtime=0 agar isi yang sama selalu menghasilkan berkas terkompresi yang identik
+            payload = gzip.compress(data, mtime=0) if compressed else data
+            path = self._path(digest, suffix, compressed)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Tulis ke berkas sementara lalu ganti, agar pembaca tidak pernah melihat berkas setengah jadi
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return Artifact(digest, path, len(data), compressed, created=True)
+
+    def read(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            data = f.read()
+        return gzip.decompress(data) if path.endswith(COMPRESSED_SUFFIX) else data
+
+    def delete(self, path: str) -> None:
+        with self._lock:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def get(self, digest: str, suffix: str = "") -> Optional[bytes]:
+        path = self.find(digest, suffix)
+        return self.read(path) if path is not None else None
+
+
+_default_store: Optional[ArtifactStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore(
+                root=project_path(os.getenv("ARTIFACT_DIR") or ARTIFACT_DIR),
+                compress=os.getenv("ARTIFACT_COMPRESS", "1").lower() not in ("0", "false", "no"),
+            )
+        return _default_store
@@ -0,0 +1,188 @@
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.message import EmailMessage, MIMEPart
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from src.pdf_writer import render_text_pdf
+
+DOCX_MIME_TYPE: str = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+DEFAULT_MIME_TYPE: str = "application/octet-stream"
+
+
+@dataclass(frozen=True)
+class Attachment:
+    filename: str
+    data: bytes
+    content_type: Optional[str] = None
+
+
+AttachmentSource = Union[str, Attachment]
+
+
+def detect_mime_type(filename: str, data: bytes) -> str:
+    # Isi berkas diutamakan daripada ekstensi, karena nama unggahan bisa saja keliru
+    lower = filename.lower()
+    if data.startswith(b"%PDF-"):
+        return "application/pdf"
+    if data.startswith(b"PK\x03\x04"):
+        if lower.endswith(".docx") or b"word/" in data[:4096]:
+            return DOCX_MIME_TYPE
+        return mimetypes.guess_type(filename)[0] or "application/zip"
+    if data.startswith(b"\xd0\xcf\x11\xe0"):
+        return "application/msword"
+    guessed = mimetypes.guess_type(filename)[0]
+    if guessed and not guessed.startswith("text/"):
+        return guessed
+    if _looks_like_text(data):
+        return guessed or "text/plain"
+    return DEFAULT_MIME_TYPE
+
+
+def _looks_like_text(data: bytes) -> bool:
+    chunk = data[:65536]
+    if b"\x00" in chunk:
+        return False
+    try:
+        chunk.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Potongan 64 KiB bisa memutus karakter multibyte di ujungnya
+        return len(data) > len(chunk) and e.start >= len(chunk) - 3
+    return True
+
+
+def _build_part(filename: str, data: bytes, content_type: str) -> MIMEPart:
+    maintype, _, subtype = content_type.partition("/")
+    part = MIMEPart()
+    if maintype == "text":
+        # Teks dikirim apa adanya dengan charset; bukan dipaksa menjadi biner
+        part.set_content(
+            data.decode("utf-8", errors="replace"), subtype=subtype, disposition="attachment", filename=filename
+        )
+    else:
+        part.set_content(data, maintype=maintype, subtype=subtype, disposition="attachment", filename=filename)
+    return part
+
+
+class AttachmentCache:
+    """Cache bagian MIME yang sudah di-encode (base64) per hash isi berkas, dipakai ulang antar email."""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.file_reads = 0
+        self._parts: "OrderedDict[Tuple[str, str, str], MIMEPart]" = OrderedDict()
+        # (path, ukuran, mtime) -> (hash, tipe MIME): berkas yang tidak berubah tidak perlu dibaca ulang
+        self._file_digests: Dict[Tuple[str, int, int], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key: Tuple[str, str, str]) -> Optional[MIMEPart]:
+        part = self._parts.get(key)
+        if part is not None:
+            self._parts.move_to_end(key)
+            self.hits += 1
+        return part
+
+    def _store(self, key: Tuple[str, str, str], part: MIMEPart) -> None:
+        self._parts[key] = part
+        self._parts.move_to_end(key)
+        while len(self._parts) > self.max_entries:
+            self._parts.popitem(last=False)
+
+    def part_for_bytes(self, filename: str, data: bytes, content_type: Optional[str] = None) -> MIMEPart:
+        content_type = content_type or detect_mime_type(filename, data)
+        key = (hashlib.sha256(data).hexdigest(), filename, content_type)
+        with self._lock:
+            part = self._cached(key)
+            if part is not None:
+                return part
+            self.misses += 1
+            part = _build_part(filename, data, content_type)
+            self._store(key, part)
+        return part
+
+    def part_for_path(self, path: str) -> Optional[MIMEPart]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        filename = os.path.basename(path)
+        file_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            known = self._file_digests.get(file_key)
+            if known is not None:
+                part = self._cached((known[0], filename, known[1]))
+                if part is not None:
+                    return part
+        with open(path, "rb") as f:
+            data = f.read()
+        content_type = detect_mime_type(filename, data)
+        with self._lock:
+            self.file_reads += 1
+            self._file_digests[file_key] = (hashlib.sha256(data).hexdigest(), content_type)
+        return self.part_for_bytes(filename, data, content_type)
+
+    def part_for(self, source: AttachmentSource) -> Optional[MIMEPart]:
+        if isinstance(source, Attachment):
+            return self.part_for_bytes(source.filename, source.data, source.content_type)
+        return self.part_for_path(source)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "file_reads": self.file_reads,
+            "entries": len(self._parts),
+        }
+
+
+_default_cache = AttachmentCache()
+
+
+def get_attachment_cache() -> AttachmentCache:
+    return _default_cache
+
+
+def add_attachments(
+    msg: EmailMessage,
+    attachments: Iterable[AttachmentSource],
+    cache: Optional[AttachmentCache] = None,
+) -> None:
+    cache = cache or _default_cache
+    for source in attachments:
+        name = source.filename if isinstance(source, Attachment) else os.path.basename(source)
+        try:
+            part = cache.part_for(source)
+        except Exception as e:
+            print(f"Gagal melampirkan file {name}: {e}")
+            continue
+        if part is None:
+            print(f"Peringatan: File lampiran tidak ditemukan: {source}")
+            continue
+        if not msg.is_multipart():
+            msg.make_mixed()
+        # Bagian MIME yang sama dipakai bersama; isinya tidak pernah diubah setelah dibuat
+        msg.attach(part)
+
+
+@lru_cache(maxsize=32)
+def letter_pdf(text: str, title: Optional[str] = None) -> bytes:
+    # Surat yang sama hanya dirender sekali, meskipun dilampirkan ke banyak email
+    return render_text_pdf(text, title)
+
+
+def letter_filename(company: str, position: str, extension: str = ".pdf") -> str:
+    return f"surat_lamaran_{company.replace(' ', '_')}_{position.replace(' ', '_')}{extension}"
+
+
+def letter_attachment(company: str, position: str, text: str) -> Attachment:
+    return Attachment(
+        letter_filename(company, position),
+        letter_pdf(text, f"Surat Lamaran - {position} - {company}"),
+        "application/pdf",
+    )
@@ -0,0 +1,200 @@
+import csv
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.ai_service import FAILED_COVER_LETTER, generate_cover_letter
+from src.job_parser import scrape_job_description
+from src.match_scorer import MatchScorer, skills_from_config
+
+
+@dataclass
+class BatchItem:
+    posisi: str
+    perusahaan: str
+    sumber_lowongan: str = ""
+    job_url: str = ""
+    job_desc: str = ""
+    # Alamat email perekrut; dipakai saat hasil batch dikirim massal
+    email_tujuan: str = ""
+
+
+@dataclass
+class BatchResult:
+    index: int
+    item: BatchItem
+    cover_letter: str = ""
+    match_score: int = 0
+    missing_keywords: List[str] = field(default_factory=list)
+    latency_s: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_record(self) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"index": self.index, **asdict(self.item)}
+        record.update(
+            {
+                "cover_letter": self.cover_letter,
+                "match_score": self.match_score,
+                "missing_keywords": self.missing_keywords,
+                "latency_s": round(self.latency_s, 3),
+                "error": self.error,
+            }
+        )
+        return record
+
+
+@dataclass
+class BatchReport:
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def letters_per_minute(self) -> float:
+        if self.elapsed_s <= 0:
+            return 0.0
+        return self.succeeded / self.elapsed_s * 60
+
+    def summary(self) -> str:
+        lines = [
+            f"Total lowongan   : {self.total}",
+            f"Berhasil / gagal : {self.succeeded} / {self.failed}",
+            f"Waktu total      : {self.elapsed_s:.1f} detik",
+            f"Throughput       : {self.letters_per_minute:.1f} surat/menit",
+        ]
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            lines.append(
+                "Latensi per item : "
+                f"rata-rata {statistics.mean(ordered):.2f}s, "
+                f"median {statistics.median(ordered):.2f}s, "
+                f"p95 {p95:.2f}s, maks {ordered[-1]:.2f}s"
+            )
+        return "\n".join(lines)
+
+
+def _item_from_row(row: Dict[str, Any]) -> BatchItem:
+    return BatchItem(
+        posisi=str(row.get("posisi") or "").strip(),
+        perusahaan=str(row.get("perusahaan") or "").strip(),
+        sumber_lowongan=str(row.get("sumber_lowongan") or "").strip(),
+        job_url=str(row.get("job_url") or "").strip(),
+        job_desc=str(row.get("job_desc") or "").strip(),
+        email_tujuan=str(row.get("email_tujuan") or row.get("email") or "").strip(),
+    )
+
+
+def load_batch_items(path: str) -> List[BatchItem]:
+    # Format ditentukan dari ekstensi file: .jsonl untuk JSON Lines, selain itu CSV
+    rows: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    rows.append(json.loads(line))
+        else:
+            rows.extend(csv.DictReader(f))
+
+    items: List[BatchItem] = []
+    for line_no, row in enumerate(rows, start=1):
+        item = _item_from_row(row)
+        if not item.posisi or not item.perusahaan:
+            print(f"Baris {line_no} dilewati: posisi dan perusahaan wajib diisi.")
+            continue
+        items.append(item)
+    return items
+
+
+def _generate_one(
+    index: int,
+    item: BatchItem,
+    config: Dict[str, Any],
+    cv_text: Optional[str],
+    writing_style: str,
+    scorer: MatchScorer,
+) -> BatchResult:
+    started = time.perf_counter()
+    result = BatchResult(index=index, item=item)
+    try:
+        job_desc_text: Optional[str] = item.job_desc or None
+        if not job_desc_text and item.job_url:
+            job_desc_text = scrape_job_description(item.job_url)
+
+        data = generate_cover_letter(
+            config,
+            item.posisi,
+            item.perusahaan,
+            item.sumber_lowongan,
+            cv_text,
+            job_desc_text,
+            writing_style,
+        )
+        result.cover_letter = data.get("cover_letter", "")
+        result.match_score = data.get("match_score", 0)
+        if job_desc_text:
+            # Skor lokal yang deterministik menggantikan skor dari AI
+            local_match = scorer.score(job_desc_text)
+            result.match_score = local_match.score
+            result.missing_keywords = local_match.missing_keywords
+        if not result.cover_letter or result.cover_letter == FAILED_COVER_LETTER:
+            result.error = "Gagal membuat surat lamaran."
+    except Exception as e:
+        result.error = str(e)
+    result.latency_s = time.perf_counter() - started
+    return result
+
+
+def generate_batch(
+    config: Dict[str, Any],
+    items: Iterable[BatchItem],
+    cv_text: Optional[str],
+    output_path: str,
+    max_workers: int = 4,
+    writing_style: str = "Formal",
+) -> BatchReport:
+    items = list(items)
+    report = BatchReport(total=len(items))
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    scorer = MatchScorer(cv_text, skills_from_config(config))
+    write_lock = threading.Lock()
+    started = time.perf_counter()
+    with open(output_path, "w", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=max(1, max_workers)
+    ) as executor:
+        futures = [
+            executor.submit(
+                _generate_one, index, item, config, cv_text, writing_style, scorer
+            )
+            for index, item in enumerate(items)
+        ]
+        # Hasil ditulis segera setelah setiap item selesai, tidak menunggu seluruh batch
+        for future in as_completed(futures):
+            result = future.result()
+            with write_lock:
+                out.write(json.dumps(result.to_record(), ensure_ascii=False) + "\n")
+                out.flush()
+            report.latencies.append(result.latency_s)
+            if result.ok:
+                report.succeeded += 1
+            else:
+                report.failed += 1
+                print(
+                    f"Gagal: {result.item.perusahaan} ({result.item.posisi}) - {result.error}"
+                )
+    report.elapsed_s = time.perf_counter() - started
+    return report
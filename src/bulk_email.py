@@ -0,0 +1,252 @@
+import csv
+import io
+import json
+import os
+import queue
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.attachments import AttachmentSource, letter_attachment
+from src.email_outbox import DEFAULT_RATE_PER_MINUTE, RateLimiter, is_permanent_error
+from src.email_sender import SMTPConnection, SMTPSettings, build_message, smtp_settings_from_env
+from src.history_manager import (
+    STATUS_SENT,
+    GenerationRecord,
+    hash_job_description,
+    save_letter,
+    update_status,
+)
+
+DEFAULT_MAX_CONNECTIONS: int = 2
+DEFAULT_MAX_ATTEMPTS: int = 2
+
+
+@dataclass
+class BulkEmail:
+    to_email: str
+    subject: str
+    body: str
+    attachments: List[AttachmentSource] = field(default_factory=list)
+    # Baris riwayat lamaran yang ditandai "sent" setelah email terkirim
+    application_id: Optional[int] = None
+
+
+@dataclass
+class DeliveryResult:
+    index: int
+    to_email: str
+    subject: str
+    status: str = "failed"
+    attempts: int = 0
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "sent"
+
+
+@dataclass
+class DeliveryReport:
+    total: int = 0
+    results: List[DeliveryResult] = field(default_factory=list)
+    elapsed_s: float = 0.0
+    connections: int = 0
+
+    @property
+    def sent(self) -> int:
+        return sum(result.ok for result in self.results)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.sent
+
+    def summary(self) -> str:
+        lines = [
+            f"Total email      : {self.total}",
+            f"Terkirim / gagal : {self.sent} / {self.failed}",
+            f"Koneksi SMTP     : {self.connections}",
+            f"Waktu total      : {self.elapsed_s:.1f} detik",
+        ]
+        durations = [result.elapsed_ms for result in self.results if result.ok]
+        if durations:
+            lines.append(
+                f"Waktu per email  : rata-rata {statistics.mean(durations):.0f} ms, "
+                f"maks {max(durations):.0f} ms"
+            )
+        return "\n".join(lines)
+
+    def to_csv(self) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["index", "to_email", "subject", "status", "attempts", "elapsed_ms", "error"])
+        for result in self.results:
+            writer.writerow(
+                [
+                    result.index,
+                    result.to_email,
+                    result.subject,
+                    result.status,
+                    result.attempts,
+                    round(result.elapsed_ms),
+                    result.error or "",
+                ]
+            )
+        return buffer.getvalue()
+
+    def write_csv(self, path: str) -> None:
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(self.to_csv())
+
+
+def bulk_emails_from_batch(
+    path: str,
+    config: Dict[str, Any],
+    attachments: Optional[List[AttachmentSource]] = None,
+    record_history: bool = False,
+    attach_letter: bool = True,
+) -> List[BulkEmail]:
+    # Membaca hasil batch.py (JSONL); baris yang gagal dibuat atau tanpa email_tujuan dilewati.
+    # record_history mencatat setiap surat ke riwayat (sekali per surat) agar statusnya ikut diperbarui.
+    emails: List[BulkEmail] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            to_email = str(record.get("email_tujuan") or "").strip()
+            if record.get("error") or not record.get("cover_letter") or not to_email:
+                print(f"Baris {line_no} dilewati: surat gagal dibuat atau email_tujuan kosong.")
+                continue
+            application_id: Optional[int] = None
+            if record_history:
+                application_id = save_letter(
+                    GenerationRecord(
+                        company=str(record.get("perusahaan") or ""),
+                        position=str(record.get("posisi") or ""),
+                        letter_text=record["cover_letter"],
+                        job_url=record.get("job_url") or None,
+                        job_desc_hash=hash_job_description(record.get("job_desc")),
+                        match_score=record.get("match_score"),
+                    )
+                )
+            email_attachments: List[AttachmentSource] = []
+            if attach_letter:
+                # Surat juga dilampirkan sebagai PDF, dirender sekali per isi surat
+                email_attachments.append(
+                    letter_attachment(
+                        str(record.get("perusahaan") or ""),
+                        str(record.get("posisi") or ""),
+                        record["cover_letter"],
+                    )
+                )
+            email_attachments.extend(attachments or [])
+            emails.append(
+                BulkEmail(
+                    to_email=to_email,
+                    subject=f"Lamaran Kerja - {record.get('posisi', '')} - {config.get('nama', '')}",
+                    body=record["cover_letter"],
+                    attachments=email_attachments,
+                    application_id=application_id,
+                )
+            )
+    return emails
+
+
+def _deliver(
+    index: int,
+    email: BulkEmail,
+    from_email: str,
+    smtp: SMTPConnection,
+    limiter: RateLimiter,
+    max_attempts: int,
+) -> DeliveryResult:
+    result = DeliveryResult(index=index, to_email=email.to_email, subject=email.subject)
+    started = time.perf_counter()
+    try:
+        msg = build_message(email.subject, email.body, email.to_email, from_email, email.attachments)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    for attempt in range(1, max(1, max_attempts) + 1):
+        limiter.wait()
+        result.attempts = attempt
+        try:
+            smtp.send(msg)
+        except Exception as e:
+            # Koneksi bisa dalam keadaan tidak jelas setelah galat; percobaan berikutnya menyambung ulang
+            smtp.close()
+            result.error = f"{type(e).__name__}: {e}"
+            if is_permanent_error(e):
+                break
+            continue
+        result.status, result.error = "sent", None
+        break
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    if result.ok and email.application_id is not None:
+        update_status(email.application_id, STATUS_SENT)
+    return result
+
+
+def send_bulk(
+    emails: Iterable[BulkEmail],
+    from_email: str,
+    settings: Optional[SMTPSettings] = None,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    on_progress: Optional[Callable[[int, int, DeliveryResult], None]] = None,
+) -> DeliveryReport:
+    emails = list(emails)
+    report = DeliveryReport(total=len(emails))
+    if not emails:
+        return report
+    settings = settings or smtp_settings_from_env(from_email)
+    # Batas laju berlaku untuk seluruh koneksi bersama, bukan per koneksi
+    limiter = RateLimiter(rate_per_minute)
+    pending: "queue.Queue[int]" = queue.Queue()
+    for index in range(len(emails)):
+        pending.put(index)
+    finished: "queue.Queue[DeliveryResult]" = queue.Queue()
+    connections = [
+        SMTPConnection(replace(settings)) for _ in range(min(max(1, max_connections), len(emails)))
+    ]
+
+    def worker(smtp: SMTPConnection) -> None:
+        # Setiap worker memakai satu koneksi untuk banyak email secara berurutan
+        with smtp:
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except queue.Empty:
+                    return
+                finished.put(_deliver(index, emails[index], from_email, smtp, limiter, max_attempts))
+
+    started = time.perf_counter()
+    results: List[DeliveryResult] = []
+    with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+        futures = [executor.submit(worker, smtp) for smtp in connections]
+        # Progres dilaporkan dari thread pemanggil (mis. skrip Streamlit), bukan dari worker
+        while len(results) < len(emails):
+            try:
+                result = finished.get(timeout=0.5)
+            except queue.Empty:
+                # Worker berhenti tanpa menyisakan hasil (mis. galat tak terduga): jangan menunggu selamanya
+                if all(future.done() for future in futures) and finished.empty():
+                    break
+                continue
+            results.append(result)
+            if on_progress is not None:
+                on_progress(len(results), len(emails), result)
+        for future in futures:
+            future.result()
+    report.elapsed_s = time.perf_counter() - started
+    report.results = sorted(results, key=lambda result: result.index)
+    report.connections = sum(smtp.connects for smtp in connections)
+    return report
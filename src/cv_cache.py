@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.cv_parser import (
+    CVProfile,
+    PdfSource,
+    extract_text_from_pdf,
+    get_cv_profile,
+    read_pdf_bytes,
+    remember_cv_profile,
+)
+from src.paths import project_path
+
+
+class CVCache:
+    """Cache hasil parsing CV per hash SHA-256 isi PDF: di memori untuk sesi berjalan, di SQLite antar restart."""
+
+    def __init__(
+        self,
+        path: str = project_path("cv_cache.db"),
+        max_entries: int = 200,
+        memory_entries: int = 16,
+        enabled: bool = True,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.enabled = enabled
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS parsed_cv (
+                    digest TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_parsed_cv_last_accessed "
+                "ON parsed_cv (last_accessed)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, digest: str, payload: Dict[str, Any]) -> None:
+        self._memory[digest] = payload
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            payload = self._memory.get(digest)
+            if payload is not None:
+                self._memory.move_to_end(digest)
+                self.memory_hits += 1
+                return payload
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT payload FROM parsed_cv WHERE digest = ?", (digest,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE parsed_cv SET last_accessed = ? WHERE digest = ?",
+                    (time.time(), digest),
+                )
+                conn.commit()
+                payload = json.loads(row[0])
+            except (sqlite3.Error, ValueError) as e:
+                print(f"Error membaca cache CV: {e}")
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(digest, payload)
+            return payload
+
+    def set(self, digest: str, payload: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._remember(digest, payload)
+            try:
+                conn = self._connection()
+                now = time.time()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO parsed_cv (digest, payload, created_at, last_accessed)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    (digest, json.dumps(payload, ensure_ascii=False), now, now),
+                )
+                conn.execute(
+                    """
+                    DELETE FROM parsed_cv WHERE digest IN (
+                        SELECT digest FROM parsed_cv
+                        ORDER BY last_accessed DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                """,
+                    (self.max_entries,),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error menyimpan cache CV: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            try:
+                conn = self._connection()
+                conn.execute("DELETE FROM parsed_cv")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error mengosongkan cache CV: {e}")
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_cache: Optional[CVCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cv_cache() -> CVCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CVCache(
+                path=project_path(os.getenv("CV_CACHE_PATH") or "cv_cache.db"),
+                max_entries=int(os.getenv("CV_CACHE_MAX_ENTRIES", "200")),
+                enabled=os.getenv("CV_CACHE_DISABLED", "").lower() not in ("1", "true", "yes"),
+            )
+        return _default_cache
+
+
+def load_cv_profile(pdf_source: PdfSource, cache: Optional[CVCache] = None) -> Optional[CVProfile]:
+    cache = cache or get_cv_cache()
+    try:
+        data = read_pdf_bytes(pdf_source)
+    except OSError as e:
+        print(f"Error reading PDF: {e}")
+        return None
+
+    digest = CVCache.digest(data)
+    cached = cache.get(digest)
+    if cached is not None and "sections" in cached:
+        return remember_cv_profile(CVProfile.from_dict(cached))
+
+    text = cached.get("text") if cached is not None else extract_text_from_pdf(data)
+    if text is None:
+        return None
+    # Teks dan bagian/keahlian hasil parsing disimpan bersama agar tidak dihitung ulang
+    profile = get_cv_profile(text)
+    cache.set(digest, profile.to_dict())
+    return profile
+
+
+def load_cv_text(pdf_source: PdfSource, cache: Optional[CVCache] = None) -> Optional[str]:
+    profile = load_cv_profile(pdf_source, cache)
+    return profile.raw_text if profile is not None else None
@@ -1,18 +1,357 @@
-from typing import Optional
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import PyPDF2
 
+from src.text_utils import tokenize
 
-def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
-    text = ""
-    try:
-        with open(pdf_path, "rb") as file:
+PdfSource = Union[str, bytes, memoryview, BinaryIO]
+
+# Di bawah jumlah halaman ini biaya menyalakan proses lebih besar daripada manfaatnya
+PARALLEL_MIN_PAGES: int = 8
+
+
+def read_pdf_bytes(pdf_source: PdfSource) -> bytes:
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return bytes(pdf_source)
+    if isinstance(pdf_source, str):
+        with open(pdf_source, "rb") as file:
+            return file.read()
+    if hasattr(pdf_source, "seek"):
+        pdf_source.seek(0)
+    return pdf_source.read()
+
+
+def _page_text(page: PyPDF2.PageObject) -> str:
+    # extract_text() mahal; panggil tepat sekali per halaman
+    return page.extract_text() or ""
+
+
+def iter_pdf_pages(pdf_source: PdfSource) -> Iterator[str]:
+    if isinstance(pdf_source, str):
+        with open(pdf_source, "rb") as file:
             reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                page = reader.pages[page_num]
-                if page.extract_text():
-                    text += page.extract_text()
-        return text
+            for page in reader.pages:
+                yield _page_text(page)
+        return
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        pdf_source = io.BytesIO(pdf_source)
+    reader = PyPDF2.PdfReader(pdf_source)
+    for page in reader.pages:
+        yield _page_text(page)
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    # Dijalankan di proses pekerja: setiap proses membuka salinan PDF-nya sendiri
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [_page_text(reader.pages[i]) for i in range(start, stop)]
+
+
+def _extract_parallel(data: bytes, page_count: int, max_workers: int) -> List[str]:
+    chunk = -(-page_count // max_workers)
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_extract_page_range, data, start, stop) for start, stop in ranges
+        ]
+        return [text for future in futures for text in future.result()]
+
+
+def extract_text_from_pdf(
+    pdf_source: PdfSource, max_workers: Optional[int] = None
+) -> Optional[str]:
+    try:
+        pages: Iterable[str]
+        if max_workers and max_workers > 1:
+            # Halaman disebar ke beberapa proses untuk CV/portofolio yang panjang
+            data = read_pdf_bytes(pdf_source)
+            page_count = len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+            workers = min(max_workers, page_count, os.cpu_count() or 1)
+            if page_count >= PARALLEL_MIN_PAGES and workers > 1:
+                pages = _extract_parallel(data, page_count, workers)
+            else:
+                pages = iter_pdf_pages(data)
+        else:
+            pages = iter_pdf_pages(pdf_source)
+        return "\n".join(text for text in pages if text)
     except Exception as e:
         print(f"Error reading PDF: {e}")
         return None
+
+
+# Judul bagian CV per jenis. Judul ditulis kapital dan sering muncul dengan spasi antarhuruf
+# ("K E T E R A M P I L A N") atau menempel pada teks sebelumnya karena tata letak PDF.
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": ("TENTANG SAYA", "PROFIL", "RINGKASAN", "SUMMARY", "ABOUT ME", "PROFILE"),
+    "experience": ("PENGALAMAN", "RIWAYAT PEKERJAAN", "EXPERIENCE", "EMPLOYMENT"),
+    "education": ("PENDIDIKAN", "EDUCATION"),
+    "skills": ("KETERAMPILAN", "KEAHLIAN", "SKILLS", "KOMPETENSI"),
+    "projects": ("PROYEK", "PORTOFOLIO", "PROJECTS", "PORTFOLIO"),
+    "certifications": ("SERTIFIKAT", "SERTIFIKASI", "PELATIHAN", "CERTIFICATIONS", "TRAINING"),
+    "languages": ("BAHASA", "LANGUAGES"),
+}
+# Kata pelengkap setelah judul ("PENGALAMAN KERJA", "PENDIDIKAN FORMAL")
+HEADING_SUFFIXES: Tuple[str, ...] = ("KERJA", "ORGANISASI", "KEAHLIAN", "FORMAL", "PROFESIONAL")
+# Urutan bagian saat CV diringkas untuk prompt
+PROMPT_SECTIONS: Tuple[str, ...] = (
+    "summary",
+    "experience",
+    "skills",
+    "education",
+    "projects",
+    "certifications",
+    "languages",
+)
+
+_PERIOD_RE = re.compile(
+    r"(?:[A-Za-z]+\.?\s*)?(?:19|20)\d{2}\s*[-–—]\s*(?:(?:[A-Za-z]+\.?\s*)?(?:19|20)\d{2}|sekarang|saat ini|present|now)",
+    re.IGNORECASE,
+)
+_BULLET_RE = re.compile(r"^[\s\-–•●▪*]+")
+_LABEL_RE = re.compile(r"^([^:]{2,60}):\s*(.*)$")
+_LINE_SPACE_RE = re.compile(r"[ \t\u00a0]+")
+
+
+# Bagian yang dikenali harus mencakup setidaknya porsi CV ini; jika tidak, teks asli yang dikirim
+MIN_SECTION_COVERAGE: float = 0.5
+_INLINE_SPACE: str = r"[^\S\n]*"
+
+
+def _heading_pattern(heading: str) -> str:
+    # Huruf terakhir opsional: PyPDF2 kadang memotong huruf terakhir judul bergaya
+    letters = [re.escape(c) for c in heading.replace(" ", "")]
+    return _INLINE_SPACE.join(letters[:-1]) + _INLINE_SPACE + letters[-1] + "?"
+
+
+def _heading_alternatives(headings: Iterable[str]) -> str:
+    return (
+        f"(?:{_heading_pattern('RIWAYAT')}{_INLINE_SPACE})?"
+        f"(?:{'|'.join(_heading_pattern(h) for h in headings)})"
+        f"(?:{_INLINE_SPACE}(?:{'|'.join(_heading_pattern(w) for w in HEADING_SUFFIXES)}))?"
+    )
+
+
+# Judul hanya diterima bila berdiri sendiri satu baris, agar kata seperti "Bahasa" atau
+# "SOFT SKILLS:" di tengah kalimat tidak memotong CV
+_HEADING_RE = re.compile(
+    "|".join(
+        rf"^{_INLINE_SPACE}(?P<{name}>{_heading_alternatives(headings)}){_INLINE_SPACE}:?{_INLINE_SPACE}$"
+        for name, headings in SECTION_HEADINGS.items()
+    ),
+    re.MULTILINE | re.IGNORECASE,
+)
+# Judul kapital yang menempel tanpa spasi pada teks sebelumnya ("Kulon ProgoTENTANG SAYASaya"),
+# diakhiri akhir baris atau langsung disambung kata berhuruf kapital
+_GLUED_HEADING_RE = re.compile(
+    rf"(?<=[a-z0-9.,;)])(?:{_heading_alternatives(h for hs in SECTION_HEADINGS.values() for h in hs)})"
+    rf"(?={_INLINE_SPACE}$|[A-Z][a-z])",
+    re.MULTILINE,
+)
+
+
+@dataclass
+class CVSection:
+    __slots__ = ("name", "title", "text")
+    name: str
+    title: str
+    text: str
+
+
+@dataclass
+class CVSkill:
+    __slots__ = ("name", "category", "detail")
+    name: str
+    category: str
+    detail: str
+
+
+@dataclass
+class CVEntry:
+    __slots__ = ("title", "period", "details")
+    title: str
+    period: str
+    details: List[str]
+
+
+@dataclass
+class CVProfile:
+    """Representasi CV terstruktur yang dibangun sekali dan dipakai ulang oleh prompt, skor, dan saran."""
+
+    __slots__ = ("raw_text", "header", "sections", "skills", "experience", "education", "terms")
+    raw_text: str
+    header: str
+    sections: List[CVSection]
+    skills: List[CVSkill]
+    experience: List[CVEntry]
+    education: List[CVEntry]
+    terms: FrozenSet[str]
+
+    def section(self, name: str) -> str:
+        return "\n".join(s.text for s in self.sections if s.name == name)
+
+    def skill_names(self) -> List[str]:
+        return [skill.name for skill in self.skills]
+
+    def to_prompt_text(self, section_names: Sequence[str] = PROMPT_SECTIONS) -> str:
+        # Tanpa bagian yang cukup dikenali (CV tidak baku), kirim teks asli apa adanya
+        covered = sum(len(s.text) for s in self.sections)
+        if covered < MIN_SECTION_COVERAGE * len(self.raw_text.strip()):
+            return self.raw_text
+        parts: List[str] = [self.header] if self.header else []
+        for name in section_names:
+            text = self.section(name)
+            if text:
+                parts.append(f"[{name.upper()}]\n{text}")
+        return "\n\n".join(parts) or self.raw_text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "raw_text": self.raw_text,
+            "header": self.header,
+            "sections": [[s.name, s.title, s.text] for s in self.sections],
+            "skills": [[s.name, s.category, s.detail] for s in self.skills],
+            "experience": [[e.title, e.period, e.details] for e in self.experience],
+            "education": [[e.title, e.period, e.details] for e in self.education],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CVProfile":
+        raw_text = data.get("raw_text", "")
+        return cls(
+            raw_text=raw_text,
+            header=data.get("header", ""),
+            sections=[CVSection(*s) for s in data.get("sections", [])],
+            skills=[CVSkill(*s) for s in data.get("skills", [])],
+            experience=[CVEntry(*e) for e in data.get("experience", [])],
+            education=[CVEntry(*e) for e in data.get("education", [])],
+            terms=frozenset(tokenize(raw_text)),
+        )
+
+
+def _clean_lines(text: str) -> List[str]:
+    lines: List[str] = []
+    for line in text.splitlines():
+        line = _LINE_SPACE_RE.sub(" ", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _join_wrapped(lines: List[str]) -> List[str]:
+    # Baris PDF yang terpotong di tengah kalimat digabung dengan baris sebelumnya
+    joined: List[str] = []
+    for line in lines:
+        is_item = bool(_BULLET_RE.match(line)) or bool(_PERIOD_RE.search(line))
+        continues = line[:1].islower() or line[:1] in ",.;)&"
+        if joined and not is_item and continues:
+            joined[-1] = f"{joined[-1]} {line}"
+        else:
+            joined.append(_BULLET_RE.sub("", line) if is_item else line)
+    return joined
+
+
+def _split_sections(text: str) -> Tuple[str, List[CVSection]]:
+    text = _GLUED_HEADING_RE.sub(lambda m: f"\n{m.group(0)}\n", text)
+    matches = list(_HEADING_RE.finditer(text))
+    header = text[: matches[0].start()] if matches else text
+    sections: List[CVSection] = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = "\n".join(_join_wrapped(_clean_lines(text[match.end() : end])))
+        if not body:
+            continue
+        title = re.sub(r"\s+", "", match.group(0))
+        sections.append(CVSection(match.lastgroup or "", title, body))
+    return "\n".join(_clean_lines(header)), sections
+
+
+def _parse_skills(text: str) -> List[CVSkill]:
+    skills: List[CVSkill] = []
+    category = ""
+    for line in text.splitlines():
+        label = _LABEL_RE.match(line)
+        if label:
+            skills.append(CVSkill(label.group(1).strip(), category, label.group(2).strip()))
+        elif (
+            skills
+            and skills[-1].detail
+            and not skills[-1].detail.endswith(".")
+            and ("," in line or len(line.split()) > 3 or line[:1].islower())
+        ):
+            # Lanjutan deskripsi keahlian yang terpotong ke baris berikutnya
+            skills[-1].detail = f"{skills[-1].detail} {line}"
+        elif len(line.split()) <= 3 and not line.endswith("."):
+            # Baris pendek tanpa titik dua dianggap subjudul (mis. "Teknis", "Non-Teknis")
+            # kecuali bagian ini berupa daftar keahlian satu kata per baris
+            if "," in line:
+                skills.extend(CVSkill(part.strip(), category, "") for part in line.split(",") if part.strip())
+            else:
+                category = line
+        else:
+            skills.extend(
+                CVSkill(part.strip(), category, "")
+                for part in re.split(r"[,;|]", line)
+                if part.strip() and len(part.split()) <= 4
+            )
+    if not skills and category:
+        # Daftar keahlian satu per baris tanpa subjudul
+        skills = [CVSkill(line, "", "") for line in text.splitlines() if len(line.split()) <= 3]
+    return skills
+
+
+def _parse_entries(text: str) -> List[CVEntry]:
+    entries: List[CVEntry] = []
+    for line in text.splitlines():
+        period = _PERIOD_RE.search(line)
+        if period or not entries:
+            title = re.sub(r"\(\s*\)", "", _PERIOD_RE.sub("", line)).strip(" |,-–") if period else line
+            entries.append(CVEntry(title, period.group(0) if period else "", []))
+        else:
+            entries[-1].details.append(line)
+    return [entry for entry in entries if entry.period or entry.details]
+
+
+def parse_cv_profile(cv_text: str) -> CVProfile:
+    header, sections = _split_sections(cv_text)
+    skills = [s for section in sections if section.name == "skills" for s in _parse_skills(section.text)]
+    experience = [e for section in sections if section.name == "experience" for e in _parse_entries(section.text)]
+    education = [e for section in sections if section.name == "education" for e in _parse_entries(section.text)]
+    return CVProfile(
+        raw_text=cv_text,
+        header=header,
+        sections=sections,
+        skills=skills,
+        experience=experience,
+        education=education,
+        terms=frozenset(tokenize(cv_text)),
+    )
+
+
+_profiles: "OrderedDict[str, CVProfile]" = OrderedDict()
+_profiles_lock = threading.Lock()
+MAX_CACHED_PROFILES: int = 32
+
+
+def remember_cv_profile(profile: CVProfile) -> CVProfile:
+    with _profiles_lock:
+        _profiles[profile.raw_text] = profile
+        _profiles.move_to_end(profile.raw_text)
+        while len(_profiles) > MAX_CACHED_PROFILES:
+            _profiles.popitem(last=False)
+    return profile
+
+
+def get_cv_profile(cv_text: str) -> CVProfile:
+    # CV yang sama diparse sekali, lalu dipakai ulang oleh setiap prompt dan skor
+    with _profiles_lock:
+        profile = _profiles.get(cv_text)
+        if profile is not None:
+            _profiles.move_to_end(cv_text)
+            return profile
+    return remember_cv_profile(parse_cv_profile(cv_text))
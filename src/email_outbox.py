@@ -0,0 +1,376 @@
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.email_sender import SMTPConnection, SMTPSettings, smtp_settings_from_env
+from src.history_manager import STATUS_SENT as APPLICATION_SENT, update_status
+from src.paths import project_path
+
+STATUS_QUEUED: str = "queued"
+STATUS_SENDING: str = "sending"
+STATUS_SENT: str = "sent"
+STATUS_FAILED: str = "failed"
+
+DEFAULT_RATE_PER_MINUTE: float = 20.0
+DEFAULT_MAX_ATTEMPTS: int = 3
+# Jeda sebelum percobaan ulang pertama; berlipat dua di setiap percobaan berikutnya
+DEFAULT_RETRY_DELAY_S: float = 30.0
+# Koneksi SMTP ditutup bila antrean kosong selama ini, agar tidak diputus sepihak oleh server
+IDLE_DISCONNECT_S: float = 60.0
+# Email berstatus sending lebih lama dari ini dianggap milik proses yang sudah mati dan diantrekan ulang;
+# jauh di atas durasi satu pengiriman SMTP, jadi email yang masih dikirim proses lain tidak ikut diambil
+STALE_SENDING_S: float = 10 * 60
+
+_COLUMNS: str = (
+    "id, to_email, subject, status, attempts, last_error, created_at, sent_at, application_id"
+)
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    to_email: str
+    subject: str
+    status: str
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: float = 0.0
+    sent_at: Optional[float] = None
+    application_id: Optional[int] = None
+
+
+# Kolom yang ditambahkan setelah tabel outbox pertama kali dibuat
+_ADDED_COLUMNS: Tuple[Tuple[str, str], ...] = (("claimed_at", "REAL"),)
+
+
+def _migrate_columns(conn: sqlite3.Connection) -> None:
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+    for name, declaration in _ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE outbox ADD COLUMN {name} {declaration}")
+
+
+class RateLimiter:
+    """Membatasi laju pengiriman menjadi N email per menit dengan jarak yang merata; aman dipakai banyak thread."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        # Slot waktu dipesan di bawah lock, tidur dilakukan di luar lock
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    # Penerima ditolak atau balasan 5xx (termasuk autentikasi gagal) tidak akan berhasil bila diulang
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class EmailOutbox:
+    """Antrean email persisten (SQLite) yang dikirim oleh worker latar belakang lewat satu koneksi SMTP."""
+
+    def __init__(
+        self,
+        settings: SMTPSettings,
+        path: str = project_path("email_outbox.db"),
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_delay_s: float = DEFAULT_RETRY_DELAY_S,
+        poll_interval_s: float = 1.0,
+        on_sent: Optional[Callable[[OutboxMessage], None]] = None,
+        stale_after_s: float = STALE_SENDING_S,
+    ) -> None:
+        self.path = path
+        self.stale_after_s = stale_after_s
+        self.max_attempts = max_attempts
+        self.retry_delay_s = retry_delay_s
+        self.poll_interval_s = poll_interval_s
+        self.on_sent = on_sent
+        self.rate_limiter = RateLimiter(rate_per_minute)
+        self.smtp = SMTPConnection(settings)
+        self._lock = threading.Lock()
+        # Hanya satu pengirim yang memakai koneksi SMTP pada satu waktu (worker atau process_pending)
+        self._send_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_sent = 0.0
+
+    @property
+    def settings(self) -> SMTPSettings:
+        return self.smtp.settings
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    to_email TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    message BLOB NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL,
+                    sent_at REAL,
+                    application_id INTEGER
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)"
+            )
+            _migrate_columns(self._conn)
+            self._requeue_stale(self._conn)
+            self._conn.commit()
+        return self._conn
+
+    def _requeue_stale(self, conn: sqlite3.Connection) -> None:
+        # Email yang sedang dikirim saat prosesnya berhenti dikembalikan ke antrean; email yang baru
+        # saja diambil proses lain yang berbagi database dibiarkan
+        conn.execute(
+            "UPDATE outbox SET status = ? WHERE status = ? AND COALESCE(claimed_at, 0) < ?",
+            (STATUS_QUEUED, STATUS_SENDING, time.time() - self.stale_after_s),
+        )
+
+    def enqueue(self, msg: EmailMessage, application_id: Optional[int] = None) -> Optional[int]:
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    """
+                    INSERT INTO outbox (to_email, subject, message, status, created_at, next_attempt_at, application_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                    (
+                        str(msg["To"] or ""),
+                        str(msg["Subject"] or ""),
+                        msg.as_bytes(policy=policy.SMTP),
+                        STATUS_QUEUED,
+                        now,
+                        now,
+                        application_id,
+                    ),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Email outbox error: {e}")
+            return None
+        self._wake.set()
+        return cursor.lastrowid
+
+    def _claim(self) -> Optional[Tuple[int, bytes]]:
+        with self._lock:
+            conn = self._connection()
+            self._requeue_stale(conn)
+            conn.commit()
+            while True:
+                now = time.time()
+                row = conn.execute(
+                    """
+                    SELECT id, message FROM outbox WHERE status = ? AND next_attempt_at <= ?
+                    ORDER BY next_attempt_at, id LIMIT 1
+                """,
+                    (STATUS_QUEUED, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                # Proses lain yang berbagi database bisa mengambil email yang sama di antara SELECT dan
+                # UPDATE; hanya pemenang yang statusnya masih queued yang boleh mengirim
+                cursor = conn.execute(
+                    "UPDATE outbox SET status = ?, claimed_at = ? WHERE id = ? AND status = ?",
+                    (STATUS_SENDING, now, row[0], STATUS_QUEUED),
+                )
+                conn.commit()
+                if cursor.rowcount == 1:
+                    return row[0], row[1]
+
+    def _finish(self, message_id: int, error: Optional[BaseException]) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if error is None:
+                conn.execute(
+                    "UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = NULL, sent_at = ? WHERE id = ?",
+                    (STATUS_SENT, now, message_id),
+                )
+            else:
+                attempts = conn.execute(
+                    "SELECT attempts FROM outbox WHERE id = ?", (message_id,)
+                ).fetchone()[0] + 1
+                failed = is_permanent_error(error) or attempts >= self.max_attempts
+                conn.execute(
+                    "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                    (
+                        STATUS_FAILED if failed else STATUS_QUEUED,
+                        attempts,
+                        f"{type(error).__name__}: {error}",
+                        now + self.retry_delay_s * 2 ** (attempts - 1),
+                        message_id,
+                    ),
+                )
+            conn.commit()
+
+    def _process_one(self) -> bool:
+        with self._send_lock:
+            try:
+                claimed = self._claim()
+            except sqlite3.Error as e:
+                print(f"Email outbox error: {e}")
+                return False
+            if claimed is None:
+                return False
+            message_id, data = claimed
+            self.rate_limiter.wait()
+            error: Optional[BaseException] = None
+            try:
+                self.smtp.send(message_from_bytes(data, policy=policy.default))
+                self._last_sent = time.monotonic()
+            except Exception as e:
+                print(f"Gagal mengirim email #{message_id}: {e}")
+                # Koneksi bisa dalam keadaan tidak jelas setelah galat; sambung ulang di percobaan berikutnya
+                self.smtp.close()
+                error = e
+            try:
+                self._finish(message_id, error)
+            except sqlite3.Error as e:
+                print(f"Email outbox error: {e}")
+        if error is None and self.on_sent is not None:
+            message = self.get(message_id)
+            if message is not None:
+                self.on_sent(message)
+        return True
+
+    def process_pending(self, limit: Optional[int] = None) -> int:
+        # Kirim semua email yang sudah jatuh tempo secara sinkron (mis. dari CLI atau tes)
+        processed = 0
+        while (limit is None or processed < limit) and self._process_one():
+            processed += 1
+        return processed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._process_one():
+                continue
+            with self._send_lock:
+                if time.monotonic() - self._last_sent > IDLE_DISCONNECT_S:
+                    self.smtp.close()
+            self._wake.wait(self.poll_interval_s)
+            self._wake.clear()
+        with self._send_lock:
+            self.smtp.close()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get(self, message_id: int) -> Optional[OutboxMessage]:
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    f"SELECT {_COLUMNS} FROM outbox WHERE id = ?", (message_id,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Email outbox error: {e}")
+            return None
+        return OutboxMessage(*row) if row else None
+
+    def recent(self, limit: int = 10) -> List[OutboxMessage]:
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    f"SELECT {_COLUMNS} FROM outbox ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Email outbox error: {e}")
+            return []
+        return [OutboxMessage(*row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Email outbox error: {e}")
+            return {}
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _mark_application_sent(message: OutboxMessage) -> None:
+    if message.application_id is None:
+        return
+    update_status(message.application_id, APPLICATION_SENT)
+
+
+_default_outbox: Optional[EmailOutbox] = None
+_default_outbox_lock = threading.Lock()
+
+
+def get_outbox(from_email: Optional[str] = None) -> EmailOutbox:
+    global _default_outbox
+    with _default_outbox_lock:
+        if _default_outbox is None:
+            _default_outbox = EmailOutbox(
+                smtp_settings_from_env(from_email),
+                path=project_path(os.getenv("EMAIL_OUTBOX_PATH") or "email_outbox.db"),
+                rate_per_minute=float(os.getenv("SMTP_RATE_PER_MINUTE", str(DEFAULT_RATE_PER_MINUTE))),
+                max_attempts=int(os.getenv("SMTP_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS))),
+                on_sent=_mark_application_sent,
+            )
+        elif from_email and _default_outbox.settings.username != from_email:
+            # Alamat pengirim di config berubah: login ulang dengan akun yang baru
+            with _default_outbox._send_lock:
+                _default_outbox.smtp.close()
+                _default_outbox.settings.username = from_email
+        return _default_outbox
+
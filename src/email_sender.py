@@ -1,22 +1,53 @@
 import getpass
 import os
 import smtplib
+import ssl
+import time
+from dataclasses import dataclass
 from email.message import EmailMessage
-from typing import List, Optional
+from typing import Optional, Sequence
 
+from src.attachments import AttachmentSource, add_attachments
 
-def send_email_with_attachments(
+# Nilai default; dapat diganti lewat SMTP_HOST, SMTP_PORT, SMTP_SECURITY, dan SMTP_TIMEOUT_S di .env
+SMTP_HOST: str = "smtp.gmail.com"
+SMTP_PORT: int = 465
+# "ssl" (SMTPS, port 465), "starttls" (port 587), atau "none" (mis. server SMTP lokal untuk pengujian)
+SMTP_SECURITY: str = "ssl"
+SMTP_TIMEOUT_S: float = 30.0
+# Koneksi yang menganggur lebih lama dari ini dicek dengan NOOP sebelum dipakai lagi
+SMTP_IDLE_CHECK_S: float = 30.0
+
+
+@dataclass
+class SMTPSettings:
+    host: str = SMTP_HOST
+    port: int = SMTP_PORT
+    username: Optional[str] = None
+    password: Optional[str] = None
+    security: str = SMTP_SECURITY
+    timeout: float = SMTP_TIMEOUT_S
+
+
+def smtp_settings_from_env(username: Optional[str] = None) -> SMTPSettings:
+    # Dibaca saat dipanggil (bukan saat impor) agar perubahan .env / tes ikut terpakai
+    return SMTPSettings(
+        host=os.getenv("SMTP_HOST", SMTP_HOST),
+        port=int(os.getenv("SMTP_PORT", str(SMTP_PORT))),
+        username=username,
+        password=os.getenv("EMAIL_PASSWORD"),
+        security=os.getenv("SMTP_SECURITY", SMTP_SECURITY).lower(),
+        timeout=float(os.getenv("SMTP_TIMEOUT_S", str(SMTP_TIMEOUT_S))),
+    )
+
+
+def build_message(
     subject: str,
     body: str,
     to_email: str,
     from_email: str,
-    attachments: Optional[List[str]] = None,
-) -> None:
-    # TODO: Consider using environment variables or a more secure way to handle passwords
-    password = os.getenv("EMAIL_PASSWORD")
-    if not password:
-        password = getpass.getpass(f"Masukkan password untuk {from_email}: ")
-
+    attachments: Optional[Sequence[AttachmentSource]] = None,
+) -> EmailMessage:
     msg = EmailMessage()
     msg.set_content(body)
     msg["Subject"] = subject
@@ -24,27 +55,97 @@ def send_email_with_attachments(
     msg["To"] = to_email
 
     if attachments:
-        for attachment_path in attachments:
-            if os.path.exists(attachment_path):
-                try:
-                    with open(attachment_path, "rb") as f:
-                        file_data = f.read()
-                        file_name = os.path.basename(attachment_path)
-                        msg.add_attachment(
-                            file_data,
-                            maintype="application",
-                            subtype="octet-stream",
-                            filename=file_name,
-                        )
-                except Exception as e:
-                    print(f"Gagal melampirkan file {file_name}: {e}")
-            else:
-                print(f"Peringatan: File lampiran tidak ditemukan: {attachment_path}")
+        # Bagian MIME (sudah di-encode) di-cache per hash isi, jadi CV yang sama tidak dibaca dan di-encode ulang
+        add_attachments(msg, attachments)
+    return msg
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(from_email, password)
+
+class SMTPConnection:
+    """Satu koneksi SMTP terautentikasi yang dipakai ulang untuk banyak email dan tersambung ulang sebelum mengirim bila terputus."""
+
+    def __init__(self, settings: SMTPSettings, idle_check_s: float = SMTP_IDLE_CHECK_S) -> None:
+        self.settings = settings
+        self.idle_check_s = idle_check_s
+        self.connects = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        s = self.settings
+        if s.security == "ssl":
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(
+                s.host, s.port, timeout=s.timeout, context=ssl.create_default_context()
+            )
+        else:
+            smtp = smtplib.SMTP(s.host, s.port, timeout=s.timeout)
+            if s.security == "starttls":
+                smtp.starttls(context=ssl.create_default_context())
+        try:
+            if s.password:
+                smtp.login(s.username or "", s.password)
+        except BaseException:
+            smtp.close()
+            raise
+        self.connects += 1
+        return smtp
+
+    def _ensure(self) -> smtplib.SMTP:
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_check_s:
+            # Server biasanya memutus koneksi yang lama menganggur; cek dulu daripada gagal saat mengirim
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send(self, msg: EmailMessage) -> None:
+        # Sambung ulang otomatis hanya terjadi di _ensure, sebelum pengiriman dimulai. Bila koneksi
+        # putus di tengah pengiriman, server mungkin sudah menerima emailnya; jangan kirim ulang di
+        # sini agar tidak dobel, biarkan pemanggil yang menghitung percobaan dan mengulang
+        smtp = self._ensure()
+        try:
             smtp.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def __enter__(self) -> "SMTPConnection":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def send_email_with_attachments(
+    subject: str,
+    body: str,
+    to_email: str,
+    from_email: str,
+    attachments: Optional[Sequence[AttachmentSource]] = None,
+) -> None:
+    # TODO: Consider using environment variables or a more secure way to handle passwords
+    settings = smtp_settings_from_env(from_email)
+    if not settings.password and settings.security != "none":
+        settings.password = getpass.getpass(f"Masukkan password untuk {from_email}: ")
+
+    msg = build_message(subject, body, to_email, from_email, attachments)
+
+    try:
+        with SMTPConnection(settings) as smtp:
+            smtp.send(msg)
         print("Email berhasil terkirim!")
     except smtplib.SMTPAuthenticationError:
         print(
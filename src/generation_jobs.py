@@ -0,0 +1,337 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+
+from src.ai_service import (
+    FAILED_COVER_LETTER,
+    MODEL_NAME,
+    agenerate_application_bundle,
+    agenerate_cv_suggestions,
+    astream_cover_letter,
+    cover_letter_from_stream,
+    stream_follow_up_email,
+    stream_thank_you_email,
+    track_usage,
+)
+from src.artifact_store import get_artifact_store
+from src.cv_cache import load_cv_text
+from src.history_manager import GenerationRecord, hash_job_description, save_letter
+from src.job_parser import scrape_job_description
+from src.job_queue import JobContext, JobQueue, get_job_queue
+from src.match_scorer import MatchResult, score_match, skills_from_config
+from src.stream_parser import CoverLetterStreamParser
+
+JOB_COVER_LETTER: str = "cover_letter"
+JOB_THANK_YOU_EMAIL: str = "thank_you_email"
+JOB_FOLLOW_UP_EMAIL: str = "follow_up_email"
+
+# Perkiraan panjang surat (karakter), hanya untuk menaksir progres selama streaming
+EXPECTED_LETTER_CHARS: int = 2500
+MIN_JOB_DESC_CHARS: int = 50
+
+# Menjaga agar CV tidak dihapus tepat saat pekerjaan baru dengan CV yang sama dimasukkan
+_cv_lock = threading.Lock()
+
+# Klien async google-generativeai (grpc.aio) terikat pada event loop pertama yang memakainya,
+# jadi semua pekerjaan async di proses ini dijalankan di satu loop yang tidak pernah ditutup
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="generation-loop", daemon=True).start()
+        return _loop
+
+
+def _run_async(coro: Coroutine[Any, Any, Dict[str, Any]]) -> Dict[str, Any]:
+    # Worker thread menunggu hasilnya; beberapa pekerjaan tetap berjalan bersamaan di loop yang sama
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop()).result()
+
+
+async def _load_cv_and_job_desc(
+    cv_bytes: Optional[bytes], job_url: str
+) -> Tuple[Union[Optional[str], BaseException], Union[Optional[str], BaseException]]:
+    # CV yang sama (hash SHA-256 identik) diambil dari cache, tanpa parsing PDF ulang
+    cv_task = asyncio.to_thread(load_cv_text, cv_bytes) if cv_bytes else asyncio.sleep(0)
+    if not job_url:
+        return await cv_task, None
+    # return_exceptions agar kegagalan scraping tidak membatalkan parsing CV
+    cv_result, scrape_result = await asyncio.gather(
+        cv_task,
+        asyncio.to_thread(scrape_job_description, job_url),
+        return_exceptions=True,
+    )
+    return cv_result, scrape_result
+
+
+async def _generate_letter_and_suggestions(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_text: Optional[str],
+    job_desc_text: Optional[str],
+    writing_style: str,
+    on_update: Callable[[CoverLetterStreamParser], None],
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    suggestions_task: Optional[asyncio.Task] = None
+    if cv_text and job_desc_text:
+        # Saran CV diproses di latar belakang selama surat lamaran di-stream
+        suggestions_task = asyncio.create_task(
+            agenerate_cv_suggestions(cv_text, job_desc_text, config)
+        )
+    parser = CoverLetterStreamParser()
+    try:
+        async for parser in astream_cover_letter(
+            config,
+            posisi,
+            perusahaan,
+            sumber_lowongan,
+            cv_text,
+            job_desc_text,
+            writing_style,
+        ):
+            on_update(parser)
+    except BaseException:
+        if suggestions_task:
+            suggestions_task.cancel()
+        raise
+    suggestions: Optional[str] = await suggestions_task if suggestions_task else None
+    return cover_letter_from_stream(parser), suggestions
+
+
+async def _run_cover_letter(payload: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    config: Dict[str, Any] = payload["config"]
+    posisi: str = payload["posisi"]
+    perusahaan: str = payload["perusahaan"]
+    job_url: str = payload.get("job_url") or ""
+    writing_style: str = payload.get("writing_style") or "Formal"
+    warnings: List[str] = []
+
+    ctx.progress(0.05, "Membaca CV dan deskripsi pekerjaan...")
+    cv_bytes: Optional[bytes] = None
+    if payload.get("cv_path"):
+        cv_bytes = await asyncio.to_thread(get_artifact_store().read, payload["cv_path"])
+    # Deskripsi yang diisi manual diutamakan; URL hanya di-scrape bila deskripsi kosong
+    job_desc_text: Optional[str] = payload.get("job_desc") or None
+    cv_result, scrape_result = await _load_cv_and_job_desc(
+        cv_bytes, "" if job_desc_text else job_url
+    )
+    cv_text: Optional[str] = cv_result if isinstance(cv_result, str) else None
+    if not cv_text:
+        warnings.append("Gagal mengekstrak teks dari CV. Surat lamaran mungkin kurang detail.")
+    if isinstance(scrape_result, BaseException):
+        warnings.append(
+            f"Terjadi kesalahan saat scraping URL: {scrape_result}. "
+            "Isi deskripsi pekerjaan secara manual lalu buat ulang."
+        )
+    elif scrape_result:
+        job_desc_text = scrape_result
+    if not job_desc_text or len(job_desc_text.strip()) < MIN_JOB_DESC_CHARS:
+        warnings.append(
+            "Deskripsi pekerjaan kosong atau terlalu pendek. AI mungkin tidak dapat memberikan hasil yang optimal."
+        )
+
+    # Skor kecocokan dihitung lokal (deterministik) bila deskripsi pekerjaan tersedia
+    local_match: Optional[MatchResult] = None
+    if job_desc_text and job_desc_text.strip():
+        ctx.progress(0.25, "Menghitung skor kecocokan...")
+        local_match = await asyncio.to_thread(
+            score_match, cv_text, job_desc_text, skills_from_config(config)
+        )
+
+    ctx.progress(0.35, "Membuat surat lamaran dengan AI...")
+    started = time.perf_counter()
+    with track_usage() as usage:
+        if payload.get("bundle_mode") and cv_text and job_desc_text:
+            # CV dan deskripsi pekerjaan hanya dikirim sekali ke AI
+            data = await agenerate_application_bundle(
+                config, posisi, perusahaan, payload.get("sumber_lowongan", ""), cv_text, job_desc_text, writing_style
+            )
+            cv_suggestions = data.get("cv_suggestions")
+        else:
+
+            def show_progress(parser: CoverLetterStreamParser) -> None:
+                fraction = 0.35 + 0.55 * min(1.0, len(parser.letter) / EXPECTED_LETTER_CHARS)
+                ctx.progress(fraction, "Menulis surat lamaran...", partial=parser.letter)
+
+            data, cv_suggestions = await _generate_letter_and_suggestions(
+                config,
+                posisi,
+                perusahaan,
+                payload.get("sumber_lowongan", ""),
+                cv_text,
+                job_desc_text,
+                writing_style,
+                show_progress,
+            )
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    cover_letter = data.get("cover_letter") or FAILED_COVER_LETTER
+    if cover_letter == FAILED_COVER_LETTER:
+        raise RuntimeError(FAILED_COVER_LETTER)
+    match_score = local_match.score if local_match else data.get("match_score", 0)
+
+    ctx.progress(0.95, "Menyimpan ke riwayat...")
+    record = GenerationRecord(
+        company=perusahaan,
+        position=posisi,
+        letter_text=cover_letter,
+        job_url=job_url or None,
+        job_desc_hash=hash_job_description(job_desc_text),
+        match_score=match_score,
+        model=MODEL_NAME,
+        writing_style=writing_style,
+        prompt_tokens=usage.prompt_tokens,
+        output_tokens=usage.output_tokens,
+        latency_ms=latency_ms,
+    )
+    application_id = await asyncio.to_thread(save_letter, record)
+    return {
+        "cover_letter": cover_letter,
+        "match_score": match_score,
+        "matched_keywords": local_match.matched_keywords if local_match else None,
+        "missing_keywords": local_match.missing_keywords if local_match else None,
+        "cv_suggestions": cv_suggestions,
+        "application_id": application_id,
+        "file_path": record.file_path,
+        "posisi": posisi,
+        "perusahaan": perusahaan,
+        "cv_text": cv_text,
+        "job_desc_text": job_desc_text,
+        "email_subject": f"Lamaran Kerja - {posisi} - {config['nama']}",
+        "latency_ms": latency_ms,
+        "prompt_tokens": usage.prompt_tokens,
+        "output_tokens": usage.output_tokens,
+        "warnings": warnings,
+    }
+
+
+def _release_cv(queue: JobQueue, cv_path: Optional[str], job_id: Optional[int] = None) -> None:
+    # Store beralamat konten: CV yang sama bisa dipakai pekerjaan lain yang belum selesai
+    if not cv_path:
+        return
+    with _cv_lock:
+        if any(
+            job.id != job_id and (job.payload or {}).get("cv_path") == cv_path
+            for job in queue.pending(JOB_COVER_LETTER)
+        ):
+            return
+        try:
+            get_artifact_store().delete(cv_path)
+        except OSError as e:
+            print(f"Error deleting job CV: {e}")
+
+
+def run_cover_letter_job(payload: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    try:
+        return _run_async(_run_cover_letter(payload, ctx))
+    finally:
+        # CV hanya dibutuhkan selama pekerjaan berjalan
+        _release_cv(ctx.queue, payload.get("cv_path"), ctx.job.id)
+
+
+def _collect_stream(chunks: Any, ctx: JobContext, message: str) -> str:
+    parts: List[str] = []
+    for chunk in chunks:
+        parts.append(chunk)
+        ctx.progress(0.5, message, partial="".join(parts))
+    return "".join(parts)
+
+
+def run_thank_you_email_job(payload: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    config: Dict[str, Any] = payload["config"]
+    ctx.progress(0.1, "Membuat email ucapan terima kasih...")
+    text = _collect_stream(
+        stream_thank_you_email(
+            config, payload["posisi"], payload["perusahaan"], payload.get("tanggal_wawancara")
+        ),
+        ctx,
+        "Menulis email ucapan terima kasih...",
+    )
+    return {"text": text, "email_subject": f"Terima Kasih - {payload['posisi']} - {config['nama']}"}
+
+
+def run_follow_up_email_job(payload: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    config: Dict[str, Any] = payload["config"]
+    ctx.progress(0.1, "Membuat email tindak lanjut...")
+    text = _collect_stream(
+        stream_follow_up_email(
+            config, payload["posisi"], payload["perusahaan"], payload.get("tanggal_lamar")
+        ),
+        ctx,
+        "Menulis email tindak lanjut...",
+    )
+    return {
+        "text": text,
+        "email_subject": f"Tindak Lanjut Lamaran - {payload['posisi']} - {config['nama']}",
+    }
+
+
+def register_generation_jobs(queue: JobQueue) -> JobQueue:
+    queue.register(JOB_COVER_LETTER, run_cover_letter_job)
+    queue.register(JOB_THANK_YOU_EMAIL, run_thank_you_email_job)
+    queue.register(JOB_FOLLOW_UP_EMAIL, run_follow_up_email_job)
+    return queue
+
+
+def get_generation_queue() -> JobQueue:
+    # Worker ikut dijalankan lagi setelah restart, sehingga pekerjaan yang tertunda dilanjutkan
+    queue = register_generation_jobs(get_job_queue())
+    queue.start()
+    return queue
+
+
+def submit_cover_letter_job(
+    config: Dict[str, Any],
+    posisi: str,
+    perusahaan: str,
+    sumber_lowongan: str,
+    cv_data: Optional[bytes],
+    cv_name: str = "",
+    job_url: str = "",
+    job_desc: str = "",
+    writing_style: str = "Formal",
+    bundle_mode: bool = True,
+    queue: Optional[JobQueue] = None,
+    owner: Optional[str] = None,
+) -> Optional[int]:
+    queue = queue or get_generation_queue()
+    payload: Dict[str, Any] = {
+        "config": config,
+        "posisi": posisi,
+        "perusahaan": perusahaan,
+        "sumber_lowongan": sumber_lowongan,
+        "job_url": job_url,
+        "job_desc": job_desc,
+        "writing_style": writing_style,
+        "bundle_mode": bundle_mode,
+        "cv_path": None,
+        "cv_name": cv_name,
+    }
+    if not cv_data:
+        return queue.submit(JOB_COVER_LETTER, payload, owner=owner)
+    with _cv_lock:
+        # CV disimpan di store beralamat konten agar pekerjaan tetap bisa dijalankan setelah restart
+        try:
+            payload["cv_path"] = get_artifact_store().put(bytes(cv_data), suffix=".pdf").path
+        except OSError as e:
+            print(f"Error saving CV for job: {e}")
+            return None
+        job_id = queue.submit(JOB_COVER_LETTER, payload, owner=owner)
+    if job_id is None:
+        _release_cv(queue, payload["cv_path"])
+    return job_id
+
+
+def cancel_job(queue: JobQueue, job_id: int, owner: Optional[str] = None) -> bool:
+    job = queue.get(job_id, owner)
+    if job is None or not queue.cancel(job_id, owner):
+        return False
+    _release_cv(queue, (job.payload or {}).get("cv_path"), job_id)
+    return True
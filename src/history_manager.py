@@ -1,80 +1,705 @@
+import atexit
+import hashlib
+import queue
+import re
 import sqlite3
-from datetime import datetime
-from typing import Any, Dict, List
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-DB_FILE: str = "application_history.db"
+from src.artifact_store import ArtifactStore, get_artifact_store
+from src.paths import project_path
+
+DB_FILE: str = project_path("application_history.db")
+POOL_SIZE: int = 4
+BUSY_TIMEOUT_MS: int = 5000
+HISTORY_PAGE_SIZE: int = 20
+
+# Versi skema disimpan di PRAGMA user_version; setiap migrasi dijalankan tepat sekali,
+# berurutan, dalam satu transaksi bersama kenaikan versinya
+BASE_SCHEMA: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        company TEXT NOT NULL,
+        position TEXT NOT NULL,
+        file_path TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_applications_timestamp ON applications (timestamp DESC, id DESC)",
+    """
+    CREATE INDEX IF NOT EXISTS idx_applications_company
+        ON applications (company COLLATE NOCASE, timestamp DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_applications_position
+        ON applications (position COLLATE NOCASE, timestamp DESC)
+    """,
+)
+
+# Indeks teks penuh (FTS5) atas perusahaan dan posisi, disinkronkan lewat trigger
+FTS_SCHEMA: Tuple[str, ...] = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5(
+        company, position, content='applications', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN
+        INSERT INTO applications_fts (rowid, company, position)
+        VALUES (new.id, new.company, new.position);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN
+        INSERT INTO applications_fts (applications_fts, rowid, company, position)
+        VALUES ('delete', old.id, old.company, old.position);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS applications_fts_update AFTER UPDATE ON applications BEGIN
+        INSERT INTO applications_fts (applications_fts, rowid, company, position)
+        VALUES ('delete', old.id, old.company, old.position);
+        INSERT INTO applications_fts (rowid, company, position)
+        VALUES (new.id, new.company, new.position);
+    END
+    """,
+)
+
+# Detail per generasi: teks surat (terkompresi zlib), skor, sumber lowongan, model, token, latensi
+GENERATION_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("job_url", "TEXT"),
+    ("job_desc_hash", "TEXT"),
+    ("letter_text", "BLOB"),
+    ("match_score", "INTEGER"),
+    ("model", "TEXT"),
+    ("writing_style", "TEXT"),
+    ("status", "TEXT NOT NULL DEFAULT 'generated'"),
+    ("prompt_tokens", "INTEGER"),
+    ("output_tokens", "INTEGER"),
+    ("latency_ms", "REAL"),
+)
+
+STATUS_GENERATED: str = "generated"
+STATUS_SENT: str = "sent"
+
+# Harga token (USD per 1 juta token) untuk estimasi biaya mingguan; sesuaikan dengan model yang dipakai
+PROMPT_TOKEN_PRICE_PER_1M: float = 0.075
+OUTPUT_TOKEN_PRICE_PER_1M: float = 0.30
+
+_SEARCH_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+DateLike = Union[str, date, datetime]
+
+
+@dataclass
+class HistoryPage:
+    entries: List[Dict[str, Any]] = field(default_factory=list)
+    offset: int = 0
+    limit: int = HISTORY_PAGE_SIZE
+    has_more: bool = False
+
+    @property
+    def next_offset(self) -> int:
+        return self.offset + len(self.entries)
+
+
+@dataclass
+class GenerationRecord:
+    company: str
+    position: str
+    file_path: str = ""
+    letter_text: Optional[str] = None
+    job_url: Optional[str] = None
+    job_desc_hash: Optional[str] = None
+    match_score: Optional[int] = None
+    model: Optional[str] = None
+    writing_style: Optional[str] = None
+    status: str = STATUS_GENERATED
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    latency_ms: Optional[float] = None
+    content_hash: Optional[str] = None
+
+
+def _execute_all(conn: sqlite3.Connection, statements: Iterable[str]) -> None:
+    # executescript selalu COMMIT lebih dulu, jadi pernyataan dijalankan satu per satu agar tetap di transaksi migrasi
+    for statement in statements:
+        conn.execute(statement)
+
+
+def _migrate_base_schema(conn: sqlite3.Connection) -> None:
+    _execute_all(conn, BASE_SCHEMA)
+
+
+def _migrate_full_text_search(conn: sqlite3.Connection) -> None:
+    fts_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'applications_fts'"
+    ).fetchone()
+    try:
+        _execute_all(conn, FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        # Build SQLite tanpa FTS5: pencarian jatuh ke LIKE
+        print(f"FTS5 tidak tersedia, pencarian riwayat memakai LIKE: {e}")
+        return
+    if not fts_exists:
+        # Database lama: isi indeks teks penuh dari baris yang sudah ada
+        conn.execute("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')")
+
+
+def _migrate_generation_details(conn: sqlite3.Connection) -> None:
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(applications)")}
+    for name, declaration in GENERATION_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE applications ADD COLUMN {name} {declaration}")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_applications_job_desc_hash ON applications (job_desc_hash)"
+    )
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_fts_update'").fetchone():
+        # Perubahan status kini sering terjadi; indeks teks penuh cukup diperbarui saat perusahaan/posisi berubah
+        conn.execute("DROP TRIGGER applications_fts_update")
+        conn.execute(
+            """
+            CREATE TRIGGER applications_fts_update AFTER UPDATE OF company, position ON applications BEGIN
+                INSERT INTO applications_fts (applications_fts, rowid, company, position)
+                VALUES ('delete', old.id, old.company, old.position);
+                INSERT INTO applications_fts (rowid, company, position)
+                VALUES (new.id, new.company, new.position);
+            END
+            """
+        )
+
+
+def _migrate_content_hash(conn: sqlite3.Connection) -> None:
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(applications)")}
+    if "content_hash" not in existing:
+        conn.execute("ALTER TABLE applications ADD COLUMN content_hash TEXT")
+    # Satu baris per generasi: hash yang sama tidak boleh tercatat dua kali
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_content_hash "
+        "ON applications (content_hash) WHERE content_hash IS NOT NULL"
+    )
+
+
+# Urutan tidak boleh diubah: migrasi ke-n menaikkan user_version menjadi n. Tambahkan migrasi baru di akhir.
+MIGRATIONS: Tuple[Callable[[sqlite3.Connection], None], ...] = (
+    _migrate_base_schema,
+    _migrate_full_text_search,
+    _migrate_generation_details,
+    _migrate_content_hash,
+)
+SCHEMA_VERSION: int = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    while True:
+        # BEGIN IMMEDIATE mengambil kunci tulis, sehingga proses lain yang bermigrasi bersamaan menunggu
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = schema_version(conn)
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                return version
+            MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+class ConnectionPool:
+    """Pool koneksi SQLite per proses: koneksi dibuka sekali, memakai WAL, dan skema disiapkan sekali."""
+
+    def __init__(self, path: str, size: int = POOL_SIZE) -> None:
+        self.path = path
+        # Setiap koneksi ":memory:" adalah database terpisah, jadi cukup satu koneksi bersama
+        self.size = 1 if path == ":memory:" else max(1, size)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        # SQLite hanya mengizinkan satu penulis; antrekan penulis di sini daripada menunggu "database is locked"
+        self._write_lock = threading.Lock()
+        self._schema_ready = False
+        self.fts_enabled = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        if self.path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not self._schema_ready:
+            self._setup_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    def _setup_schema(self, conn: sqlite3.Connection) -> None:
+        migrate(conn)
+        self.fts_enabled = (
+            conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_fts'").fetchone()
+            is not None
+        )
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._open()
+                self._all.append(conn)
+                return conn
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock, self.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._idle = queue.LifoQueue()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        # DB_FILE dapat diganti (mis. di tes); buat pool baru untuk path yang baru
+        if _pool is None or _pool.path != DB_FILE:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_FILE)
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(close_pool)
 
 
 def init_db() -> None:
-    conn: sqlite3.Connection | None = None
+    # Murah untuk dipanggil di setiap rerun Streamlit: skema hanya dibuat saat koneksi pertama dibuka
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                company TEXT NOT NULL,
-                position TEXT NOT NULL,
-                file_path TEXT NOT NULL
-            )
-        """)
-        conn.commit()
+        with get_pool().connection():
+            pass
     except sqlite3.Error as e:
         print(f"Error initializing database: {e}")
-    finally:
-        if conn:
-            conn.close()
 
 
-def save_application(company: str, position: str, file_path: str) -> None:
-    conn: sqlite3.Connection | None = None
+_GENERATION_FIELDS: Tuple[str, ...] = (
+    "company",
+    "position",
+    "file_path",
+    "letter_text",
+    "job_url",
+    "job_desc_hash",
+    "match_score",
+    "model",
+    "writing_style",
+    "status",
+    "prompt_tokens",
+    "output_tokens",
+    "latency_ms",
+    "content_hash",
+)
+_ENTRY_COLUMNS: str = (
+    "id, timestamp, company, position, file_path, job_url, match_score, model, writing_style, status"
+)
+
+
+def _compress_text(text: Optional[str]) -> Optional[bytes]:
+    return zlib.compress(text.encode("utf-8"), 6) if text is not None else None
+
+
+def _decompress_text(data: Optional[bytes]) -> Optional[str]:
+    return zlib.decompress(data).decode("utf-8") if data is not None else None
+
+
+def hash_job_description(text: Optional[str]) -> Optional[str]:
+    # Spasi dan huruf besar/kecil dinormalisasi agar deskripsi yang sama dari scrape berbeda tetap satu hash
+    if not text or not text.strip():
+        return None
+    normalized = _WHITESPACE_RE.sub(" ", text).strip().casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _generation_row(record: GenerationRecord, timestamp: str) -> Tuple[Any, ...]:
+    values = [getattr(record, name) for name in _GENERATION_FIELDS]
+    values[_GENERATION_FIELDS.index("letter_text")] = _compress_text(record.letter_text)
+    return (timestamp, *values)
+
+
+def generation_hash(company: str, position: str, letter_text: str) -> str:
+    key = "\0".join((company.strip(), position.strip(), letter_text))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _find_generation(conn: sqlite3.Connection, content_hash: str) -> Optional[int]:
+    row = conn.execute(
+        "SELECT id FROM applications WHERE content_hash = ?", (content_hash,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def find_generation(content_hash: str) -> Optional[int]:
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        timestamp: str = datetime.now().isoformat()
-        cursor.execute(
-            """
-            INSERT INTO applications (timestamp, company, position, file_path)
-            VALUES (?, ?, ?, ?)
-        """,
-            (timestamp, company, position, file_path),
+        with get_pool().connection() as conn:
+            return _find_generation(conn, content_hash)
+    except sqlite3.Error as e:
+        print(f"Error loading history from database: {e}")
+        return None
+
+
+def save_generations(records: Iterable[GenerationRecord]) -> List[int]:
+    # Banyak generasi disimpan dalam satu transaksi; mengembalikan id baris sesuai urutan input.
+    # Generasi dengan content_hash yang sudah tercatat tidak disisipkan lagi, id lamanya yang dikembalikan.
+    records = list(records)
+    for record in records:
+        if record.content_hash is None and record.letter_text is not None:
+            record.content_hash = generation_hash(record.company, record.position, record.letter_text)
+    timestamp: str = datetime.now().isoformat()
+    rows = [_generation_row(record, timestamp) for record in records]
+    if not rows:
+        return []
+    columns = ", ".join(("timestamp",) + _GENERATION_FIELDS)
+    placeholders = ", ".join("?" * (len(_GENERATION_FIELDS) + 1))
+    ids: List[int] = []
+    try:
+        with get_pool().transaction() as conn:
+            for record, row in zip(records, rows):
+                existing = (
+                    _find_generation(conn, record.content_hash) if record.content_hash else None
+                )
+                if existing is not None:
+                    ids.append(existing)
+                    continue
+                cursor = conn.execute(
+                    f"INSERT INTO applications ({columns}) VALUES ({placeholders})", row
+                )
+                ids.append(cursor.lastrowid)
+    except sqlite3.Error as e:
+        print(f"Error saving application to database: {e}")
+        return []
+    return ids
+
+
+def save_generation(record: GenerationRecord) -> Optional[int]:
+    ids = save_generations([record])
+    return ids[0] if ids else None
+
+
+def save_letter(record: GenerationRecord, store: Optional[ArtifactStore] = None) -> Optional[int]:
+    # Aman dipanggil di setiap rerun: generasi yang sama (hash isi) tidak ditulis ulang ke disk maupun ke DB
+    if record.letter_text is None:
+        return save_generation(record)
+    record.content_hash = record.content_hash or generation_hash(
+        record.company, record.position, record.letter_text
+    )
+    existing = find_generation(record.content_hash)
+    if existing is not None:
+        return existing
+    try:
+        record.file_path = (store or get_artifact_store()).put(record.letter_text, suffix=".txt").path
+    except OSError as e:
+        print(f"Error saving letter artifact: {e}")
+    return save_generation(record)
+
+
+def save_applications(records: Iterable[Tuple[str, str, str]]) -> int:
+    return len(
+        save_generations(
+            GenerationRecord(company=company, position=position, file_path=file_path)
+            for company, position, file_path in records
         )
-        conn.commit()
+    )
+
+
+def save_application(company: str, position: str, file_path: str) -> None:
+    if save_applications([(company, position, file_path)]):
         print(f"Riwayat lamaran disimpan ke DB: {company} - {position}")
+
+
+def update_status(application_id: int, status: str) -> bool:
+    try:
+        with get_pool().transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE applications SET status = ? WHERE id = ?", (status, application_id)
+            )
     except sqlite3.Error as e:
-        print(f"Error saving application to database: {e}")
-    finally:
-        if conn:
-            conn.close()
+        print(f"Error updating application status: {e}")
+        return False
+    return cursor.rowcount > 0
+
+
+def load_letter_text(application_id: int) -> Optional[str]:
+    try:
+        with get_pool().connection() as conn:
+            row = conn.execute(
+                "SELECT letter_text FROM applications WHERE id = ?", (application_id,)
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Error loading history from database: {e}")
+        return None
+    return _decompress_text(row[0]) if row else None
+
+
+def _row_to_entry(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "timestamp": row[1],
+        "company": row[2],
+        "position": row[3],
+        "file_path": row[4],
+        "job_url": row[5],
+        "match_score": row[6],
+        "model": row[7],
+        "writing_style": row[8],
+        "status": row[9],
+    }
+
+
+def _as_date_or_datetime(value: DateLike) -> Union[date, datetime]:
+    if isinstance(value, str):
+        return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+    return value
+
+
+def _fts_query(search: str) -> str:
+    # Setiap kata dicari sebagai prefiks; tanda kutip mencegah sintaks FTS5 dari input pengguna
+    return " ".join(f'"{token}"*' for token in _SEARCH_TOKEN_RE.findall(search))
+
+
+def _history_filters(
+    company: Optional[str],
+    position: Optional[str],
+    date_from: Optional[DateLike],
+    date_to: Optional[DateLike],
+    search: Optional[str],
+    fts_enabled: bool,
+) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if company:
+        clauses.append("company = ? COLLATE NOCASE")
+        params.append(company)
+    if position:
+        clauses.append("position LIKE ?")
+        params.append(f"%{position}%")
+    if date_from:
+        clauses.append("timestamp >= ?")
+        params.append(_as_date_or_datetime(date_from).isoformat())
+    if date_to:
+        end = _as_date_or_datetime(date_to)
+        if isinstance(end, datetime):
+            clauses.append("timestamp <= ?")
+            params.append(end.isoformat())
+        else:
+            # Tanggal akhir inklusif: sampai sebelum tengah malam hari berikutnya
+            clauses.append("timestamp < ?")
+            params.append((end + timedelta(days=1)).isoformat())
+    if search and search.strip():
+        match = _fts_query(search)
+        if fts_enabled and match:
+            clauses.append("id IN (SELECT rowid FROM applications_fts WHERE applications_fts MATCH ?)")
+            params.append(match)
+        else:
+            clauses.append("(company LIKE ? OR position LIKE ?)")
+            params.extend([f"%{search.strip()}%"] * 2)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def query_history(
+    company: Optional[str] = None,
+    position: Optional[str] = None,
+    date_from: Optional[DateLike] = None,
+    date_to: Optional[DateLike] = None,
+    search: Optional[str] = None,
+    limit: int = HISTORY_PAGE_SIZE,
+    offset: int = 0,
+) -> HistoryPage:
+    page = HistoryPage(offset=offset, limit=limit)
+    try:
+        pool = get_pool()
+        with pool.connection() as conn:
+            where, params = _history_filters(
+                company, position, date_from, date_to, search, pool.fts_enabled
+            )
+            # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+            rows = conn.execute(
+                f"""
+                SELECT {_ENTRY_COLUMNS} FROM applications
+                {where}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ? OFFSET ?
+            """,
+                (*params, limit + 1, offset),
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error loading history from database: {e}")
+        return page
+    page.entries = [_row_to_entry(row) for row in rows[:limit]]
+    page.has_more = len(rows) > limit
+    return page
+
+
+def count_history(
+    company: Optional[str] = None,
+    position: Optional[str] = None,
+    date_from: Optional[DateLike] = None,
+    date_to: Optional[DateLike] = None,
+    search: Optional[str] = None,
+) -> int:
+    try:
+        pool = get_pool()
+        with pool.connection() as conn:
+            where, params = _history_filters(
+                company, position, date_from, date_to, search, pool.fts_enabled
+            )
+            return conn.execute(f"SELECT COUNT(*) FROM applications {where}", params).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"Error loading history from database: {e}")
+        return 0
 
 
 def load_history() -> List[Dict[str, Any]]:
-    conn: sqlite3.Connection | None = None
     history: List[Dict[str, Any]] = []
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT timestamp, company, position, file_path FROM applications ORDER BY timestamp DESC"
-        )
-        rows = cursor.fetchall()
-        for row in rows:
-            history.append(
-                {
-                    "timestamp": row[0],
-                    "company": row[1],
-                    "position": row[2],
-                    "file_path": row[3],
-                }
-            )
+        with get_pool().connection() as conn:
+            rows = conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM applications ORDER BY timestamp DESC, id DESC"
+            ).fetchall()
+        history = [_row_to_entry(row) for row in rows]
     except sqlite3.Error as e:
         print(f"Error loading history from database: {e}")
-    finally:
-        if conn:
-            conn.close()
     return history
 
 
-# Panggil init_db saat modul diimpor
-init_db()
+def _aggregate_filters(
+    date_from: Optional[DateLike], date_to: Optional[DateLike], column: str
+) -> Tuple[str, List[Any]]:
+    where, params = _history_filters(None, None, date_from, date_to, None, False)
+    condition = f"{column} IS NOT NULL"
+    return (f"{where} AND {condition}" if where else f"WHERE {condition}"), params
+
+
+def latency_summary(
+    date_from: Optional[DateLike] = None, date_to: Optional[DateLike] = None
+) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"count": 0, "avg_ms": None, "min_ms": None, "max_ms": None}
+    try:
+        with get_pool().connection() as conn:
+            where, params = _aggregate_filters(date_from, date_to, "latency_ms")
+            row = conn.execute(
+                f"SELECT COUNT(*), AVG(latency_ms), MIN(latency_ms), MAX(latency_ms) FROM applications {where}",
+                params,
+            ).fetchone()
+    except sqlite3.Error as e:
+        print(f"Error loading history from database: {e}")
+        return summary
+    summary.update(count=row[0], avg_ms=row[1], min_ms=row[2], max_ms=row[3])
+    return summary
+
+
+def score_distribution(
+    bucket_size: int = 10,
+    date_from: Optional[DateLike] = None,
+    date_to: Optional[DateLike] = None,
+) -> List[Tuple[int, int]]:
+    # Pasangan (batas bawah kelompok skor, jumlah lamaran); skor 100 masuk kelompok teratas
+    bucket_size = max(1, bucket_size)
+    top = (100 - 1) // bucket_size * bucket_size
+    try:
+        with get_pool().connection() as conn:
+            where, params = _aggregate_filters(date_from, date_to, "match_score")
+            rows = conn.execute(
+                f"""
+                SELECT MIN(MAX(match_score, 0) / ? * ?, ?) AS bucket, COUNT(*) FROM applications
+                {where}
+                GROUP BY bucket ORDER BY bucket
+            """,
+                (bucket_size, bucket_size, top, *params),
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error loading history from database: {e}")
+        return []
+    return [(row[0], row[1]) for row in rows]
+
+
+def weekly_usage(
+    prompt_price_per_1m: float = PROMPT_TOKEN_PRICE_PER_1M,
+    output_price_per_1m: float = OUTPUT_TOKEN_PRICE_PER_1M,
+    date_from: Optional[DateLike] = None,
+    date_to: Optional[DateLike] = None,
+) -> List[Dict[str, Any]]:
+    # Minggu dimulai hari Senin; biaya dihitung dari jumlah token langsung di SQL
+    where, params = _history_filters(None, None, date_from, date_to, None, False)
+    try:
+        with get_pool().connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT date(timestamp, '-6 days', 'weekday 1') AS week_start,
+                       COUNT(*),
+                       COALESCE(SUM(prompt_tokens), 0),
+                       COALESCE(SUM(output_tokens), 0),
+                       AVG(latency_ms),
+                       (COALESCE(SUM(prompt_tokens), 0) * ? + COALESCE(SUM(output_tokens), 0) * ?) / 1000000.0
+                FROM applications
+                {where}
+                GROUP BY week_start ORDER BY week_start
+            """,
+                (prompt_price_per_1m, output_price_per_1m, *params),
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"Error loading history from database: {e}")
+        return []
+    return [
+        {
+            "week_start": row[0],
+            "generations": row[1],
+            "prompt_tokens": row[2],
+            "output_tokens": row[3],
+            "avg_latency_ms": row[4],
+            "cost": row[5],
+        }
+        for row in rows
+    ]
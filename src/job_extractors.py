@@ -0,0 +1,162 @@
+import html as html_lib
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.text_cleaner import HTML_PARSER, clean_text, strip_boilerplate
+
+Extractor = Callable[[str], Optional[str]]
+
+# Teks yang lebih pendek dari ini dianggap bukan deskripsi pekerjaan yang berguna
+MIN_DESCRIPTION_CHARS: int = 50
+
+_EXTRACTORS: Dict[str, Extractor] = {}
+
+_JSON_LD_RE = re.compile(
+    r"<script[^>]+type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL,
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+_BLOCK_TAG_RE = re.compile(r"<\s*(?:br|/p|/li|/div|/h\d)\s*/?>", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+def register_extractor(*hosts: str) -> Callable[[Extractor], Extractor]:
+    # Host dicocokkan sebagai sufiks, sehingga "jobstreet.co.id" juga cocok untuk "www.jobstreet.co.id"
+    def decorator(func: Extractor) -> Extractor:
+        for host in hosts:
+            _EXTRACTORS[host.lower()] = func
+        return func
+
+    return decorator
+
+
+def get_extractor(url: Optional[str]) -> Optional[Extractor]:
+    if not url:
+        return None
+    host = (urlparse(url).hostname or "").lower()
+    for registered, extractor in _EXTRACTORS.items():
+        if host == registered or host.endswith("." + registered):
+            return extractor
+    return None
+
+
+def html_fragment_to_text(fragment: str) -> str:
+    text = _BLOCK_TAG_RE.sub("\n", fragment)
+    text = html_lib.unescape(_TAG_RE.sub(" ", text))
+    lines = (_WHITESPACE_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n", "\n".join(line for line in lines if line)).strip()
+
+
+def _iter_json_ld_objects(data: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_json_ld_objects(data["@graph"])
+
+
+def _is_job_posting(obj: Dict[str, Any]) -> bool:
+    types = obj.get("@type")
+    if isinstance(types, list):
+        return "JobPosting" in types
+    return types == "JobPosting"
+
+
+def extract_json_ld(html: str) -> Optional[str]:
+    # Jalur cepat: baca JobPosting dari JSON-LD dengan regex, tanpa membangun pohon DOM
+    for match in _JSON_LD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        for obj in _iter_json_ld_objects(data):
+            if not _is_job_posting(obj):
+                continue
+            description = html_fragment_to_text(str(obj.get("description") or ""))
+            if not description:
+                continue
+            title = str(obj.get("title") or "").strip()
+            organization = obj.get("hiringOrganization")
+            company = (
+                str(organization.get("name") or "").strip()
+                if isinstance(organization, dict)
+                else ""
+            )
+            header = " - ".join(part for part in (title, company) if part)
+            return f"{header}\n{description}" if header else description
+    return None
+
+
+def _select_text(html: str, strainer: SoupStrainer, separator: str = "\n") -> Optional[str]:
+    # SoupStrainer hanya membangun sub-pohon yang cocok, bukan seluruh dokumen
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
+    element = soup.find()
+    if element is None:
+        return None
+    text = element.get_text(separator=separator, strip=True)
+    return text or None
+
+
+@register_extractor("linkedin.com")
+def extract_linkedin(html: str) -> Optional[str]:
+    return _select_text(
+        html,
+        SoupStrainer("div", class_=re.compile(r"show-more-less-html__markup|description__text")),
+    )
+
+
+@register_extractor("jobstreet.co.id", "jobstreet.com")
+def extract_jobstreet(html: str) -> Optional[str]:
+    return _select_text(html, SoupStrainer(attrs={"data-automation": "jobAdDetails"}))
+
+
+@register_extractor("glints.com")
+def extract_glints(html: str) -> Optional[str]:
+    return _select_text(
+        html, SoupStrainer("div", class_=re.compile(r"JobDescriptionsc|DraftjsReadersc"))
+    )
+
+
+@register_extractor("kalibrr.com", "kalibrr.id")
+def extract_kalibrr(html: str) -> Optional[str]:
+    return _select_text(html, SoupStrainer(attrs={"itemprop": "description"}))
+
+
+def extract_generic(html: str) -> Optional[str]:
+    # Ini adalah contoh sederhana, perlu disesuaikan dengan struktur HTML situs lowongan
+    if "job-description" in html:
+        text = _select_text(html, SoupStrainer("div", class_="job-description"), separator=" ")
+        if text:
+            return text
+
+    # Fallback: ambil teks body tanpa navigasi, banner cookie, dan footer
+    return strip_boilerplate(html) or None
+
+
+def available_extractors() -> List[str]:
+    return sorted(_EXTRACTORS)
+
+
+def extract_job_description(html: str, url: Optional[str] = None) -> Optional[str]:
+    candidates: List[Extractor] = [extract_json_ld]
+    site_extractor = get_extractor(url)
+    if site_extractor is not None:
+        candidates.append(site_extractor)
+
+    for extractor in candidates:
+        try:
+            text = extractor(html)
+        except Exception as e:
+            print(f"Extractor {extractor.__name__} gagal: {e}")
+            continue
+        if text and len(text) >= MIN_DESCRIPTION_CHARS:
+            return clean_text(text)
+    text = extract_generic(html)
+    return clean_text(text) if text else text
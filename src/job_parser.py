@@ -1,30 +1,184 @@
-from typing import Optional
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from src.job_extractors import extract_job_description
+from src.page_cache import PageCache
+from src.paths import project_path
 
-def scrape_job_description(url: str) -> Optional[str]:
-    try:
-        response = requests.get(url)
+# (connect timeout, read timeout) dalam detik
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 20.0)
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": "Mozilla/5.0 (compatible; CoverLetterBot/1.0)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+# Batas jeda antar percobaan ulang (detik); Retry-After dari server juga dipotong ke batas ini
+MAX_RETRY_WAIT_S: float = 10.0
+
+
+class _BoundedRetry(Retry):
+    """Retry yang tidak menunggu lebih lama dari MAX_RETRY_WAIT_S meskipun server meminta Retry-After besar."""
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, MAX_RETRY_WAIT_S)
+
+
+class JobScraper:
+    def __init__(
+        self,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        per_host_limit: int = 2,
+        max_workers: int = 8,
+        cache: Optional[PageCache] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.cache = cache
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_workers = max(1, max_workers)
+
+        # Satu Session dengan pool koneksi: koneksi TCP/TLS dipakai ulang antar permintaan
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        retry = _BoundedRetry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_max=MAX_RETRY_WAIT_S,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=self.max_workers,
+            pool_maxsize=self.max_workers,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _slot_for(self, url: str) -> threading.BoundedSemaphore:
+        host = (urlparse(url).hostname or "").lower()
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def fetch(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        # Batasi jumlah permintaan bersamaan ke host yang sama agar tidak membebani situs lowongan
+        with self._slot_for(url):
+            if headers:
+                response = self.session.get(url, timeout=self.timeout, headers=headers)
+            else:
+                response = self.session.get(url, timeout=self.timeout)
         response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Ini adalah contoh sederhana, perlu disesuaikan dengan struktur HTML situs lowongan
-        # Cari elemen yang mungkin berisi deskripsi pekerjaan, misalnya div dengan class tertentu
-        job_description_element = soup.find(
-            "div", class_="job-description"
-        )  # Ganti dengan class/id yang relevan
-        if job_description_element:
-            return job_description_element.get_text(separator=" ", strip=True)
-        else:
-            # Fallback: coba ambil semua teks dari body atau elemen umum lainnya
-            if soup.body:
-                return soup.body.get_text(separator=" ", strip=True)
+        return response
+
+    def _scrape_cached(self, url: str, cache: PageCache) -> Optional[str]:
+        cached = cache.get(url)
+        if cached is not None and cache.is_fresh(cached):
+            cache.hits += 1
+            return cached.description
+
+        # Halaman kedaluwarsa direvalidasi dengan permintaan kondisional (ETag / Last-Modified)
+        response = self.fetch(url, cached.conditional_headers() if cached else None)
+        if response.status_code == 304 and cached is not None:
+            # Halaman tidak berubah, tetapi deskripsi diekstrak ulang dari HTML tersimpan
+            # agar perbaikan ekstraktor ikut berlaku untuk halaman yang sudah di-cache
+            cache.revalidated += 1
+            description = extract_job_description(cached.body, url)
+            cache.put(
+                url,
+                cached.body,
+                description,
+                etag=response.headers.get("ETag") or cached.etag,
+                last_modified=response.headers.get("Last-Modified") or cached.last_modified,
+            )
+            return description
+
+        cache.misses += 1
+        description = extract_job_description(response.text, url)
+        cache.put(
+            url,
+            response.text,
+            description,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return description
+
+    def scrape(self, url: str) -> Optional[str]:
+        try:
+            if self.cache is not None:
+                return self._scrape_cached(url, self.cache)
+            response = self.fetch(url)
+            return extract_job_description(response.text, url)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching URL: {e}")
             return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching URL: {e}")
-        return None
-    except Exception as e:
-        print(f"Error parsing HTML: {e}")
-        return None
+        except Exception as e:
+            print(f"Error parsing HTML: {e}")
+            return None
+
+    def scrape_many(
+        self, urls: Iterable[str], max_workers: Optional[int] = None
+    ) -> List[Optional[str]]:
+        urls = list(urls)
+        if not urls:
+            return []
+        workers = min(max_workers or self.max_workers, len(urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.scrape, urls))
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self) -> "JobScraper":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+_default_scraper: Optional[JobScraper] = None
+_default_scraper_lock = threading.Lock()
+
+
+def get_default_scraper() -> JobScraper:
+    global _default_scraper
+    with _default_scraper_lock:
+        if _default_scraper is None:
+            cache: Optional[PageCache] = None
+            if os.getenv("JOB_PAGE_CACHE_DISABLED", "").lower() not in ("1", "true", "yes"):
+                cache = PageCache(
+                    path=project_path(os.getenv("JOB_PAGE_CACHE_PATH") or "page_cache.db"),
+                    ttl_s=float(os.getenv("JOB_PAGE_CACHE_TTL_HOURS", "24")) * 3600,
+                    max_bytes=int(float(os.getenv("JOB_PAGE_CACHE_MAX_MB", "50")) * 1024 * 1024),
+                )
+            _default_scraper = JobScraper(cache=cache)
+        return _default_scraper
+
+
+def scrape_job_description(url: str) -> Optional[str]:
+    return get_default_scraper().scrape(url)
+
+
+def scrape_many(urls: Iterable[str], max_workers: Optional[int] = None) -> List[Optional[str]]:
+    return get_default_scraper().scrape_many(urls, max_workers)
@@ -0,0 +1,215 @@
+import csv
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from src.batch_generator import BatchItem, BatchReport, generate_batch
+from src.job_extractors import extract_job_description, html_fragment_to_text
+from src.job_parser import scrape_many
+from src.match_scorer import MatchScorer, skills_from_config
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class JobPosting:
+    url: str = ""
+    posisi: str = ""
+    perusahaan: str = ""
+    sumber_lowongan: str = ""
+    description: str = ""
+    score: int = 0
+    matched_keywords: List[str] = field(default_factory=list)
+    missing_keywords: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _first(record: Dict[str, Any], *keys: str) -> str:
+    for key in keys:
+        value = record.get(key)
+        if value:
+            return str(value).strip()
+    return ""
+
+
+def _posting_from_record(record: Dict[str, Any]) -> JobPosting:
+    return JobPosting(
+        url=_first(record, "job_url", "url", "link"),
+        posisi=_first(record, "posisi", "title", "position"),
+        perusahaan=_first(record, "perusahaan", "company"),
+        sumber_lowongan=_first(record, "sumber_lowongan", "source"),
+        description=_first(record, "job_desc", "description", "deskripsi"),
+    )
+
+
+def _posting_from_html(path: str) -> JobPosting:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        html = f.read()
+    title_match = _TITLE_RE.search(html)
+    return JobPosting(
+        url=path,
+        posisi=html_fragment_to_text(title_match.group(1)) if title_match else "",
+        sumber_lowongan="File HTML",
+        description=extract_job_description(html) or "",
+    )
+
+
+def load_postings(path: str) -> List[JobPosting]:
+    # Format ditentukan dari ekstensi: .txt (satu URL per baris), .json/.jsonl, .csv, .html
+    lower = path.lower()
+    if lower.endswith((".html", ".htm")):
+        return [_posting_from_html(path)]
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if lower.endswith(".json"):
+            data = json.load(f)
+            records = data.get("jobs", []) if isinstance(data, dict) else data
+            return [_posting_from_record(record) for record in records]
+        if lower.endswith((".jsonl", ".ndjson")):
+            return [_posting_from_record(json.loads(line)) for line in f if line.strip()]
+        if lower.endswith(".csv"):
+            return [_posting_from_record(row) for row in csv.DictReader(f)]
+        return [
+            JobPosting(url=line.strip())
+            for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+def normalize_postings(postings: Iterable[JobPosting]) -> List[JobPosting]:
+    seen: set = set()
+    normalized: List[JobPosting] = []
+    for posting in postings:
+        posting.description = _WHITESPACE_RE.sub(" ", posting.description).strip()
+        if not posting.perusahaan and posting.url.startswith("http"):
+            posting.perusahaan = urlparse(posting.url).hostname or ""
+        if not posting.sumber_lowongan and posting.url.startswith("http"):
+            posting.sumber_lowongan = urlparse(posting.url).hostname or ""
+        posting.posisi = posting.posisi or "Lowongan"
+
+        # Lowongan yang sama bisa muncul di beberapa feed; cukup diproses sekali
+        key = posting.url or posting.description[:500]
+        if key in seen:
+            continue
+        seen.add(key)
+        normalized.append(posting)
+    return normalized
+
+
+def scrape_missing_descriptions(
+    postings: List[JobPosting], max_workers: int = 8
+) -> None:
+    pending = [p for p in postings if not p.description and p.url.startswith("http")]
+    if not pending:
+        return
+    descriptions = scrape_many([p.url for p in pending], max_workers)
+    for posting, description in zip(pending, descriptions):
+        if description:
+            posting.description = _WHITESPACE_RE.sub(" ", description).strip()
+        else:
+            posting.error = "Gagal mengambil deskripsi pekerjaan."
+
+
+def rank_postings(
+    postings: List[JobPosting], cv_text: Optional[str], config: Dict[str, Any]
+) -> List[JobPosting]:
+    scorer = MatchScorer(cv_text, skills_from_config(config))
+    scorable = [p for p in postings if p.description]
+    for posting, result in zip(
+        scorable, scorer.score_many([p.description for p in scorable])
+    ):
+        posting.score = result.score
+        posting.matched_keywords = result.matched_keywords
+        posting.missing_keywords = result.missing_keywords
+    # Urutan stabil: skor tertinggi dulu, lalu urutan asli di feed
+    return sorted(postings, key=lambda p: (-p.score, p.error is not None))
+
+
+def write_report(
+    path: str, ranked: List[JobPosting], selected: Iterable[JobPosting]
+) -> None:
+    generated = {id(posting) for posting in selected}
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "rank",
+                "score",
+                "posisi",
+                "perusahaan",
+                "url",
+                "matched_keywords",
+                "missing_keywords",
+                "surat_dibuat",
+                "error",
+            ]
+        )
+        for rank, posting in enumerate(ranked, start=1):
+            writer.writerow(
+                [
+                    rank,
+                    posting.score,
+                    posting.posisi,
+                    posting.perusahaan,
+                    posting.url,
+                    ", ".join(posting.matched_keywords),
+                    ", ".join(posting.missing_keywords),
+                    "ya" if id(posting) in generated else "tidak",
+                    posting.error or "",
+                ]
+            )
+
+
+def run_pipeline(
+    inputs: Iterable[str],
+    config: Dict[str, Any],
+    cv_text: Optional[str],
+    top_n: int,
+    report_path: str,
+    letters_path: str,
+    min_score: int = 0,
+    scrape_workers: int = 8,
+    generate_workers: int = 4,
+    writing_style: str = "Formal",
+) -> Optional[BatchReport]:
+    postings: List[JobPosting] = []
+    for path in inputs:
+        postings.extend(load_postings(path))
+    postings = normalize_postings(postings)
+    print(f"{len(postings)} lowongan unik dimuat.")
+
+    scrape_missing_descriptions(postings, scrape_workers)
+    ranked = rank_postings(postings, cv_text, config)
+
+    # Hanya N lowongan teratas yang dikirim ke AI
+    selected = [p for p in ranked if p.description and p.score >= min_score][:top_n]
+    batch_report: Optional[BatchReport] = None
+    if selected:
+        print(f"Membuat surat lamaran untuk {len(selected)} lowongan teratas...")
+        batch_report = generate_batch(
+            config,
+            [
+                BatchItem(
+                    posisi=p.posisi,
+                    perusahaan=p.perusahaan,
+                    sumber_lowongan=p.sumber_lowongan,
+                    job_url=p.url,
+                    job_desc=p.description,
+                )
+                for p in selected
+            ],
+            cv_text,
+            letters_path,
+            max_workers=generate_workers,
+            writing_style=writing_style,
+        )
+
+    write_report(report_path, ranked, selected)
+    return batch_report
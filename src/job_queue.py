@@ -0,0 +1,499 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.paths import project_path
+
+JOB_QUEUED: str = "queued"
+JOB_RUNNING: str = "running"
+JOB_SUCCEEDED: str = "succeeded"
+JOB_FAILED: str = "failed"
+JOB_CANCELLED: str = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+DEFAULT_WORKERS: int = 2
+# Pembaruan progres ditulis ke DB paling sering sekali per interval ini (kecuali progres akhir)
+PROGRESS_WRITE_INTERVAL_S: float = 0.5
+# Pekerjaan selesai yang lebih tua dari ini dihapus saat antrean default dibuka
+JOB_RETENTION_S: float = 7 * 24 * 3600
+# Proses yang menjalankan pekerjaan memperbarui heartbeat_at secara berkala; pekerjaan berstatus
+# running tanpa heartbeat selama STALE_JOB_S dianggap milik proses yang sudah mati dan diantrekan ulang
+HEARTBEAT_INTERVAL_S: float = 30.0
+STALE_JOB_S: float = 5 * 60
+# Token untuk melanjutkan pekerjaan dari sesi baru (mis. setelah browser di-refresh) ikut di URL,
+# jadi hanya berlaku sekali dan kedaluwarsa setelah RESUME_TOKEN_TTL_S
+RESUME_TOKEN_TTL_S: float = 30 * 60
+
+_COLUMNS: str = (
+    "id, kind, status, progress, message, partial, payload, result, error, attempts, "
+    "created_at, started_at, finished_at, owner"
+)
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    status: str
+    progress: float = 0.0
+    message: str = ""
+    # Hasil sementara selama berjalan (mis. surat yang sedang di-stream)
+    partial: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Token sesi pengirim; hanya pemiliknya yang boleh melihat payload dan hasil pekerjaan
+    owner: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+
+# Kolom yang ditambahkan setelah tabel jobs pertama kali dibuat
+_ADDED_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("owner", "TEXT"),
+    ("heartbeat_at", "REAL"),
+    ("resume_token", "TEXT"),
+    ("resume_issued_at", "REAL"),
+)
+
+
+def _migrate_columns(conn: sqlite3.Connection) -> None:
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for name, declaration in _ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {declaration}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs (owner, id)")
+
+
+def _owner_filter(owner: Optional[str]) -> Tuple[str, Tuple[str, ...]]:
+    # owner None berarti tanpa filter (worker, CLI, tes); sesi UI selalu memberikan tokennya
+    return (" AND owner = ?", (owner,)) if owner is not None else ("", ())
+
+
+def _job_from_row(row: tuple) -> Job:
+    values = list(row)
+    values[6] = json.loads(values[6]) if values[6] else None
+    values[7] = json.loads(values[7]) if values[7] else None
+    return Job(*values)
+
+
+class JobContext:
+    """Diberikan ke handler untuk melaporkan progres pekerjaan yang sedang berjalan."""
+
+    def __init__(self, queue: "JobQueue", job: Job) -> None:
+        self.queue = queue
+        self.job = job
+        self._last_write = 0.0
+
+    def progress(self, fraction: float, message: str = "", partial: Optional[str] = None) -> None:
+        now = time.monotonic()
+        if fraction < 1.0 and partial is not None and now - self._last_write < PROGRESS_WRITE_INTERVAL_S:
+            # Chunk streaming datang jauh lebih cepat daripada UI membaca; cukup tulis sesekali
+            return
+        self._last_write = now
+        self.queue._update_progress(self.job.id, max(0.0, min(1.0, fraction)), message, partial)
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Dict[str, Any]]
+
+
+class JobQueue:
+    """Antrean pekerjaan persisten (SQLite) yang dijalankan oleh sekumpulan worker thread lokal."""
+
+    def __init__(
+        self,
+        path: str = project_path("jobs.db"),
+        workers: int = DEFAULT_WORKERS,
+        poll_interval_s: float = 1.0,
+        stale_after_s: float = STALE_JOB_S,
+    ) -> None:
+        self.path = path
+        self.workers = max(1, workers)
+        self.poll_interval_s = poll_interval_s
+        self.stale_after_s = stale_after_s
+        self._handlers: Dict[str, JobHandler] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        # Pekerjaan yang sedang dijalankan proses ini, untuk heartbeat
+        self._active: Set[int] = set()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT NOT NULL DEFAULT '',
+                    partial TEXT,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+            _migrate_columns(self._conn)
+            self._requeue_stale(self._conn)
+            self._conn.commit()
+        return self._conn
+
+    def _requeue_stale(self, conn: sqlite3.Connection) -> None:
+        # Pekerjaan milik proses yang berhenti di tengah jalan diulang dari awal; respons Gemini
+        # yang sudah didapat diambil dari cache, jadi tidak dibayar dua kali. Pekerjaan yang masih
+        # dijalankan proses lain (heartbeat baru) dibiarkan.
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, progress = 0, message = '', partial = NULL
+            WHERE status = ? AND COALESCE(heartbeat_at, started_at, 0) < ?
+        """,
+            (JOB_QUEUED, JOB_RUNNING, time.time() - self.stale_after_s),
+        )
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+        self._wake.set()
+
+    def submit(self, kind: str, payload: Dict[str, Any], owner: Optional[str] = None) -> Optional[int]:
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    "INSERT INTO jobs (kind, status, payload, created_at, owner) VALUES (?, ?, ?, ?, ?)",
+                    (kind, JOB_QUEUED, json.dumps(payload, ensure_ascii=False), time.time(), owner),
+                )
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Job queue error: {e}")
+            return None
+        self._wake.set()
+        return cursor.lastrowid
+
+    def _claim(self) -> Optional[Job]:
+        kinds = list(self._handlers)
+        if not kinds:
+            return None
+        with self._lock:
+            conn = self._connection()
+            self._requeue_stale(conn)
+            conn.commit()
+            while True:
+                # Hanya jenis pekerjaan yang punya handler di proses ini yang diambil
+                row = conn.execute(
+                    f"""
+                    SELECT {_COLUMNS} FROM jobs WHERE status = ? AND kind IN ({', '.join('?' * len(kinds))})
+                    ORDER BY id LIMIT 1
+                """,
+                    (JOB_QUEUED, *kinds),
+                ).fetchone()
+                if row is None:
+                    return None
+                job = _job_from_row(row)
+                job.status, job.attempts, job.started_at = JOB_RUNNING, job.attempts + 1, time.time()
+                # Proses lain yang berbagi jobs.db bisa mengambil baris yang sama di antara SELECT dan
+                # UPDATE; hanya UPDATE yang masih melihat status queued yang memenangkan pekerjaan
+                cursor = conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, heartbeat_at = ?
+                    WHERE id = ? AND status = ?
+                """,
+                    (JOB_RUNNING, job.started_at, job.started_at, job.id, JOB_QUEUED),
+                )
+                conn.commit()
+                if cursor.rowcount == 1:
+                    break
+            self._active.add(job.id)
+        self._ensure_heartbeat()
+        return job
+
+    def _ensure_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+                return
+            self._heartbeat_thread = threading.Thread(
+                target=self._heartbeat, name="job-heartbeat", daemon=True
+            )
+            self._heartbeat_thread.start()
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(HEARTBEAT_INTERVAL_S):
+            try:
+                with self._lock:
+                    if not self._active:
+                        continue
+                    conn = self._connection()
+                    conn.executemany(
+                        "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?",
+                        [(time.time(), job_id, JOB_RUNNING) for job_id in self._active],
+                    )
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f"Job queue error: {e}")
+
+    def _update_progress(self, job_id: int, progress: float, message: str, partial: Optional[str]) -> None:
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "UPDATE jobs SET progress = ?, message = ?, partial = COALESCE(?, partial), "
+                    "heartbeat_at = ? WHERE id = ? AND status = ?",
+                    (progress, message, partial, time.time(), job_id, JOB_RUNNING),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+
+    def _finish(self, job_id: int, result_json: Optional[str], error: Optional[str]) -> None:
+        with self._lock:
+            self._active.discard(job_id)
+            conn = self._connection()
+            conn.execute(
+                """
+                UPDATE jobs SET status = ?, progress = CASE WHEN ? THEN progress ELSE 1.0 END,
+                    result = ?, error = ?, partial = NULL, finished_at = ?
+                WHERE id = ? AND status = ?
+            """,
+                (
+                    JOB_FAILED if error else JOB_SUCCEEDED,
+                    error is not None,
+                    result_json,
+                    error,
+                    time.time(),
+                    job_id,
+                    JOB_RUNNING,
+                ),
+            )
+            conn.commit()
+
+    def _process_one(self) -> bool:
+        try:
+            job = self._claim()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return False
+        if job is None:
+            return False
+        result: Optional[Dict[str, Any]] = None
+        error: Optional[str] = None
+        try:
+            result = self._handlers[job.kind](job.payload or {}, JobContext(self, job))
+        except Exception as e:
+            print(f"Pekerjaan #{job.id} ({job.kind}) gagal: {e}")
+            error = f"{type(e).__name__}: {e}"
+        result_json: Optional[str] = None
+        try:
+            result_json = json.dumps(result, ensure_ascii=False) if result is not None else None
+        except (TypeError, ValueError) as e:
+            error = f"Hasil tidak dapat disimpan: {e}"
+        try:
+            self._finish(job.id, result_json, error)
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+        return True
+
+    def process_pending(self, limit: Optional[int] = None) -> int:
+        # Jalankan semua pekerjaan yang antre secara sinkron (mis. dari CLI atau tes)
+        processed = 0
+        while (limit is None or processed < limit) and self._process_one():
+            processed += 1
+        return processed
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._process_one():
+                continue
+            self._wake.wait(self.poll_interval_s)
+            self._wake.clear()
+
+    def start(self) -> None:
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if self._threads:
+            return
+        self._stop.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def cancel(self, job_id: int, owner: Optional[str] = None) -> bool:
+        # Hanya pekerjaan yang belum diambil worker yang dapat dibatalkan
+        owner_sql, owner_args = _owner_filter(owner)
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    f"UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?{owner_sql}",
+                    (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED, *owner_args),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return False
+        return cursor.rowcount > 0
+
+    def issue_resume_token(self, job_id: int, owner: str) -> Optional[str]:
+        # Token baru menggantikan token sebelumnya; token sesi pemilik sendiri tidak pernah keluar dari server
+        token = secrets.token_urlsafe(16)
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    "UPDATE jobs SET resume_token = ?, resume_issued_at = ? WHERE id = ? AND owner = ?",
+                    (token, time.time(), job_id, owner),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return None
+        return token if cursor.rowcount > 0 else None
+
+    def resume(self, job_id: int, token: str, owner: str) -> bool:
+        # Memindahkan pekerjaan ke sesi owner bila token cocok dan belum kedaluwarsa; token langsung hangus
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    """
+                    UPDATE jobs SET owner = ?, resume_token = NULL, resume_issued_at = NULL
+                    WHERE id = ? AND resume_token = ? AND resume_issued_at >= ?
+                """,
+                    (owner, job_id, token, time.time() - RESUME_TOKEN_TTL_S),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return False
+        return cursor.rowcount > 0
+
+    def revoke_resume_token(self, job_id: int, owner: str) -> None:
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "UPDATE jobs SET resume_token = NULL, resume_issued_at = NULL WHERE id = ? AND owner = ?",
+                    (job_id, owner),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+
+    def get(self, job_id: int, owner: Optional[str] = None) -> Optional[Job]:
+        owner_sql, owner_args = _owner_filter(owner)
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE id = ?{owner_sql}", (job_id, *owner_args)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return None
+        return _job_from_row(row) if row else None
+
+    def recent(self, limit: int = 10, owner: Optional[str] = None) -> List[Job]:
+        owner_sql, owner_args = _owner_filter(owner)
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE 1 = 1{owner_sql} ORDER BY id DESC LIMIT ?",
+                    (*owner_args, limit),
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return []
+        return [_job_from_row(row) for row in rows]
+
+    def pending(self, kind: Optional[str] = None) -> List[Job]:
+        # Pekerjaan yang belum selesai (antre atau sedang berjalan)
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE status IN (?, ?) AND (? IS NULL OR kind = ?) ORDER BY id",
+                    (JOB_QUEUED, JOB_RUNNING, kind, kind),
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return []
+        return [_job_from_row(row) for row in rows]
+
+    def counts(self, owner: Optional[str] = None) -> Dict[str, int]:
+        owner_sql, owner_args = _owner_filter(owner)
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    f"SELECT status, COUNT(*) FROM jobs WHERE 1 = 1{owner_sql} GROUP BY status", owner_args
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return {}
+        return {status: count for status, count in rows}
+
+    def purge(self, max_age_s: float) -> int:
+        # Hapus pekerjaan selesai yang lebih tua dari max_age_s
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(
+                    f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATES))}) "
+                    "AND finished_at < ?",
+                    (*FINISHED_STATES, time.time() - max_age_s),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Job queue error: {e}")
+            return 0
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self.stop()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_queue: Optional[JobQueue] = None
+_default_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue(
+                path=project_path(os.getenv("JOB_QUEUE_PATH") or "jobs.db"),
+                workers=int(os.getenv("JOB_WORKERS", str(DEFAULT_WORKERS))),
+            )
+            # Payload dan hasil pekerjaan lama (teks CV, surat) tidak disimpan selamanya
+            _default_queue.purge(JOB_RETENTION_S)
+        return _default_queue
@@ -0,0 +1,126 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.cv_parser import get_cv_profile
+from src.text_utils import tokenize
+
+TOP_KEYWORDS: int = 10
+
+# Kata yang lazim di hampir semua iklan lowongan dan tidak menunjukkan keahlian
+JOB_POSTING_STOPWORDS: FrozenSet[str] = frozenset(
+    """
+    dicari mencari membutuhkan wajib menguasai memiliki mampu diutamakan minimal maksimal
+    tahun bulan kandidat pelamar lowongan kerja pekerjaan posisi perusahaan kualifikasi
+    persyaratan syarat tanggung jawab tugas membuat melakukan baik sangat kemampuan
+    looking required requirements preferred plus years year candidate candidates job
+    position company role responsibilities qualifications ability able strong good
+    """.split()
+)
+
+
+@dataclass
+class MatchResult:
+    score: int
+    matched_keywords: List[str] = field(default_factory=list)
+    missing_keywords: List[str] = field(default_factory=list)
+
+
+def skills_from_config(config: Dict[str, Any]) -> List[str]:
+    keahlian: Dict[str, List[str]] = config.get("keahlian", {})
+    return list(keahlian.get("teknis", [])) + list(keahlian.get("non_teknis", []))
+
+
+class MatchScorer:
+    """Skor kecocokan CV-lowongan yang deterministik: cakupan kata kunci lowongan berbobot TF-IDF."""
+
+    def __init__(
+        self,
+        cv_text: Optional[str] = None,
+        skills: Iterable[str] = (),
+        cv_terms: Optional[Iterable[str]] = None,
+    ) -> None:
+        # Token CV diambil dari profil CV yang sudah diparse, jadi teks mentah tidak ditokenisasi ulang
+        if cv_terms is not None:
+            terms = set(cv_terms)
+        else:
+            terms = set(get_cv_profile(cv_text).terms) if cv_text else set()
+        for skill in skills:
+            terms.update(tokenize(skill))
+        self.profile_terms = frozenset(terms)
+
+    def score(self, job_desc_text: str) -> MatchResult:
+        return self.score_many([job_desc_text])[0]
+
+    def score_many(
+        self, job_desc_texts: Sequence[str], with_keywords: bool = True
+    ) -> List[MatchResult]:
+        n_docs = len(job_desc_texts)
+        if n_docs == 0:
+            return []
+
+        vocab: Dict[str, int] = {}
+        doc_ids: List[int] = []
+        term_ids: List[int] = []
+        for doc_id, text in enumerate(job_desc_texts):
+            for token in tokenize(text or ""):
+                if token in JOB_POSTING_STOPWORDS:
+                    continue
+                term_ids.append(vocab.setdefault(token, len(vocab)))
+                doc_ids.append(doc_id)
+        if not vocab:
+            return [MatchResult(score=0) for _ in range(n_docs)]
+
+        # Matriks dokumen-term disimpan sparse (COO) agar feed besar tetap hemat memori
+        n_terms = len(vocab)
+        codes = np.asarray(doc_ids, dtype=np.int64) * n_terms + np.asarray(
+            term_ids, dtype=np.int64
+        )
+        unique_codes, counts = np.unique(codes, return_counts=True)
+        rows = unique_codes // n_terms
+        cols = unique_codes % n_terms
+
+        df = np.bincount(cols, minlength=n_terms)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+        weights = (1.0 + np.log(counts)) * idf[cols]
+
+        terms = np.empty(n_terms, dtype=object)
+        for term, index in vocab.items():
+            terms[index] = term
+        in_profile = np.fromiter(
+            (term in self.profile_terms for term in terms), dtype=bool, count=n_terms
+        )
+        matched = in_profile[cols]
+
+        total = np.bincount(rows, weights=weights, minlength=n_docs)
+        covered = np.bincount(rows, weights=weights * matched, minlength=n_docs)
+        coverage = np.divide(covered, total, out=np.zeros(n_docs), where=total > 0)
+        # Akar kuadrat mengkalibrasi cakupan mentah (yang ikut menghitung kata umum lowongan)
+        # ke rentang 0-100 yang lebih mudah dibaca
+        scores = np.rint(np.sqrt(coverage) * 100).astype(int)
+
+        if not with_keywords:
+            return [MatchResult(score=int(score)) for score in scores]
+
+        order = np.lexsort((cols, -weights, rows))
+        boundaries = np.searchsorted(rows[order], np.arange(n_docs + 1))
+        results: List[MatchResult] = []
+        for doc_id in range(n_docs):
+            doc_order = order[boundaries[doc_id] : boundaries[doc_id + 1]]
+            doc_matched = matched[doc_order]
+            doc_terms = terms[cols[doc_order]]
+            results.append(
+                MatchResult(
+                    score=int(scores[doc_id]),
+                    matched_keywords=list(doc_terms[doc_matched][:TOP_KEYWORDS]),
+                    missing_keywords=list(doc_terms[~doc_matched][:TOP_KEYWORDS]),
+                )
+            )
+        return results
+
+
+def score_match(
+    cv_text: Optional[str], job_desc_text: str, skills: Iterable[str] = ()
+) -> MatchResult:
+    return MatchScorer(cv_text, skills).score(job_desc_text)
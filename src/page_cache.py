@@ -0,0 +1,166 @@
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from src.paths import project_path
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    description: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Cache halaman lowongan di SQLite dengan TTL, revalidasi ETag/Last-Modified, dan batas ukuran LRU."""
+
+    def __init__(
+        self,
+        path: str = project_path("page_cache.db"),
+        ttl_s: float = 24 * 3600,
+        max_bytes: int = 50 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    description TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pages_last_accessed ON pages (last_accessed)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    """
+                    SELECT body, description, etag, last_modified, fetched_at
+                    FROM pages WHERE url = ?
+                """,
+                    (url,),
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE pages SET last_accessed = ? WHERE url = ?", (time.time(), url)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error membaca cache halaman: {e}")
+                return None
+        return CachedPage(
+            url=url,
+            body=zlib.decompress(row[0]).decode("utf-8"),
+            description=row[1],
+            etag=row[2],
+            last_modified=row[3],
+            fetched_at=row[4],
+        )
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.fetched_at < self.ttl_s
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        description: Optional[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        compressed = zlib.compress(body.encode("utf-8"))
+        size = len(compressed) + len((description or "").encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO pages
+                        (url, body, description, etag, last_modified, fetched_at, last_accessed, size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    (url, compressed, description, etag, last_modified, now, now, size),
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error menyimpan cache halaman: {e}")
+
+    def touch(self, url: str) -> None:
+        # Dipanggil setelah respons 304: halaman masih valid, perpanjang TTL-nya
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "UPDATE pages SET fetched_at = ?, last_accessed = ? WHERE url = ?",
+                    (now, now, url),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error memperbarui cache halaman: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT url, size FROM pages ORDER BY last_accessed ASC"
+        ).fetchall()
+        evicted = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((url,))
+            total -= size
+        conn.executemany("DELETE FROM pages WHERE url = ?", evicted)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,12 @@
+import os
+
+# Akar proyek (folder di atas src/); berkas data default tidak bergantung pada direktori kerja
+# (Streamlit, server.py, batch.py, tes)
+PROJECT_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def project_path(path: str) -> str:
+    # Path relatif dihitung dari akar proyek; path absolut dan database ":memory:" dipakai apa adanya
+    if path == ":memory:":
+        return path
+    return os.path.join(PROJECT_ROOT, path)
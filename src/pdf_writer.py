@@ -0,0 +1,113 @@
+import zlib
+from typing import List, Optional
+
+# Ukuran A4 dalam point (1/72 inci)
+PAGE_WIDTH: float = 595.0
+PAGE_HEIGHT: float = 842.0
+MARGIN: float = 72.0
+FONT_SIZE: float = 11.0
+LEADING: float = 15.0
+
+# Lebar glyph Helvetica (per 1000 unit) untuk karakter ASCII 32-126, dari AFM standar Adobe
+_HELVETICA_WIDTHS: List[int] = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_DEFAULT_WIDTH: int = 556
+
+
+def text_width(text: str, font_size: float = FONT_SIZE) -> float:
+    total = 0
+    for char in text:
+        code = ord(char)
+        total += _HELVETICA_WIDTHS[code - 32] if 32 <= code <= 126 else _DEFAULT_WIDTH
+    return total * font_size / 1000
+
+
+def wrap_text(text: str, max_width: float, font_size: float = FONT_SIZE) -> List[str]:
+    lines: List[str] = []
+    for paragraph in text.replace("\r\n", "\n").replace("\t", "    ").split("\n"):
+        words = paragraph.split(" ")
+        current = ""
+        for word in words:
+            candidate = f"{current} {word}" if current else word
+            if text_width(candidate, font_size) <= max_width:
+                current = candidate
+                continue
+            if current:
+                lines.append(current)
+            # Kata yang lebih panjang dari satu baris (mis. URL) dipotong per karakter
+            while text_width(word, font_size) > max_width:
+                cut = len(word)
+                while cut > 1 and text_width(word[:cut], font_size) > max_width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            current = word
+        lines.append(current)
+    return lines
+
+
+def _pdf_string(text: str) -> bytes:
+    # Font standar memakai WinAnsiEncoding (cp1252); karakter di luar itu diganti "?"
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _page_stream(lines: List[str], font_size: float, leading: float) -> bytes:
+    top = PAGE_HEIGHT - MARGIN - font_size
+    parts = [b"BT", b"/F1 %g Tf" % font_size, b"%g TL" % leading, b"%g %g Td" % (MARGIN, top)]
+    for line in lines:
+        parts.append(_pdf_string(line) + b" Tj T*")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+
+def render_text_pdf(
+    text: str,
+    title: Optional[str] = None,
+    font_size: float = FONT_SIZE,
+    leading: float = LEADING,
+) -> bytes:
+    # PDF A4 sederhana (Helvetica) tanpa dependensi; keluaran deterministik untuk teks yang sama
+    lines = wrap_text(text, PAGE_WIDTH - 2 * MARGIN, font_size)
+    per_page = max(1, int((PAGE_HEIGHT - 2 * MARGIN) // leading))
+    pages = [lines[i : i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+
+    # Nomor objek: 1 katalog, 2 daftar halaman, 3 font, 4 info, lalu pasangan halaman + konten
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    objects.append(b"<< /Producer (CoverLetter-Bot)" + (b" /Title " + _pdf_string(title) if title else b"") + b" >>")
+    page_refs: List[bytes] = []
+    for page_lines in pages:
+        content = zlib.compress(_page_stream(page_lines, font_size, leading))
+        page_number = len(objects) + 1
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %g %g] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, page_number + 1)
+        )
+        objects.append(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream"
+        )
+        page_refs.append(b"%d 0 R" % page_number)
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(page_refs) + b"] /Count %d >>" % len(page_refs)
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets: List[int] = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_offset,
+    )
+    return bytes(out)
@@ -0,0 +1,147 @@
+import math
+import re
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from src.text_utils import tokenize
+
+TokenCounter = Callable[[str], int]
+
+# Rata-rata ~4 karakter per token untuk model Gemini pada teks Latin
+CHARS_PER_TOKEN: float = 4.0
+# Bagian yang lebih besar dari ini dipecah lagi per baris / kalimat sebelum diperingkat
+MAX_SECTION_TOKENS: int = 120
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;:])\s+|\s+(?=[•●▪\-*] )")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def model_token_counter(model: object) -> TokenCounter:
+    # Gunakan penghitung token milik model; jatuh ke estimasi lokal jika gagal (mis. offline)
+    def count(text: str) -> int:
+        try:
+            return int(model.count_tokens(text).total_tokens)  # type: ignore[attr-defined]
+        except Exception as e:
+            print(f"Gagal menghitung token dengan model, memakai estimasi lokal: {e}")
+            return estimate_tokens(text)
+
+    return count
+
+
+def split_sections(text: str, max_section_tokens: int = MAX_SECTION_TOKENS) -> List[str]:
+    sections: List[str] = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_section_tokens:
+            sections.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if estimate_tokens(line) <= max_section_tokens:
+                sections.append(line)
+            else:
+                # Teks hasil scraping biasanya satu baris panjang; pecah per kalimat
+                sections.extend(part for part in _SENTENCE_RE.split(line) if part.strip())
+    return sections
+
+
+def _relevance(section: str, query_terms: Set[str]) -> float:
+    tokens = tokenize(section)
+    if not tokens:
+        return 0.0
+    hits = sum(1 for token in tokens if token in query_terms)
+    # Normalisasi akar panjang agar bagian panjang tidak otomatis menang
+    return hits / math.sqrt(len(tokens))
+
+
+def _truncate_words(text: str, budget: float) -> str:
+    max_chars = int(budget * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[: cut if cut > 0 else max_chars].rstrip()
+
+
+def trim_to_budget(
+    text: str,
+    budget: int,
+    query_terms: Iterable[str] = (),
+    counter: TokenCounter = estimate_tokens,
+) -> str:
+    total = counter(text)
+    if total <= budget:
+        return text
+
+    sections = split_sections(text)
+    if not sections:
+        return ""
+    # Biaya tiap bagian memakai estimasi lokal yang dikalibrasi ke penghitung utama,
+    # sehingga penghitung model cukup dipanggil sekali per teks
+    scale = total / max(1, estimate_tokens(text))
+    costs = [estimate_tokens(section) * scale for section in sections]
+
+    terms = set(query_terms)
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: (-_relevance(sections[i], terms), i),
+    )
+
+    kept: Set[int] = set()
+    used = 0.0
+    for index in ranked:
+        if used + costs[index] <= budget:
+            kept.add(index)
+            used += costs[index]
+
+    if not kept:
+        best = ranked[0]
+        return _truncate_words(sections[best], budget / scale)
+    return "\n".join(sections[i] for i in sorted(kept))
+
+
+def fit_prompt_inputs(
+    cv_text: Optional[str],
+    job_desc_text: Optional[str],
+    budget: int,
+    context: str = "",
+    counter: TokenCounter = estimate_tokens,
+) -> Tuple[Optional[str], Optional[str]]:
+    cv_tokens = counter(cv_text) if cv_text else 0
+    job_tokens = counter(job_desc_text) if job_desc_text else 0
+    if budget <= 0 or cv_tokens + job_tokens <= budget:
+        return cv_text, job_desc_text
+
+    # Anggaran dibagi dua; sisa dari teks yang lebih pendek diberikan ke teks lainnya
+    half = budget // 2
+    cv_budget = min(cv_tokens, max(half, budget - job_tokens))
+    job_budget = budget - cv_budget
+
+    context_terms = set(tokenize(context))
+    trimmed_cv = cv_text
+    if cv_text and cv_tokens > cv_budget:
+        trimmed_cv = trim_to_budget(
+            cv_text, cv_budget, context_terms | set(tokenize(job_desc_text or "")), counter
+        )
+    trimmed_job = job_desc_text
+    if job_desc_text and job_tokens > job_budget:
+        trimmed_job = trim_to_budget(
+            job_desc_text, job_budget, context_terms | set(tokenize(cv_text or "")), counter
+        )
+
+    after = (counter(trimmed_cv) if trimmed_cv else 0) + (
+        counter(trimmed_job) if trimmed_job else 0
+    )
+    print(
+        f"Anggaran prompt: CV {cv_tokens} + deskripsi {job_tokens} = "
+        f"{cv_tokens + job_tokens} token -> {after} token (batas {budget})"
+    )
+    return trimmed_cv, trimmed_job
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.paths import project_path
+
+
+class ResponseCache:
+    """Cache respons Gemini di SQLite, dengan kunci hash dari model, prompt, dan pengaturan generasi."""
+
+    def __init__(
+        self,
+        path: str = project_path("response_cache.db"),
+        max_entries: int = 1000,
+        max_age_s: float = 7 * 24 * 3600,
+        enabled: bool = True,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_s = max_age_s
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def make_key(
+        model_name: str, prompt: str, settings: Optional[Dict[str, Any]] = None
+    ) -> str:
+        payload = json.dumps(
+            {"model": model_name, "prompt": prompt, "settings": settings or {}},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_last_accessed "
+                "ON response_cache (last_accessed)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                if row is None or now - row[1] > self.max_age_s:
+                    if row is not None:
+                        conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                        conn.commit()
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE response_cache SET last_accessed = ? WHERE key = ?", (now, key)
+                )
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                print(f"Error membaca cache respons: {e}")
+                self.misses += 1
+                return None
+
+    def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                conn = self._connection()
+                now = time.time()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO response_cache (key, value, created_at, last_accessed)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    (key, value, now, now),
+                )
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error menyimpan cache respons: {e}")
+
+    def delete(self, key: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error menghapus cache respons: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        # Buang entri kedaluwarsa, lalu entri yang paling lama tidak diakses jika melebihi batas
+        conn.execute(
+            "DELETE FROM response_cache WHERE created_at < ?", (now - self.max_age_s,)
+        )
+        conn.execute(
+            """
+            DELETE FROM response_cache WHERE key IN (
+                SELECT key FROM response_cache
+                ORDER BY last_accessed DESC
+                LIMIT -1 OFFSET ?
+            )
+        """,
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("DELETE FROM response_cache")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error mengosongkan cache respons: {e}")
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM response_cache"
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
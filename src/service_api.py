@@ -0,0 +1,367 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+
+from src.ai_service import (
+    FAILED_COVER_LETTER,
+    MODEL_NAME,
+    agenerate_cover_letter,
+    agenerate_follow_up_email,
+    agenerate_thank_you_email,
+    response_cache,
+    track_usage,
+)
+from src.attachments import get_attachment_cache
+from src.cv_cache import get_cv_cache, load_cv_profile
+from src.cv_parser import CVProfile
+from src.history_manager import (
+    HISTORY_PAGE_SIZE,
+    GenerationRecord,
+    count_history,
+    hash_job_description,
+    latency_summary,
+    load_letter_text,
+    query_history,
+    save_letter,
+    score_distribution,
+    update_status,
+    weekly_usage,
+)
+from src.job_parser import scrape_job_description, scrape_many
+from src.match_scorer import score_match, skills_from_config
+
+# Batas jumlah item per permintaan batch, agar satu permintaan tidak memonopoli worker
+MAX_BATCH_ITEMS: int = 50
+# Jumlah pemanggilan Gemini bersamaan per proses worker (dibagi oleh semua permintaan)
+DEFAULT_MAX_CONCURRENCY: int = 4
+# Batas ukuran CV yang diunggah ke /cv
+MAX_CV_BYTES: int = 10 * 1024 * 1024
+
+
+class CoverLetterRequest(BaseModel):
+    posisi: str = Field(min_length=1)
+    perusahaan: str = Field(min_length=1)
+    sumber_lowongan: str = ""
+    job_url: Optional[str] = None
+    job_desc: Optional[str] = None
+    # Teks CV langsung, atau digest dari respons /cv (CV diambil dari cache)
+    cv_text: Optional[str] = None
+    cv_digest: Optional[str] = None
+    writing_style: str = "Formal"
+    save: bool = True
+
+
+class CoverLetterBatchRequest(BaseModel):
+    items: List[CoverLetterRequest] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class ThankYouEmailRequest(BaseModel):
+    posisi: str = Field(min_length=1)
+    perusahaan: str = Field(min_length=1)
+    tanggal_wawancara: Optional[str] = None
+
+
+class FollowUpEmailRequest(BaseModel):
+    posisi: str = Field(min_length=1)
+    perusahaan: str = Field(min_length=1)
+    tanggal_lamar: Optional[str] = None
+
+
+class ScrapeRequest(BaseModel):
+    url: str = Field(min_length=1)
+
+
+class ScrapeBatchRequest(BaseModel):
+    urls: List[str] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+class StatusUpdate(BaseModel):
+    status: str = Field(min_length=1)
+
+
+class ServiceMetrics:
+    """Jumlah permintaan, galat, dan latensi per endpoint untuk satu proses worker."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, status_code: int, elapsed_ms: float) -> None:
+        with self._lock:
+            stats = self._routes.setdefault(
+                route, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["requests"] += 1
+            if status_code >= 500:
+                stats["errors"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {
+                route: {
+                    "requests": int(stats["requests"]),
+                    "errors": int(stats["errors"]),
+                    "avg_ms": stats["total_ms"] / stats["requests"],
+                    "max_ms": stats["max_ms"],
+                }
+                for route, stats in self._routes.items()
+            }
+        return {"pid": os.getpid(), "uptime_s": time.time() - self.started, "routes": routes}
+
+
+def load_service_config(path: Optional[str] = None) -> Dict[str, Any]:
+    path = path or os.getenv(
+        "SERVICE_CONFIG_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json"),
+    )
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _cached_cv_text(digest: str) -> Optional[str]:
+    payload = get_cv_cache().get(digest)
+    if payload is None:
+        return None
+    return payload.get("raw_text") or payload.get("text")
+
+
+def create_app(
+    config: Optional[Dict[str, Any]] = None,
+    max_concurrency: Optional[int] = None,
+) -> FastAPI:
+    # Tanpa state per sesi: setiap proses worker bisa melayani permintaan mana pun,
+    # riwayat dan cache dibagi lewat berkas SQLite yang sama
+    config = config if config is not None else load_service_config()
+    max_concurrency = max_concurrency or int(
+        os.getenv("SERVICE_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY))
+    )
+    app = FastAPI(title="CoverLetter-Bot API")
+    metrics = ServiceMetrics()
+    limiter: Dict[str, asyncio.Semaphore] = {}
+
+    def ai_slot() -> asyncio.Semaphore:
+        # Dibuat saat pertama dipakai agar terikat ke event loop server
+        if "semaphore" not in limiter:
+            limiter["semaphore"] = asyncio.Semaphore(max(1, max_concurrency))
+        return limiter["semaphore"]
+
+    @app.middleware("http")
+    async def record_metrics(request: Request, call_next: Any) -> Any:
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            # Dikelompokkan per templat rute (mis. /history/{application_id}), bukan per URL
+            route = request.scope.get("route")
+            metrics.record(
+                getattr(route, "path", request.url.path),
+                status_code,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    async def generate_one(item: CoverLetterRequest) -> Dict[str, Any]:
+        started = time.perf_counter()
+        job_desc_text = item.job_desc or None
+        if not job_desc_text and item.job_url:
+            job_desc_text = await asyncio.to_thread(scrape_job_description, item.job_url)
+        cv_text = item.cv_text
+        if not cv_text and item.cv_digest:
+            cv_text = await asyncio.to_thread(_cached_cv_text, item.cv_digest)
+            if cv_text is None:
+                raise HTTPException(404, f"CV dengan digest {item.cv_digest} tidak ditemukan.")
+
+        async with ai_slot():
+            with track_usage() as usage:
+                data = await agenerate_cover_letter(
+                    config,
+                    item.posisi,
+                    item.perusahaan,
+                    item.sumber_lowongan,
+                    cv_text,
+                    job_desc_text,
+                    item.writing_style,
+                )
+        cover_letter = data.get("cover_letter", FAILED_COVER_LETTER)
+        result: Dict[str, Any] = {
+            "posisi": item.posisi,
+            "perusahaan": item.perusahaan,
+            "cover_letter": cover_letter,
+            "match_score": data.get("match_score", 0),
+            "missing_keywords": [],
+            "application_id": None,
+            "error": "Gagal membuat surat lamaran." if cover_letter == FAILED_COVER_LETTER else None,
+        }
+        if job_desc_text and job_desc_text.strip():
+            # Skor lokal yang deterministik menggantikan skor dari AI, sama seperti di app.py
+            local_match = await asyncio.to_thread(
+                score_match, cv_text, job_desc_text, skills_from_config(config)
+            )
+            result["match_score"] = local_match.score
+            result["missing_keywords"] = local_match.missing_keywords
+        result["latency_ms"] = (time.perf_counter() - started) * 1000
+        if item.save and result["error"] is None:
+            result["application_id"] = await asyncio.to_thread(
+                save_letter,
+                GenerationRecord(
+                    company=item.perusahaan,
+                    position=item.posisi,
+                    letter_text=cover_letter,
+                    job_url=item.job_url or None,
+                    job_desc_hash=hash_job_description(job_desc_text),
+                    match_score=result["match_score"],
+                    model=MODEL_NAME,
+                    writing_style=item.writing_style,
+                    prompt_tokens=usage.prompt_tokens,
+                    output_tokens=usage.output_tokens,
+                    latency_ms=result["latency_ms"],
+                ),
+            )
+        return result
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        return {"status": "ok", "model": MODEL_NAME}
+
+    @app.get("/metrics")
+    async def service_metrics() -> Dict[str, Any]:
+        snapshot = metrics.snapshot()
+        snapshot["caches"] = {
+            "response": response_cache.stats(),
+            "cv": get_cv_cache().stats(),
+            "attachments": get_attachment_cache().stats(),
+        }
+        return snapshot
+
+    @app.post("/cover-letter")
+    async def cover_letter(item: CoverLetterRequest) -> Dict[str, Any]:
+        return await generate_one(item)
+
+    @app.post("/cover-letter/batch")
+    async def cover_letter_batch(batch: CoverLetterBatchRequest) -> Dict[str, Any]:
+        # Item diproses bersamaan (dibatasi semafor AI); kegagalan satu item tidak menggagalkan yang lain
+        outcomes = await asyncio.gather(
+            *(generate_one(item) for item in batch.items), return_exceptions=True
+        )
+        results: List[Dict[str, Any]] = []
+        for item, outcome in zip(batch.items, outcomes):
+            if isinstance(outcome, BaseException):
+                detail = outcome.detail if isinstance(outcome, HTTPException) else str(outcome)
+                outcome = {"posisi": item.posisi, "perusahaan": item.perusahaan, "error": detail}
+            results.append(outcome)
+        failed = sum(1 for result in results if result.get("error"))
+        return {"total": len(results), "succeeded": len(results) - failed, "failed": failed, "results": results}
+
+    @app.post("/emails/thank-you")
+    async def thank_you_email(item: ThankYouEmailRequest) -> Dict[str, str]:
+        async with ai_slot():
+            text = await agenerate_thank_you_email(
+                config, item.posisi, item.perusahaan, item.tanggal_wawancara
+            )
+        return {"subject": f"Terima Kasih - {item.posisi} - {config.get('nama', '')}", "body": text}
+
+    @app.post("/emails/follow-up")
+    async def follow_up_email(item: FollowUpEmailRequest) -> Dict[str, str]:
+        async with ai_slot():
+            text = await agenerate_follow_up_email(
+                config, item.posisi, item.perusahaan, item.tanggal_lamar
+            )
+        return {"subject": f"Tindak Lanjut Lamaran - {item.posisi} - {config.get('nama', '')}", "body": text}
+
+    @app.post("/scrape")
+    async def scrape(item: ScrapeRequest) -> Dict[str, Any]:
+        description = await asyncio.to_thread(scrape_job_description, item.url)
+        return {"url": item.url, "job_desc": description}
+
+    @app.post("/scrape/batch")
+    async def scrape_batch(batch: ScrapeBatchRequest) -> Dict[str, Any]:
+        descriptions = await asyncio.to_thread(scrape_many, batch.urls)
+        return {
+            "results": [
+                {"url": url, "job_desc": description}
+                for url, description in zip(batch.urls, descriptions)
+            ]
+        }
+
+    @app.post("/cv")
+    async def parse_cv(request: Request) -> Dict[str, Any]:
+        # Isi PDF dikirim sebagai badan permintaan mentah (Content-Type: application/pdf)
+        data = await request.body()
+        if not data:
+            raise HTTPException(400, "Badan permintaan kosong; kirim isi berkas PDF.")
+        if len(data) > MAX_CV_BYTES:
+            raise HTTPException(413, "Berkas CV terlalu besar.")
+        profile: Optional[CVProfile] = await asyncio.to_thread(load_cv_profile, data)
+        if profile is None:
+            raise HTTPException(422, "Gagal mengekstrak teks dari CV.")
+        return {
+            "digest": get_cv_cache().digest(data),
+            "text": profile.raw_text,
+            "sections": [asdict(section) for section in profile.sections],
+            "skills": profile.skill_names(),
+        }
+
+    @app.get("/history")
+    async def history(
+        company: Optional[str] = None,
+        position: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=200),
+        offset: int = Query(0, ge=0),
+    ) -> Dict[str, Any]:
+        page = await asyncio.to_thread(
+            query_history, company, position, date_from, date_to, search, limit, offset
+        )
+        total = await asyncio.to_thread(count_history, company, position, date_from, date_to, search)
+        return {
+            "entries": page.entries,
+            "total": total,
+            "offset": page.offset,
+            "limit": page.limit,
+            "has_more": page.has_more,
+            "next_offset": page.next_offset,
+        }
+
+    @app.get("/history/analytics")
+    async def history_analytics(
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        bucket_size: int = Query(10, ge=1, le=100),
+    ) -> Dict[str, Any]:
+        latency = await asyncio.to_thread(latency_summary, date_from, date_to)
+        scores = await asyncio.to_thread(score_distribution, bucket_size, date_from, date_to)
+        usage = await asyncio.to_thread(weekly_usage, date_from=date_from, date_to=date_to)
+        return {
+            "latency": latency,
+            "score_distribution": [{"bucket": bucket, "count": count} for bucket, count in scores],
+            "weekly_usage": usage,
+        }
+
+    @app.get("/history/{application_id}/letter")
+    async def history_letter(application_id: int) -> Dict[str, Any]:
+        text = await asyncio.to_thread(load_letter_text, application_id)
+        if text is None:
+            raise HTTPException(404, "Surat lamaran tidak ditemukan.")
+        return {"id": application_id, "letter_text": text}
+
+    @app.post("/history/{application_id}/status")
+    async def history_status(application_id: int, update: StatusUpdate) -> Dict[str, Any]:
+        if not await asyncio.to_thread(update_status, application_id, update.status):
+            raise HTTPException(404, "Lamaran tidak ditemukan.")
+        return {"id": application_id, "status": update.status}
+
+    return app
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from typing import Any, Dict, MutableMapping
+
+SESSION_ROOT: str = os.path.join(tempfile.gettempdir(), "coverletter_bot_sessions")
+# Folder sesi yang lebih tua dari ini dianggap sisa proses yang berhenti mendadak
+STALE_SESSION_AGE_S: float = 24 * 3600
+
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _safe_name(name: str) -> str:
+    name = _UNSAFE_NAME_RE.sub("_", os.path.basename(name)).strip("._")
+    return name or "file"
+
+
+def purge_stale_sessions(root: str = SESSION_ROOT, max_age_s: float = STALE_SESSION_AGE_S) -> int:
+    removed = 0
+    if not os.path.isdir(root):
+        return removed
+    cutoff = time.time() - max_age_s
+    for entry in os.scandir(root):
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+class SessionFileStore:
+    """File sementara milik satu sesi pengguna; file baru ditulis ke disk hanya saat path benar-benar dibutuhkan."""
+
+    def __init__(self, root: str = SESSION_ROOT) -> None:
+        os.makedirs(root, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="session_", dir=root)
+        # Token acak yang mengidentifikasi sesi, mis. sebagai pemilik pekerjaan latar belakang
+        self.id: str = secrets.token_urlsafe(16)
+        self._digests: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Folder dihapus saat store tidak lagi direferensikan (sesi berakhir) atau saat proses keluar
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+    def path_for(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.directory, _safe_name(name))
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if self._digests.get(path) == digest and os.path.exists(path):
+                return path
+            # Tulis ke file sementara lalu ganti, agar pembaca tidak pernah melihat file setengah jadi
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._digests[path] = digest
+        return path
+
+    def remove(self, name: str) -> None:
+        path = os.path.join(self.directory, _safe_name(name))
+        with self._lock:
+            self._digests.pop(path, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def cleanup(self) -> None:
+        self._finalizer()
+
+
+_purged = False
+_purge_lock = threading.Lock()
+
+
+def new_session_store(root: str = SESSION_ROOT) -> SessionFileStore:
+    global _purged
+    with _purge_lock:
+        if not _purged:
+            purge_stale_sessions(root)
+            _purged = True
+    return SessionFileStore(root)
+
+
+def session_store(state: MutableMapping[str, Any], key: str = "session_files") -> SessionFileStore:
+    # state biasanya st.session_state; setiap sesi Streamlit mendapat folder sendiri
+    store = state.get(key)
+    if store is None or store.closed:
+        store = new_session_store()
+        state[key] = store
+    return store
@@ -0,0 +1,116 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+_LETTER_KEY_RE = re.compile(r'"cover_letter"\s*:\s*"')
+# Angka dianggap lengkap hanya jika sudah diikuti karakter non-digit
+_SCORE_RE = re.compile(r'"match_score"\s*:\s*"?(\d+(?:\.\d+)?)"?\s*[,}\n]')
+_HEX = set("0123456789abcdefABCDEF")
+
+
+class CoverLetterStreamParser:
+    """Mengekstrak isi surat dan match_score dari respons JSON yang masih mengalir."""
+
+    def __init__(self) -> None:
+        self._buffer: str = ""
+        self._letter_parts: List[str] = []
+        self._letter_start: Optional[int] = None
+        self._pos: int = 0
+        self.letter_complete: bool = False
+        self.match_score: Optional[int] = None
+
+    @property
+    def raw_text(self) -> str:
+        return self._buffer
+
+    @property
+    def letter(self) -> str:
+        if self._letter_start is None and self._looks_like_plain_text():
+            # Model kadang mengabaikan format JSON; tampilkan apa adanya
+            return self._buffer.strip()
+        return "".join(self._letter_parts)
+
+    def feed(self, chunk: str) -> "CoverLetterStreamParser":
+        self._buffer += chunk
+        if self._letter_start is None:
+            match = _LETTER_KEY_RE.search(self._buffer)
+            if match:
+                self._letter_start = match.end()
+                self._pos = match.end()
+        if self._letter_start is not None and not self.letter_complete:
+            self._decode_letter()
+        if self.match_score is None:
+            score_match = _SCORE_RE.search(self._buffer)
+            if score_match:
+                self.match_score = int(float(score_match.group(1)))
+        return self
+
+    def _looks_like_plain_text(self) -> bool:
+        head = self._buffer.lstrip()[:8]
+        return bool(head) and not head.startswith(("{", "`"))
+
+    def _decode_letter(self) -> None:
+        # Lanjutkan decoding dari posisi terakhir agar setiap chunk hanya diproses sekali
+        buffer = self._buffer
+        end = len(buffer)
+        pos = self._pos
+        segment_start = pos
+        while pos < end:
+            char = buffer[pos]
+            if char == '"':
+                self._letter_parts.append(buffer[segment_start:pos])
+                self.letter_complete = True
+                pos += 1
+                segment_start = pos
+                break
+            if char != "\\":
+                pos += 1
+                continue
+
+            escape_len = self._escape_length(buffer, pos)
+            if escape_len is None:
+                break  # escape belum lengkap, tunggu chunk berikutnya
+            raw_escape = buffer[pos : pos + escape_len]
+            try:
+                decoded = json.loads(f'"{raw_escape}"')
+            except json.JSONDecodeError:
+                decoded = raw_escape
+            self._letter_parts.append(buffer[segment_start:pos])
+            self._letter_parts.append(decoded)
+            pos += escape_len
+            segment_start = pos
+
+        if not self.letter_complete:
+            self._letter_parts.append(buffer[segment_start:pos])
+        self._pos = pos
+
+    @staticmethod
+    def _escape_length(buffer: str, pos: int) -> Optional[int]:
+        if pos + 1 >= len(buffer):
+            return None
+        if buffer[pos + 1] != "u":
+            return 2
+        if pos + 6 > len(buffer):
+            return None
+        if not set(buffer[pos + 2 : pos + 6]) <= _HEX:
+            return 2
+        code = int(buffer[pos + 2 : pos + 6], 16)
+        if 0xD800 <= code <= 0xDBFF:
+            # High surrogate harus didecode bersama pasangannya
+            if pos + 12 > len(buffer):
+                return None
+            if buffer[pos + 6 : pos + 8] == "\\u":
+                return 12
+        return 6
+
+    def result(self) -> Dict[str, Any]:
+        text = self._buffer.strip()
+        if text.startswith("```json") and text.endswith("```"):
+            text = text[7:-3].strip()
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        if self.letter_complete or self._looks_like_plain_text():
+            return {"cover_letter": self.letter, "match_score": self.match_score or 0}
+        raise ValueError("Respons streaming tidak berisi surat lamaran yang lengkap.")
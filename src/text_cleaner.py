@@ -0,0 +1,150 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER: str = "lxml"
+except ImportError:  # lxml opsional; parser bawaan tetap berfungsi, hanya lebih lambat
+    HTML_PARSER = "html.parser"
+
+# Elemen yang hampir selalu berisi navigasi, formulir, atau kode, bukan isi lowongan
+DROP_TAGS = frozenset(
+    "script style noscript template iframe svg canvas nav footer aside form button select".split()
+)
+BLOCK_TAGS = frozenset(
+    """
+    address article aside blockquote dd div dl dt fieldset figcaption figure footer form
+    h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table tbody thead tfoot tr td th ul br
+    """.split()
+)
+# Petunjuk class/id untuk banner cookie, menu, tombol bagikan, daftar lowongan terkait, dll.
+BOILERPLATE_HINT_RE = re.compile(
+    r"cookie|consent|gdpr|breadcrumb|navbar|\bnav\b|menu|footer|sidebar|share|social|"
+    r"related|similar|recommend|newsletter|subscribe|popup|modal|banner|advert",
+    re.IGNORECASE,
+)
+
+# Blok dengan proporsi teks tautan di atas ini dianggap navigasi
+MAX_LINK_DENSITY: float = 0.33
+# Blok dengan jumlah kata sebanyak ini (dan sedikit tautan) dianggap isi
+MIN_CONTENT_WORDS: int = 6
+
+_SPACE_RE = re.compile(r"[ \t\r\f\v\u00a0\u200b]+")
+
+
+@dataclass
+class TextBlock:
+    tag: str
+    parts: List[str] = field(default_factory=list)
+    link_chars: int = 0
+
+    @property
+    def text(self) -> str:
+        return _SPACE_RE.sub(" ", "".join(self.parts)).strip()
+
+    @property
+    def word_count(self) -> int:
+        return len(self.text.split())
+
+    @property
+    def link_density(self) -> float:
+        length = len(self.text)
+        return min(1.0, self.link_chars / length) if length else 0.0
+
+
+def _is_boilerplate_container(tag: Tag) -> bool:
+    if tag.name in ("html", "body", "main", "article"):
+        return False
+    hints = " ".join(tag.get("class") or []) + " " + str(tag.get("id") or "")
+    return bool(BOILERPLATE_HINT_RE.search(hints))
+
+
+def _collect_blocks(element: Tag, blocks: List[TextBlock], current: TextBlock, in_link: bool) -> TextBlock:
+    for child in element.children:
+        if isinstance(child, Comment):
+            continue
+        if isinstance(child, NavigableString):
+            if type(child) is not NavigableString:
+                continue  # CData, Doctype, dsb.
+            current.parts.append(str(child))
+            if in_link:
+                current.link_chars += len(str(child).strip())
+            continue
+        if not isinstance(child, Tag) or child.name in DROP_TAGS:
+            continue
+        if _is_boilerplate_container(child):
+            continue
+        if child.name in BLOCK_TAGS:
+            # Elemen blok menutup blok teks yang sedang berjalan dan membuka blok baru
+            blocks.append(current)
+            inner = _collect_blocks(child, blocks, TextBlock(tag=child.name), in_link)
+            blocks.append(inner)
+            current = TextBlock(tag=element.name)
+        else:
+            current = _collect_blocks(child, blocks, current, in_link or child.name == "a")
+    return current
+
+
+def extract_blocks(html: str) -> List[TextBlock]:
+    soup = BeautifulSoup(html, HTML_PARSER)
+    root = soup.body or soup
+    blocks: List[TextBlock] = []
+    blocks.append(_collect_blocks(root, blocks, TextBlock(tag="body"), False))
+    return [block for block in blocks if block.text]
+
+
+def _classify(block: TextBlock) -> str:
+    if block.link_density > MAX_LINK_DENSITY:
+        return "bad"
+    if block.word_count >= MIN_CONTENT_WORDS:
+        return "good"
+    return "short"
+
+
+def select_content_blocks(blocks: List[TextBlock]) -> List[TextBlock]:
+    classes = [_classify(block) for block in blocks]
+    if "good" not in classes:
+        # Halaman sangat pendek: tidak ada blok yang jelas berisi, pertahankan yang bukan navigasi
+        return [block for block, cls in zip(blocks, classes) if cls != "bad"]
+
+    # Blok pendek (judul, label) mengikuti blok bukan-pendek berikutnya, karena judul
+    # memperkenalkan isi setelahnya; di akhir halaman mengikuti blok sebelumnya
+    resolved = list(classes)
+    following: Optional[str] = None
+    for i in range(len(classes) - 1, -1, -1):
+        if classes[i] == "short":
+            resolved[i] = following or ""
+        else:
+            following = classes[i]
+    preceding: Optional[str] = None
+    for i, cls in enumerate(classes):
+        if cls != "short":
+            preceding = cls
+        elif not resolved[i]:
+            resolved[i] = preceding or "bad"
+    return [block for block, cls in zip(blocks, resolved) if cls == "good"]
+
+
+def clean_text(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    # Normalisasi spasi dan buang baris kosong serta baris yang berulang (mis. tombol "Lamar" ganda)
+    seen = set()
+    lines: List[str] = []
+    for line in text.splitlines():
+        line = _SPACE_RE.sub(" ", line).strip()
+        key = line.casefold()
+        if not line or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def strip_boilerplate(html: str) -> str:
+    blocks = select_content_blocks(extract_blocks(html))
+    return clean_text("\n".join(block.text for block in blocks))
@@ -0,0 +1,22 @@
+import re
+from typing import FrozenSet, List
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+# Kata umum bahasa Indonesia dan Inggris yang tidak membawa makna untuk pencocokan
+STOPWORDS: FrozenSet[str] = frozenset(
+    """
+    a an and are as at be by for from has have in is it of on or that the this to was
+    were will with you your we our they their can may must should not but if into about
+    yang dan di ke dari untuk dengan pada dalam adalah ini itu atau akan juga oleh sebagai
+    kami kita anda saya mereka ada tidak bisa dapat harus serta para secara lebih telah
+    sudah agar bagi karena hingga sampai tersebut setiap antara jika maka namun yaitu
+    """.split()
+)
+
+
+def tokenize(text: str, drop_stopwords: bool = True) -> List[str]:
+    tokens = _WORD_RE.findall(text.lower())
+    if drop_stopwords:
+        return [token for token in tokens if token not in STOPWORDS and len(token) > 1]
+    return tokens
@@ -0,0 +1,42 @@
+import socket
+
+import pytest
+
+
+class RecordingHandler:
+    """Handler aiosmtpd yang menyimpan setiap email dan dapat menolak sejumlah email pertama."""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+        self.fail_next = 0
+        self.fail_code = "451 4.3.0 Coba lagi nanti"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.peers.add(session.peer)
+        if self.fail_next:
+            self.fail_next -= 1
+            return self.fail_code
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setenv("SMTP_HOST", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(controller.port))
+    monkeypatch.setenv("SMTP_SECURITY", "none")
+    monkeypatch.delenv("EMAIL_PASSWORD", raising=False)
+    handler.controller = controller
+    yield handler
+    controller.stop()
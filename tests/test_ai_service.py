@@ -1,13 +1,43 @@
+import asyncio
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
+from src.response_cache import ResponseCache
 from src.ai_service import (
+    get_model,
+    agenerate_application_bundle,
+    agenerate_cover_letter,
+    agenerate_cv_suggestions,
+    agenerate_follow_up_email,
+    astream_cover_letter,
+    cover_letter_from_stream,
+    generate_application_bundle,
     generate_cover_letter,
+    stream_cover_letter,
+    stream_thank_you_email,
     generate_cv_suggestions,
     generate_thank_you_email,
     generate_follow_up_email,
+    track_usage,
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_model_cache():
+    # get_model menyimpan klien; kosongkan agar setiap tes memakai mock-nya sendiri
+    get_model.cache_clear()
+    yield
+    get_model.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def memory_response_cache():
+    cache = ResponseCache(":memory:")
+    with patch("src.ai_service.response_cache", cache):
+        yield cache
+    cache.close()
+
+
 @pytest.fixture
 def mock_generative_model():
     with patch("google.generativeai.GenerativeModel") as mock_model:
@@ -48,6 +78,26 @@ def test_generate_cover_letter(mock_generative_model, sample_config):
     assert result["match_score"] == 80
 
 
+def test_cover_letter_prompt_asks_for_score_only_without_job_description(
+    mock_generative_model, sample_config
+):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value.text = '{"cover_letter": "Surat"}'
+    mock_generative_model.return_value = mock_model_instance
+
+    # Dengan deskripsi pekerjaan skor dihitung lokal, jadi AI tidak perlu diminta skor
+    result = generate_cover_letter(sample_config, "Designer", "Acme", "LinkedIn", "My CV", "Job description")
+    prompt = mock_model_instance.generate_content.call_args.args[0]
+    assert result == {"cover_letter": "Surat"}
+    assert "match_score" not in prompt
+    assert "skor kecocokan" not in prompt
+
+    generate_cover_letter(sample_config, "Designer", "Acme", "LinkedIn", "My CV", "   ")
+    prompt = mock_model_instance.generate_content.call_args.args[0]
+    assert '"match_score"' in prompt
+    assert "skor kecocokan" in prompt
+
+
 def test_generate_cv_suggestions(mock_generative_model, sample_config):
     mock_model_instance = MagicMock()
     mock_model_instance.generate_content.return_value.text = "Test CV suggestions"
@@ -62,6 +112,22 @@ def test_generate_cv_suggestions(mock_generative_model, sample_config):
     assert result == "Test CV suggestions"
 
 
+def test_cv_suggestions_prompt_uses_structured_cv_sections(mock_generative_model, sample_config):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value.text = "Saran"
+    mock_generative_model.return_value = mock_model_instance
+    cv_text = (
+        "John Doe | Email: john@example.com\nTENTANG SAYA\nPengembang Python untuk layanan web.\n"
+        "KETERAMPILAN\nPython: Django dan FastAPI."
+    )
+
+    generate_cv_suggestions(cv_text, "Job description", sample_config)
+
+    prompt = mock_model_instance.generate_content.call_args[0][0]
+    assert "John Doe | Email: john@example.com\n\n[SUMMARY]\nPengembang Python untuk layanan web." in prompt
+    assert "[SKILLS]\nPython: Django dan FastAPI." in prompt
+
+
 def test_generate_thank_you_email(mock_generative_model, sample_config):
     mock_model_instance = MagicMock()
     mock_model_instance.generate_content.return_value.text = "Test thank you email"
@@ -90,3 +156,281 @@ def test_generate_follow_up_email(mock_generative_model, sample_config):
     )
 
     assert result == "Test follow-up email"
+
+
+def test_generate_cover_letter_uses_response_cache(
+    mock_generative_model, sample_config, memory_response_cache
+):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value.text = '{"cover_letter": "Cached", "match_score": 70}'
+    mock_generative_model.return_value = mock_model_instance
+
+    kwargs = dict(
+        config=sample_config,
+        posisi="Software Engineer",
+        perusahaan="Test Corp",
+        sumber_lowongan="LinkedIn",
+        cv_text="My CV",
+        job_desc_text="Job description",
+    )
+    first = generate_cover_letter(**kwargs)
+    second = generate_cover_letter(**kwargs)
+
+    assert first == second
+    assert mock_model_instance.generate_content.call_count == 1
+    assert memory_response_cache.hits == 1
+
+
+def test_generate_cover_letter_does_not_cache_invalid_json(
+    mock_generative_model, sample_config, memory_response_cache
+):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value.text = "bukan json"
+    mock_generative_model.return_value = mock_model_instance
+
+    result = generate_cover_letter(
+        config=sample_config,
+        posisi="Software Engineer",
+        perusahaan="Test Corp",
+        sumber_lowongan="LinkedIn",
+    )
+
+    assert result["match_score"] == 0
+    assert len(memory_response_cache) == 0
+
+
+def test_agenerate_cover_letter(mock_generative_model, sample_config):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content_async = AsyncMock(
+        return_value=MagicMock(text='{"cover_letter": "Async letter", "match_score": 75}')
+    )
+    mock_generative_model.return_value = mock_model_instance
+
+    result = asyncio.run(
+        agenerate_cover_letter(
+            config=sample_config,
+            posisi="Software Engineer",
+            perusahaan="Test Corp",
+            sumber_lowongan="LinkedIn",
+        )
+    )
+
+    assert result == {"cover_letter": "Async letter", "match_score": 75}
+    mock_model_instance.generate_content.assert_not_called()
+
+
+def test_async_generators_run_concurrently(mock_generative_model, sample_config):
+    async def slow_response(prompt):
+        await asyncio.sleep(0.2)
+        return MagicMock(text="Teks")
+
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content_async = slow_response
+    mock_generative_model.return_value = mock_model_instance
+
+    async def run_both():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(
+            agenerate_cv_suggestions("CV", "Job", sample_config),
+            agenerate_follow_up_email(sample_config, "Designer", "Acme"),
+        )
+        return results, loop.time() - started
+
+    results, elapsed = asyncio.run(run_both())
+
+    assert results == ["Teks", "Teks"]
+    assert elapsed < 0.35
+
+
+def test_agenerate_times_out(mock_generative_model, sample_config):
+    async def never_finishes(prompt):
+        await asyncio.sleep(10)
+
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content_async = never_finishes
+    mock_generative_model.return_value = mock_model_instance
+
+    result = asyncio.run(
+        agenerate_cv_suggestions("CV", "Job", sample_config, timeout=0.05)
+    )
+
+    assert result == "Gagal mendapatkan saran perbaikan CV."
+
+
+def _chunks(*texts):
+    return [MagicMock(text=text) for text in texts]
+
+
+def _usage(prompt_tokens, output_tokens):
+    return MagicMock(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens)
+
+
+def test_track_usage_sums_token_counts_and_skips_cached_responses(
+    mock_generative_model, sample_config
+):
+    response = MagicMock(text="Saran", usage_metadata=_usage(120, 30))
+    chunks = _chunks("Terima ", "kasih")
+    chunks[-1].usage_metadata = _usage(50, 8)
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.side_effect = [response, chunks]
+    mock_generative_model.return_value = mock_model_instance
+
+    with track_usage() as usage:
+        generate_cv_suggestions("My CV", "Job description", sample_config)
+        "".join(stream_thank_you_email(sample_config, "Designer", "Acme"))
+        # Respons dari cache tidak memanggil API sehingga tidak menambah token
+        generate_cv_suggestions("My CV", "Job description", sample_config)
+
+    assert (usage.prompt_tokens, usage.output_tokens) == (170, 38)
+
+
+def test_stream_cover_letter_yields_partial_letter(mock_generative_model, sample_config):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value = _chunks(
+        '{"cover_letter": "Yth. ', 'HRD", "match_', 'score": 90}'
+    )
+    mock_generative_model.return_value = mock_model_instance
+
+    letters = []
+    parser = None
+    for parser in stream_cover_letter(sample_config, "Designer", "Acme", "LinkedIn"):
+        letters.append(parser.letter)
+
+    assert letters == ["Yth. ", "Yth. HRD", "Yth. HRD"]
+    assert cover_letter_from_stream(parser) == {"cover_letter": "Yth. HRD", "match_score": 90}
+    assert mock_model_instance.generate_content.call_args.kwargs["stream"] is True
+
+
+def test_stream_caches_only_valid_complete_responses(
+    mock_generative_model, sample_config, memory_response_cache
+):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value = _chunks('{"cover_letter": "Pot')
+    mock_generative_model.return_value = mock_model_instance
+
+    parsers = list(stream_cover_letter(sample_config, "Designer", "Acme", "LinkedIn"))
+
+    assert cover_letter_from_stream(parsers[-1])["match_score"] == 0
+    assert len(memory_response_cache) == 0
+
+
+def test_stream_thank_you_email_reuses_cache(mock_generative_model, sample_config):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value = _chunks("Terima ", "kasih")
+    mock_generative_model.return_value = mock_model_instance
+
+    first = "".join(stream_thank_you_email(sample_config, "Designer", "Acme"))
+    second = "".join(stream_thank_you_email(sample_config, "Designer", "Acme"))
+
+    assert first == second == "Terima kasih"
+    assert mock_model_instance.generate_content.call_count == 1
+
+
+def test_astream_cover_letter(mock_generative_model, sample_config):
+    async def chunk_stream():
+        for text in ('{"cover_letter": "Halo", ', '"match_score": 60}'):
+            yield MagicMock(text=text)
+
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content_async = AsyncMock(return_value=chunk_stream())
+    mock_generative_model.return_value = mock_model_instance
+
+    async def collect():
+        parser = None
+        async for parser in astream_cover_letter(sample_config, "Designer", "Acme", "LinkedIn"):
+            pass
+        return parser
+
+    parser = asyncio.run(collect())
+
+    assert cover_letter_from_stream(parser) == {"cover_letter": "Halo", "match_score": 60}
+
+
+def test_generate_application_bundle_single_call(mock_generative_model, sample_config):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value.text = (
+        '{"cover_letter": "Surat", "match_score": "88", '
+        '"cv_suggestions": ["Tambahkan portofolio", "- Sebutkan Canva"]}'
+    )
+    mock_generative_model.return_value = mock_model_instance
+
+    result = generate_application_bundle(
+        sample_config, "Designer", "Acme", "LinkedIn", "My CV", "Job description"
+    )
+
+    assert result == {
+        "cover_letter": "Surat",
+        "match_score": 88,
+        "cv_suggestions": "- Tambahkan portofolio\n- Sebutkan Canva",
+        "bundled": True,
+    }
+    assert mock_model_instance.generate_content.call_count == 1
+    prompt = mock_model_instance.generate_content.call_args.args[0]
+    assert prompt.count("My CV") == 1
+    assert '"cv_suggestions"' in prompt
+    assert "match_score" not in prompt
+
+
+def test_application_bundle_without_score_is_valid(mock_generative_model, sample_config):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.return_value.text = (
+        '{"cover_letter": "Surat", "cv_suggestions": ["Tambahkan portofolio"]}'
+    )
+    mock_generative_model.return_value = mock_model_instance
+
+    result = generate_application_bundle(
+        sample_config, "Designer", "Acme", "LinkedIn", "My CV", "Job description"
+    )
+
+    assert result["bundled"] is True
+    assert result["cover_letter"] == "Surat"
+    assert mock_model_instance.generate_content.call_count == 1
+
+
+def test_generate_application_bundle_falls_back_to_split_calls(
+    mock_generative_model, sample_config
+):
+    responses = iter(
+        [
+            '{"cover_letter": "Surat", "match_score": 88}',  # cv_suggestions hilang
+            '{"cover_letter": "Surat terpisah", "match_score": 70}',
+            "Saran terpisah",
+        ]
+    )
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content.side_effect = lambda prompt: MagicMock(
+        text=next(responses)
+    )
+    mock_generative_model.return_value = mock_model_instance
+
+    result = generate_application_bundle(
+        sample_config, "Designer", "Acme", "LinkedIn", "My CV", "Job description"
+    )
+
+    assert result == {
+        "cover_letter": "Surat terpisah",
+        "match_score": 70,
+        "cv_suggestions": "Saran terpisah",
+        "bundled": False,
+    }
+    assert mock_model_instance.generate_content.call_count == 3
+
+
+def test_agenerate_application_bundle(mock_generative_model, sample_config):
+    mock_model_instance = MagicMock()
+    mock_model_instance.generate_content_async = AsyncMock(
+        return_value=MagicMock(
+            text='{"cover_letter": "Surat", "match_score": 77, "cv_suggestions": "- Saran"}'
+        )
+    )
+    mock_generative_model.return_value = mock_model_instance
+
+    result = asyncio.run(
+        agenerate_application_bundle(
+            sample_config, "Designer", "Acme", "LinkedIn", "My CV", "Job description"
+        )
+    )
+
+    assert result["bundled"] is True
+    assert result["cv_suggestions"] == "- Saran"
@@ -0,0 +1,74 @@
+import gzip
+import os
+import threading
+
+from src.artifact_store import PROJECT_ROOT, ArtifactStore, get_artifact_store
+
+
+def test_put_deduplicates_by_content(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    letter = "Dengan hormat,\n" + "Saya tertarik melamar. " * 40
+
+    first = store.put(letter, suffix=".txt")
+    mtime = os.stat(first.path).st_mtime_ns
+    second = store.put(letter.encode("utf-8"), suffix=".txt")
+
+    assert first.created and not second.created
+    assert first.path == second.path and first.digest == second.digest
+    assert os.stat(second.path).st_mtime_ns == mtime
+    assert os.path.basename(os.path.dirname(first.path)) == first.digest[:2]
+    assert store.get(first.digest, ".txt") == letter.encode("utf-8")
+
+
+def test_compression_is_optional_and_skips_small_files(tmp_path):
+    compressed = ArtifactStore(str(tmp_path / "gz"))
+    plain = ArtifactStore(str(tmp_path / "plain"), compress=False)
+    data = b"a" * 4096
+
+    big = compressed.put(data, suffix=".txt")
+    small = compressed.put(b"pendek", suffix=".txt")
+    raw = plain.put(data, suffix=".txt")
+
+    assert big.compressed and big.path.endswith(".txt.gz")
+    assert os.path.getsize(big.path) < len(data)
+    assert gzip.decompress(open(big.path, "rb").read()) == data
+    assert not small.compressed and open(small.path, "rb").read() == b"pendek"
+    assert not raw.compressed and compressed.read(raw.path) == data
+    assert compressed.get("0" * 64) is None
+
+
+def test_concurrent_puts_write_once(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    results = []
+
+    def worker():
+        results.append(store.put(b"isi yang sama" * 100, suffix=".txt"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(result.created for result in results) == 1
+    assert len({result.path for result in results}) == 1
+    assert len(os.listdir(os.path.dirname(results[0].path))) == 1
+
+
+def test_store_paths_are_absolute_and_env_dir_resolves_from_project_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ArtifactStore("relatif")
+    assert os.path.isabs(store.put(b"isi", suffix=".txt").path)
+    assert store.root == str(tmp_path / "relatif")
+
+    monkeypatch.setattr("src.artifact_store._default_store", None)
+    monkeypatch.delenv("ARTIFACT_DIR", raising=False)
+    assert get_artifact_store().root == os.path.join(PROJECT_ROOT, "output", "artifacts")
+
+    monkeypatch.setattr("src.artifact_store._default_store", None)
+    monkeypatch.setenv("ARTIFACT_DIR", "data/artifacts")
+    assert get_artifact_store().root == os.path.join(PROJECT_ROOT, "data", "artifacts")
+
+    monkeypatch.setattr("src.artifact_store._default_store", None)
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path / "abs"))
+    assert get_artifact_store().root == str(tmp_path / "abs")
@@ -0,0 +1,103 @@
+import io
+import os
+
+import PyPDF2
+
+from src.attachments import (
+    DOCX_MIME_TYPE,
+    Attachment,
+    AttachmentCache,
+    detect_mime_type,
+    letter_attachment,
+    letter_pdf,
+)
+from src.email_sender import build_message
+
+
+def test_detect_mime_type_prefers_content():
+    assert detect_mime_type("cv.pdf", b"%PDF-1.7 ...") == "application/pdf"
+    assert detect_mime_type("cv.bin", b"%PDF-1.4 ...") == "application/pdf"
+    assert detect_mime_type("cv.docx", b"PK\x03\x04 isi zip") == DOCX_MIME_TYPE
+    assert detect_mime_type("cv", b"PK\x03\x04....word/document.xml") == DOCX_MIME_TYPE
+    assert detect_mime_type("cv.doc", b"\xd0\xcf\x11\xe0 ole") == "application/msword"
+    assert detect_mime_type("surat.txt", "Dengan hormat, café".encode("utf-8")) == "text/plain"
+    assert detect_mime_type("catatan", b"teks biasa") == "text/plain"
+    assert detect_mime_type("data", b"\x00\x01\x02") == "application/octet-stream"
+    assert detect_mime_type("foto.png", b"\x89PNG") == "image/png"
+
+
+def test_parts_are_cached_per_content_hash(tmp_path, monkeypatch):
+    cv = tmp_path / "cv.pdf"
+    cv.write_bytes(b"%PDF-1.4 " + b"x" * 10000)
+    cache = AttachmentCache()
+    reads = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        if str(path) == str(cv):
+            reads.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    parts = [cache.part_for(str(cv)) for _ in range(5)]
+    same_bytes = cache.part_for(Attachment("cv.pdf", cv.read_bytes()))
+
+    assert len(reads) == 1 and cache.file_reads == 1
+    assert all(part is parts[0] for part in parts) and same_bytes is parts[0]
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 5
+    assert parts[0].get_content_type() == "application/pdf"
+    assert parts[0]["Content-Transfer-Encoding"] == "base64"
+
+    # Berkas yang berubah dibaca dan di-encode ulang
+    cv.write_bytes(b"%PDF-1.4 baru")
+    os.utime(cv, ns=(1, 1))
+    assert cache.part_for(str(cv)).get_content() == b"%PDF-1.4 baru"
+    assert cache.file_reads == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = AttachmentCache(max_entries=2)
+    first = cache.part_for_bytes("a.txt", b"a")
+    cache.part_for_bytes("b.txt", b"b")
+    cache.part_for_bytes("a.txt", b"a")
+    cache.part_for_bytes("c.txt", b"c")
+
+    assert cache.part_for_bytes("a.txt", b"a") is first
+    assert cache.stats()["entries"] == 2 and cache.stats()["misses"] == 3
+
+
+def test_shared_parts_serialize_in_every_message(tmp_path):
+    cv = tmp_path / "cv.pdf"
+    cv.write_bytes(b"%PDF-1.4 isi cv")
+    messages = [
+        build_message(f"Lamaran {i}", "Isi", f"hrd{i}@example.com", "saya@example.com", [str(cv), Attachment("catatan.txt", b"halo")])
+        for i in range(2)
+    ]
+
+    for msg in messages:
+        raw = msg.as_bytes()
+        attachments = {part.get_filename(): part for part in msg.iter_attachments()}
+        assert b"hrd" in raw
+        assert attachments["cv.pdf"].get_content() == b"%PDF-1.4 isi cv"
+        assert attachments["catatan.txt"].get_content_type() == "text/plain"
+        assert attachments["catatan.txt"].get_content().strip() == "halo"
+
+
+def test_missing_file_is_skipped(tmp_path):
+    msg = build_message("Lamaran", "Isi", "hrd@example.com", "saya@example.com", [str(tmp_path / "hilang.pdf")])
+    assert list(msg.iter_attachments()) == []
+    assert msg.get_content().strip() == "Isi"
+
+
+def test_letter_is_rendered_to_pdf_once():
+    letter_pdf.cache_clear()
+    text = "Dengan hormat,\n\nSaya tertarik dengan posisi Backend Engineer."
+
+    first = letter_attachment("PT Maju", "Backend Engineer", text)
+    second = letter_attachment("PT Maju", "Backend Engineer", text)
+    reader = PyPDF2.PdfReader(io.BytesIO(first.data))
+
+    assert first.filename == "surat_lamaran_PT_Maju_Backend_Engineer.pdf"
+    assert first.data is second.data and letter_pdf.cache_info().hits == 1
+    assert "Backend Engineer" in reader.pages[0].extract_text()
+    assert reader.metadata.title == "Surat Lamaran - Backend Engineer - PT Maju"
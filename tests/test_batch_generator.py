@@ -0,0 +1,74 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.ai_service import FAILED_COVER_LETTER
+from src.batch_generator import BatchItem, generate_batch, load_batch_items
+
+
+@pytest.fixture
+def sample_config():
+    return {
+        "nama": "John Doe",
+        "email": "john.doe@example.com",
+        "telepon": "1234567890",
+        "keahlian": {"teknis": ["Python"], "non_teknis": ["Komunikasi"]},
+    }
+
+
+def test_load_batch_items_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "jobs.csv"
+    csv_path.write_text(
+        "posisi,perusahaan,sumber_lowongan,job_url,job_desc\n"
+        "Designer,Acme,LinkedIn,,Desain poster\n"
+        ",Tanpa Posisi,,,\n",
+        encoding="utf-8",
+    )
+    jsonl_path = tmp_path / "jobs.jsonl"
+    jsonl_path.write_text(
+        json.dumps({"posisi": "Admin", "perusahaan": "Beta", "job_url": "http://x"}) + "\n",
+        encoding="utf-8",
+    )
+
+    csv_items = load_batch_items(str(csv_path))
+    jsonl_items = load_batch_items(str(jsonl_path))
+
+    assert csv_items == [BatchItem("Designer", "Acme", "LinkedIn", "", "Desain poster")]
+    assert jsonl_items[0].job_url == "http://x"
+
+
+def test_generate_batch_streams_results(tmp_path, sample_config):
+    items = [BatchItem(f"Posisi {i}", f"PT {i}", job_desc="desc") for i in range(5)]
+
+    def fake_generate(config, posisi, perusahaan, *args):
+        if perusahaan == "PT 3":
+            return {"cover_letter": FAILED_COVER_LETTER, "match_score": 0}
+        return {"cover_letter": f"Surat untuk {perusahaan}", "match_score": 70}
+
+    output_path = tmp_path / "out" / "batch.jsonl"
+    with patch("src.batch_generator.generate_cover_letter", side_effect=fake_generate):
+        report = generate_batch(sample_config, items, "CV", str(output_path), max_workers=3)
+
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert len(records) == 5
+    assert report.total == 5
+    assert report.succeeded == 4
+    assert report.failed == 1
+    assert len(report.latencies) == 5
+    assert "surat/menit" in report.summary()
+    assert {r["perusahaan"] for r in records if r["error"]} == {"PT 3"}
+
+
+def test_generate_batch_scrapes_url_when_no_description(tmp_path, sample_config):
+    items = [BatchItem("Designer", "Acme", job_url="http://example.com/job")]
+    with patch(
+        "src.batch_generator.scrape_job_description", return_value="Scraped"
+    ) as mock_scrape, patch(
+        "src.batch_generator.generate_cover_letter",
+        return_value={"cover_letter": "Surat", "match_score": 50},
+    ) as mock_generate:
+        generate_batch(sample_config, items, None, str(tmp_path / "batch.jsonl"))
+
+    mock_scrape.assert_called_once_with("http://example.com/job")
+    assert mock_generate.call_args.args[5] == "Scraped"
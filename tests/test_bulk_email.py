@@ -0,0 +1,126 @@
+import json
+
+from src.bulk_email import BulkEmail, bulk_emails_from_batch, send_bulk
+from src.email_outbox import RateLimiter
+from src.email_sender import smtp_settings_from_env
+
+
+def _emails(count):
+    return [
+        BulkEmail(to_email=f"hrd{i}@example.com", subject=f"Lamaran {i}", body=f"Surat {i}")
+        for i in range(count)
+    ]
+
+
+def test_send_bulk_pipelines_over_limited_connections(smtp_server):
+    progress = []
+
+    report = send_bulk(
+        _emails(8),
+        "saya@example.com",
+        max_connections=2,
+        rate_per_minute=0,
+        on_progress=lambda done, total, result: progress.append((done, total)),
+    )
+
+    assert report.sent == 8 and report.failed == 0
+    assert report.connections == 2 and len(smtp_server.peers) == 2
+    assert sorted(m.rcpt_tos[0] for m in smtp_server.messages) == sorted(f"hrd{i}@example.com" for i in range(8))
+    assert [r.index for r in report.results] == list(range(8))
+    assert progress[-1] == (8, 8) and len(progress) == 8
+
+
+def test_send_bulk_throttles_per_minute(smtp_server, monkeypatch):
+    waits = []
+    # Jam palsu yang tidak maju: setiap slot kirim dipesan satu detik setelah slot sebelumnya
+    monkeypatch.setattr(
+        "src.bulk_email.RateLimiter",
+        lambda per_minute: RateLimiter(per_minute, clock=lambda: 0.0, sleep=waits.append),
+    )
+
+    report = send_bulk(_emails(4), "saya@example.com", max_connections=3, rate_per_minute=60)
+
+    assert report.sent == 4
+    assert sorted(waits) == [1.0, 2.0, 3.0]
+
+
+def test_send_bulk_retries_and_reports_failures(smtp_server, tmp_path):
+    smtp_server.fail_next = 1
+    report = send_bulk(_emails(2), "saya@example.com", max_connections=1, rate_per_minute=0)
+
+    assert report.sent == 2
+    assert [r.attempts for r in report.results] == [2, 1]
+
+    smtp_server.fail_next = 1
+    smtp_server.fail_code = "550 5.1.1 Mailbox tidak ada"
+    report = send_bulk(_emails(2), "saya@example.com", max_connections=1, rate_per_minute=0)
+    report.write_csv(str(tmp_path / "laporan" / "kirim.csv"))
+
+    failed = [r for r in report.results if not r.ok]
+    assert report.failed == 1 and failed[0].attempts == 1 and "550" in failed[0].error
+    lines = (tmp_path / "laporan" / "kirim.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("index,to_email") and len(lines) == 3
+    assert "Terkirim / gagal : 1 / 1" in report.summary()
+
+
+def test_send_bulk_reports_connection_errors():
+    settings = smtp_settings_from_env("saya@example.com")
+    settings.host, settings.port, settings.security, settings.timeout = "127.0.0.1", 1, "none", 1
+
+    report = send_bulk(_emails(2), "saya@example.com", settings=settings, rate_per_minute=0)
+
+    assert report.failed == 2 and all(r.attempts == 2 for r in report.results)
+
+
+def test_send_bulk_marks_history_rows_sent(smtp_server, tmp_path, monkeypatch):
+    from src import history_manager
+
+    monkeypatch.setattr(history_manager, "DB_FILE", str(tmp_path / "history.db"))
+    application_id = history_manager.save_generation(
+        history_manager.GenerationRecord(company="Gojek", position="Dev", letter_text="Surat")
+    )
+    email = BulkEmail(to_email="hrd@example.com", subject="Lamaran", body="Surat", application_id=application_id)
+
+    send_bulk([email], "saya@example.com", rate_per_minute=0)
+
+    assert history_manager.load_history()[0]["status"] == history_manager.STATUS_SENT
+    history_manager.close_pool()
+
+
+def test_bulk_emails_from_batch_skips_failed_rows(tmp_path):
+    path = tmp_path / "batch.jsonl"
+    records = [
+        {"posisi": "Dev", "perusahaan": "A", "email_tujuan": "hrd@a.com", "cover_letter": "Surat A", "error": None},
+        {"posisi": "QA", "perusahaan": "B", "email_tujuan": "", "cover_letter": "Surat B", "error": None},
+        {"posisi": "PM", "perusahaan": "C", "email_tujuan": "hrd@c.com", "cover_letter": "", "error": "Gagal"},
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records), encoding="utf-8")
+
+    emails = bulk_emails_from_batch(str(path), {"nama": "Budi"}, attachments=["cv.pdf"])
+
+    assert [(e.to_email, e.subject, e.body) for e in emails] == [("hrd@a.com", "Lamaran Kerja - Dev - Budi", "Surat A")]
+    letter, cv = emails[0].attachments
+    assert letter.filename == "surat_lamaran_A_Dev.pdf" and letter.data.startswith(b"%PDF-")
+    assert cv == "cv.pdf"
+    assert bulk_emails_from_batch(str(path), {"nama": "Budi"}, attach_letter=False)[0].attachments == []
+
+
+def test_bulk_emails_from_batch_records_history_once(tmp_path, monkeypatch):
+    from src import history_manager
+    from src.artifact_store import ArtifactStore
+
+    monkeypatch.setattr(history_manager, "DB_FILE", str(tmp_path / "history.db"))
+    monkeypatch.setattr(history_manager, "get_artifact_store", lambda: ArtifactStore(str(tmp_path / "artifacts")))
+    path = tmp_path / "batch.jsonl"
+    path.write_text(
+        json.dumps({"posisi": "Dev", "perusahaan": "A", "email_tujuan": "hrd@a.com", "cover_letter": "Surat A", "match_score": 70}),
+        encoding="utf-8",
+    )
+
+    first = bulk_emails_from_batch(str(path), {"nama": "Budi"}, record_history=True)
+    again = bulk_emails_from_batch(str(path), {"nama": "Budi"}, record_history=True)
+
+    assert first[0].application_id is not None
+    assert again[0].application_id == first[0].application_id
+    assert history_manager.count_history() == 1
+    history_manager.close_pool()
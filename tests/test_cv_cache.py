@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from src.cv_cache import CVCache, load_cv_profile, load_cv_text
+
+
+def test_memory_and_disk_hits(tmp_path):
+    path = str(tmp_path / "cv.db")
+    cache = CVCache(path)
+    digest = CVCache.digest(b"%PDF isi cv")
+    cache.set(digest, {"text": "Teks CV"})
+
+    assert cache.get(digest) == {"text": "Teks CV"}
+    assert cache.memory_hits == 1
+    cache.close()
+
+    # Instance baru (mis. setelah restart) membaca dari disk, lalu dari memori
+    restarted = CVCache(path)
+    assert restarted.get(digest) == {"text": "Teks CV"}
+    assert restarted.get(digest) == {"text": "Teks CV"}
+    assert restarted.get("tidak-ada") is None
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.stats()["memory_hits"] == 1
+    assert restarted.stats()["misses"] == 1
+    restarted.close()
+
+
+def test_memory_entries_are_bounded(tmp_path):
+    cache = CVCache(str(tmp_path / "cv.db"), memory_entries=2)
+    for name in ("a", "b", "c"):
+        cache.set(name, {"text": name})
+
+    assert cache.get("a") == {"text": "a"}
+    assert (cache.memory_hits, cache.disk_hits) == (0, 1)
+    cache.close()
+
+
+def test_load_cv_text_parses_same_bytes_once(tmp_path):
+    cache = CVCache(str(tmp_path / "cv.db"))
+
+    with patch("src.cv_cache.extract_text_from_pdf", return_value="Teks CV") as mock_extract:
+        first = load_cv_text(b"%PDF-1.4 sama", cache)
+        second = load_cv_text(b"%PDF-1.4 sama", cache)
+        other = load_cv_text(b"%PDF-1.4 berbeda", cache)
+
+    assert first == second == other == "Teks CV"
+    assert mock_extract.call_count == 2
+    cache.close()
+
+
+def test_load_cv_text_does_not_cache_failures(tmp_path):
+    cache = CVCache(str(tmp_path / "cv.db"))
+
+    with patch("src.cv_cache.extract_text_from_pdf", side_effect=[None, "Teks CV"]):
+        assert load_cv_text(b"%PDF rusak sementara", cache) is None
+        assert load_cv_text(b"%PDF rusak sementara", cache) == "Teks CV"
+    assert load_cv_text(str(tmp_path / "tidak_ada.pdf"), cache) is None
+    cache.close()
+
+
+def test_disabled_cache_always_parses(tmp_path):
+    cache = CVCache(str(tmp_path / "cv.db"), enabled=False)
+
+    with patch("src.cv_cache.extract_text_from_pdf", return_value="Teks CV") as mock_extract:
+        load_cv_text(b"%PDF", cache)
+        load_cv_text(b"%PDF", cache)
+
+    assert mock_extract.call_count == 2
+
+
+def test_load_cv_profile_restores_sections_from_disk(tmp_path):
+    path = str(tmp_path / "cv.db")
+    text = "Nama\nTENTANG SAYA\nPengembang web.\nKEAHLIAN\nPython: Django."
+    with patch("src.cv_cache.extract_text_from_pdf", return_value=text):
+        load_cv_profile(b"%PDF profil", CVCache(path))
+
+    restarted = CVCache(path)
+    with patch("src.cv_cache.extract_text_from_pdf") as mock_extract, patch(
+        "src.cv_parser.parse_cv_profile"
+    ) as mock_parse:
+        profile = load_cv_profile(b"%PDF profil", restarted)
+
+    mock_extract.assert_not_called()
+    mock_parse.assert_not_called()
+    assert profile.skill_names() == ["Python"]
+    assert profile.section("summary") == "Pengembang web."
+    restarted.close()
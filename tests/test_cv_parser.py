@@ -1,6 +1,17 @@
+import io
 import os
+from unittest.mock import patch
+
+import PyPDF2
 import pytest
-from src.cv_parser import extract_text_from_pdf
+from src.cv_parser import (
+    PARALLEL_MIN_PAGES,
+    CVProfile,
+    extract_text_from_pdf,
+    get_cv_profile,
+    iter_pdf_pages,
+    parse_cv_profile,
+)
 
 # Path ke CV Kerja.pdf (asumsi ada di root proyek)
 # Sesuaikan path ini jika CV Kerja.pdf berada di lokasi lain
@@ -38,3 +49,180 @@ def test_extract_text_from_pdf_invalid_file():
     extracted_text = extract_text_from_pdf(invalid_file_path)
     assert extracted_text is None
     os.remove(invalid_file_path) # Bersihkan file dummy
+
+
+def _text_pdf(pages):
+    """Membuat PDF minimal dengan satu baris teks per halaman."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+def test_extract_text_accepts_bytes_and_streams():
+    data = _text_pdf(["Halaman satu", "Halaman dua"])
+
+    assert extract_text_from_pdf(data) == "Halaman satu\nHalaman dua"
+    assert extract_text_from_pdf(io.BytesIO(data)) == "Halaman satu\nHalaman dua"
+
+
+def test_iter_pdf_pages_yields_each_page_extracting_once():
+    data = _text_pdf([f"Halaman {i}" for i in range(3)])
+
+    with patch.object(PyPDF2.PageObject, "extract_text", autospec=True, side_effect=lambda page: "x") as mock_extract:
+        pages = iter_pdf_pages(data)
+        assert next(pages) == "x"
+        assert mock_extract.call_count == 1
+        assert list(pages) == ["x", "x"]
+    assert mock_extract.call_count == 3
+
+
+def test_extract_text_in_process_pool_keeps_page_order():
+    data = _text_pdf([f"Halaman {i}" for i in range(PARALLEL_MIN_PAGES + 2)])
+
+    with patch("src.cv_parser.os.cpu_count", return_value=2):
+        text = extract_text_from_pdf(data, max_workers=2)
+
+    assert text.splitlines() == [f"Halaman {i}" for i in range(PARALLEL_MIN_PAGES + 2)]
+
+
+SAMPLE_CV_TEXT = """Budi Santoso
+Email: budi@example.com | Phone: 0812-0000-0000TENTANG SAYASaya pengembang web yang suka belajar hal baru dan
+bekerja dalam tim.
+P E N G A L A M A N K E R J
+Web Developer di PT Contoh | Januari 2021 – sekarang
+Membangun aplikasi internal dengan Django.
+Mengelola database PostgreSQL.
+K E T E R A M P I L A N
+Teknis
+Python: Django, Flask, dan FastAPI untuk layanan web,
+REST API, dan integrasi pihak ketiga
+Non-Teknis
+Komunikasi: Presentasi dan dokumentasi.
+RIWAYAT PENDIDIKAN
+S1 Informatika Universitas Contoh (2016 – 2020)
+IPK 3,5"""
+
+
+def test_parse_cv_profile_splits_glued_and_letter_spaced_headings():
+    profile = parse_cv_profile(SAMPLE_CV_TEXT)
+
+    assert [section.name for section in profile.sections] == [
+        "summary",
+        "experience",
+        "skills",
+        "education",
+    ]
+    assert "budi@example.com" in profile.header
+    assert profile.section("summary") == (
+        "Saya pengembang web yang suka belajar hal baru dan bekerja dalam tim."
+    )
+
+
+def test_parse_cv_profile_extracts_skills_and_entries():
+    profile = parse_cv_profile(SAMPLE_CV_TEXT)
+
+    assert profile.skill_names() == ["Python", "Komunikasi"]
+    assert profile.skills[0].category == "Teknis"
+    assert profile.skills[0].detail.endswith("integrasi pihak ketiga")
+    assert profile.skills[1].category == "Non-Teknis"
+    assert [(e.title, e.period) for e in profile.experience] == [
+        ("Web Developer di PT Contoh", "Januari 2021 – sekarang")
+    ]
+    assert profile.experience[0].details == [
+        "Membangun aplikasi internal dengan Django.",
+        "Mengelola database PostgreSQL.",
+    ]
+    assert profile.education[0].title == "S1 Informatika Universitas Contoh"
+    assert profile.education[0].period == "2016 – 2020"
+
+
+def test_prompt_text_keeps_header_and_falls_back_for_unstructured_cv():
+    profile = parse_cv_profile(SAMPLE_CV_TEXT)
+    prompt_text = profile.to_prompt_text()
+
+    assert prompt_text.startswith("Budi Santoso\nEmail: budi@example.com")
+    assert "\n\n[SUMMARY]\nSaya pengembang web" in prompt_text
+    assert profile.to_prompt_text(["skills"]).split("\n\n")[1].startswith("[SKILLS]\nTeknis")
+    assert parse_cv_profile("CV tanpa judul bagian").to_prompt_text() == "CV tanpa judul bagian"
+
+
+def test_mixed_case_headings_on_their_own_line_are_detected():
+    text = (
+        "Rina Wulandari\n"
+        "Profil:\n"
+        "Analis data dengan tiga tahun pengalaman.\n"
+        "Pengalaman Kerja\n"
+        "Data Analyst di PT Maju | 2021 – sekarang\n"
+        "Membuat dasbor penjualan.\n"
+        "Skills\n"
+        "SQL, Python, Tableau"
+    )
+    profile = parse_cv_profile(text)
+
+    assert [section.name for section in profile.sections] == ["summary", "experience", "skills"]
+    assert profile.header == "Rina Wulandari"
+    assert profile.skill_names() == ["SQL", "Python", "Tableau"]
+
+
+def test_heading_words_inside_sentences_do_not_split_cv():
+    text = (
+        "Andi Wijaya\n"
+        "Other: fluent in English; SOFT SKILLS: communication, teamwork\n"
+        "Bekerja di PT MAJU BAHASA Indonesia sebagai penerjemah."
+    )
+    profile = parse_cv_profile(text)
+
+    assert profile.sections == []
+    assert profile.to_prompt_text() == text
+
+
+def test_prompt_text_falls_back_when_sections_cover_little_of_cv():
+    intro = "Pengalaman saya mencakup analisis data, pelaporan, dan otomasi proses bisnis. " * 5
+    profile = parse_cv_profile(f"Andi Wijaya\n{intro}\nBAHASA\nInggris")
+
+    assert [section.name for section in profile.sections] == ["languages"]
+    assert profile.to_prompt_text() == profile.raw_text
+
+
+def test_profile_records_use_slots_and_roundtrip_through_dict():
+    profile = parse_cv_profile(SAMPLE_CV_TEXT)
+
+    assert not hasattr(profile, "__dict__")
+    assert not hasattr(profile.skills[0], "__dict__")
+    assert CVProfile.from_dict(profile.to_dict()) == profile
+
+
+def test_get_cv_profile_parses_each_cv_once():
+    with patch("src.cv_parser.parse_cv_profile", wraps=parse_cv_profile) as mock_parse:
+        first = get_cv_profile(SAMPLE_CV_TEXT + " unik")
+        second = get_cv_profile(SAMPLE_CV_TEXT + " unik")
+
+    assert first is second
+    assert mock_parse.call_count == 1
+
+
+def test_bundled_cv_profile(sample_cv_pdf):
+    profile = parse_cv_profile(extract_text_from_pdf(sample_cv_pdf))
+
+    assert {"summary", "experience", "skills", "education"} <= {s.name for s in profile.sections}
+    assert "Microsoft Office" in profile.skill_names()
+    assert "Funcom" in profile.experience[0].title
@@ -0,0 +1,165 @@
+import sqlite3
+import time
+from unittest.mock import Mock
+
+from src.email_outbox import (
+    STATUS_FAILED,
+    STATUS_QUEUED,
+    STATUS_SENDING,
+    STATUS_SENT,
+    EmailOutbox,
+    RateLimiter,
+)
+from src.email_sender import build_message, smtp_settings_from_env
+
+
+def _outbox(tmp_path, **kwargs):
+    kwargs.setdefault("rate_per_minute", 0)
+    kwargs.setdefault("retry_delay_s", 0)
+    return EmailOutbox(smtp_settings_from_env("saya@example.com"), path=str(tmp_path / "outbox.db"), **kwargs)
+
+
+def _message(i=0, to="hrd@example.com"):
+    return build_message(f"Lamaran {i}", f"Isi surat {i}", to, "saya@example.com")
+
+
+def test_process_pending_sends_over_one_connection(smtp_server, tmp_path):
+    outbox = _outbox(tmp_path)
+    ids = [outbox.enqueue(_message(i)) for i in range(5)]
+
+    assert outbox.counts() == {STATUS_QUEUED: 5}
+    assert outbox.process_pending() == 5
+    assert [outbox.get(i).status for i in ids] == [STATUS_SENT] * 5
+    assert outbox.smtp.connects == 1 and len(smtp_server.peers) == 1
+    assert [m.rcpt_tos for m in smtp_server.messages] == [["hrd@example.com"]] * 5
+    outbox.close()
+
+
+def test_background_worker_drains_queue(smtp_server, tmp_path):
+    outbox = _outbox(tmp_path, poll_interval_s=0.05)
+    outbox.start()
+    message_id = outbox.enqueue(_message())
+    deadline = time.monotonic() + 5
+    while outbox.get(message_id).status != STATUS_SENT and time.monotonic() < deadline:
+        time.sleep(0.02)
+    outbox.stop(timeout=5)
+
+    assert outbox.get(message_id).status == STATUS_SENT
+    assert not outbox.running
+    outbox.close()
+
+
+def test_temporary_failure_is_retried(smtp_server, tmp_path):
+    smtp_server.fail_next = 1
+    outbox = _outbox(tmp_path)
+    message_id = outbox.enqueue(_message())
+
+    outbox.process_pending()
+    message = outbox.get(message_id)
+
+    assert message.status == STATUS_SENT and message.attempts == 2
+    assert len(smtp_server.messages) == 1
+
+
+def test_permanent_failure_and_attempt_limit(smtp_server, tmp_path):
+    smtp_server.fail_next = 1
+    smtp_server.fail_code = "550 5.1.1 Mailbox tidak ada"
+    outbox = _outbox(tmp_path)
+    rejected = outbox.enqueue(_message())
+    outbox.process_pending()
+
+    smtp_server.fail_next = 10
+    smtp_server.fail_code = "451 4.3.0 Coba lagi nanti"
+    exhausted = outbox.enqueue(_message(1))
+    outbox.process_pending()
+
+    assert outbox.get(rejected).status == STATUS_FAILED and outbox.get(rejected).attempts == 1
+    assert "550" in outbox.get(rejected).last_error
+    assert outbox.get(exhausted).status == STATUS_FAILED and outbox.get(exhausted).attempts == 3
+    outbox.close()
+
+
+def test_queue_survives_restart_and_resets_in_flight(smtp_server, tmp_path):
+    first = _outbox(tmp_path)
+    queued = first.enqueue(_message())
+    in_flight = first.enqueue(_message(1))
+    first._connection().execute("UPDATE outbox SET status = 'sending' WHERE id = ?", (in_flight,))
+    first._connection().commit()
+    first.close()
+
+    second = _outbox(tmp_path)
+    assert second.process_pending() == 2
+    assert second.get(queued).status == second.get(in_flight).status == STATUS_SENT
+    second.close()
+
+
+class _RacingConnection:
+    # Membiarkan proses lain mengambil email tepat sebelum UPDATE klaim dijalankan
+    def __init__(self, conn, path, raced_id):
+        self._conn, self._path, self._raced_id = conn, path, raced_id
+
+    def execute(self, sql, params=()):
+        if sql.startswith("UPDATE outbox SET status = ?, claimed_at") and params[2] == self._raced_id:
+            with sqlite3.connect(self._path) as other:
+                other.execute("UPDATE outbox SET status = ? WHERE id = ?", (STATUS_SENDING, self._raced_id))
+            other.close()
+        return self._conn.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_processes_sharing_an_outbox_never_send_the_same_email(smtp_server, tmp_path):
+    first, second = _outbox(tmp_path), _outbox(tmp_path)
+    message_id = first.enqueue(_message())
+    assert first._claim()[0] == message_id
+
+    # Email yang baru diambil proses lain tidak dikembalikan ke antrean saat outbox dibuka
+    assert second._claim() is None
+    assert second.get(message_id).status == STATUS_SENDING
+
+    raced_id = first.enqueue(_message(1))
+    next_id = first.enqueue(_message(2))
+    second._conn = _RacingConnection(second._connection(), str(tmp_path / "outbox.db"), raced_id)
+    assert second._claim()[0] == next_id
+
+    first.close()
+    second.close()
+
+
+def test_stale_sending_email_is_requeued(smtp_server, tmp_path):
+    first = _outbox(tmp_path)
+    message_id = first.enqueue(_message())
+    first._claim()
+
+    restarted = _outbox(tmp_path, stale_after_s=0)
+    assert restarted.process_pending() == 1
+    assert restarted.get(message_id).status == STATUS_SENT
+    first.close()
+    restarted.close()
+
+
+def test_on_sent_callback_receives_application_id(smtp_server, tmp_path):
+    on_sent = Mock()
+    outbox = _outbox(tmp_path, on_sent=on_sent)
+    outbox.enqueue(_message(), application_id=42)
+    outbox.process_pending()
+
+    assert on_sent.call_args[0][0].application_id == 42
+    outbox.close()
+
+
+def test_rate_limiter_spaces_sends_evenly():
+    now = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(30, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.wait()
+
+    assert sleeps == [2.0, 2.0]
+    assert RateLimiter(0).wait() == 0
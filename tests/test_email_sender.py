@@ -0,0 +1,78 @@
+import smtplib
+import socket
+
+import pytest
+
+from src.email_sender import (
+    SMTPConnection,
+    build_message,
+    send_email_with_attachments,
+    smtp_settings_from_env,
+)
+
+
+def test_build_message_attaches_existing_files(tmp_path):
+    attachment = tmp_path / "cv.pdf"
+    attachment.write_bytes(b"%PDF-1.4 isi")
+
+    msg = build_message("Lamaran", "Isi", "hrd@example.com", "saya@example.com", [str(attachment), str(tmp_path / "hilang.pdf")])
+
+    files = [(part.get_filename(), part.get_content()) for part in msg.iter_attachments()]
+    assert files == [("cv.pdf", b"%PDF-1.4 isi")]
+    assert msg["To"] == "hrd@example.com"
+
+
+def test_send_email_uses_configured_host(smtp_server):
+    send_email_with_attachments("Lamaran", "Isi surat", "hrd@example.com", "saya@example.com")
+
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.messages[0].rcpt_tos == ["hrd@example.com"]
+
+
+def test_connection_is_reused_across_messages(smtp_server):
+    with SMTPConnection(smtp_settings_from_env("saya@example.com")) as smtp:
+        for i in range(3):
+            smtp.send(build_message(f"Lamaran {i}", "Isi", "hrd@example.com", "saya@example.com"))
+
+    assert len(smtp_server.messages) == 3
+    assert smtp.connects == 1
+    assert len(smtp_server.peers) == 1
+
+
+def test_idle_connection_reconnects_before_sending(smtp_server):
+    smtp = SMTPConnection(smtp_settings_from_env("saya@example.com"), idle_check_s=0)
+    smtp.send(build_message("Pertama", "Isi", "hrd@example.com", "saya@example.com"))
+    # Putuskan soket seperti server yang menutup koneksi menganggur
+    smtp._smtp.sock.shutdown(socket.SHUT_RDWR)
+    smtp.send(build_message("Kedua", "Isi", "hrd@example.com", "saya@example.com"))
+    smtp.close()
+
+    assert len(smtp_server.messages) == 2
+    assert smtp.connects == 2
+
+
+def test_disconnect_during_send_is_raised_not_resent(smtp_server):
+    smtp = SMTPConnection(smtp_settings_from_env("saya@example.com"))
+    smtp.send(build_message("Pertama", "Isi", "hrd@example.com", "saya@example.com"))
+    smtp._smtp.sock.shutdown(socket.SHUT_RDWR)
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        smtp.send(build_message("Kedua", "Isi", "hrd@example.com", "saya@example.com"))
+    assert smtp.connects == 1
+
+    # Percobaan ulang dari pemanggil memakai koneksi baru
+    smtp.send(build_message("Kedua", "Isi", "hrd@example.com", "saya@example.com"))
+    smtp.close()
+    assert len(smtp_server.messages) == 2
+    assert smtp.connects == 2
+
+
+def test_idle_connection_is_checked_with_noop(smtp_server, monkeypatch):
+    smtp = SMTPConnection(smtp_settings_from_env("saya@example.com"), idle_check_s=0)
+    smtp.send(build_message("Pertama", "Isi", "hrd@example.com", "saya@example.com"))
+    calls = []
+    original_noop = smtplib.SMTP.noop
+    monkeypatch.setattr(smtplib.SMTP, "noop", lambda self: calls.append(1) or original_noop(self))
+    smtp.send(build_message("Kedua", "Isi", "hrd@example.com", "saya@example.com"))
+    smtp.close()
+
+    assert calls and smtp.connects == 1
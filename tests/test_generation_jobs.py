@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src import history_manager
+from src.ai_service import FAILED_COVER_LETTER
+from src.cv_cache import CVCache
+from src.generation_jobs import (
+    JOB_FOLLOW_UP_EMAIL,
+    cancel_job,
+    register_generation_jobs,
+    submit_cover_letter_job,
+)
+from src.job_queue import JOB_FAILED, JOB_SUCCEEDED, JobQueue
+from src.pdf_writer import render_text_pdf
+from src.response_cache import ResponseCache
+from src.stream_parser import CoverLetterStreamParser
+
+CONFIG = {
+    "nama": "John Doe",
+    "email": "john.doe@example.com",
+    "telepon": "1234567890",
+    "keahlian": {"teknis": ["Python", "SQL"], "non_teknis": ["Komunikasi"]},
+}
+JOB_DESC = "Kami mencari Backend Engineer yang menguasai Python, SQL, dan Docker untuk tim data kami."
+CV_PDF = render_text_pdf("John Doe\nKETERAMPILAN\nPython, SQL, Komunikasi")
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.cv_cache._default_cache", CVCache(str(tmp_path / "cv.db")))
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr("src.artifact_store._default_store", None)
+    with patch("src.history_manager.DB_FILE", str(tmp_path / "history.db")):
+        job_queue = register_generation_jobs(JobQueue(path=str(tmp_path / "jobs.db")))
+        yield job_queue
+        job_queue.close()
+        history_manager.close_pool()
+
+
+def _stream(*chunks):
+    async def fake_stream(*args, **kwargs):
+        parser = CoverLetterStreamParser()
+        for chunk in chunks:
+            yield parser.feed(chunk)
+
+    return fake_stream
+
+
+def test_cover_letter_job_streams_scores_and_records_history(queue):
+    letter = json.dumps({"cover_letter": "Yth. HRD, saya melamar.", "match_score": 40})
+    with patch("src.generation_jobs.astream_cover_letter", _stream(letter[:20], letter[20:])), patch(
+        "src.generation_jobs.agenerate_cv_suggestions", AsyncMock(return_value="Tambahkan Docker")
+    ):
+        job_id = submit_cover_letter_job(
+            CONFIG, "Backend Engineer", "Acme", "LinkedIn", CV_PDF, cv_name="cv.pdf",
+            job_desc=JOB_DESC, bundle_mode=False, queue=queue,
+        )
+        queue.process_pending()
+
+    job = queue.get(job_id)
+    assert job.status == JOB_SUCCEEDED
+    result = job.result
+    assert result["cover_letter"] == "Yth. HRD, saya melamar."
+    assert result["match_score"] != 40
+    assert "docker" in result["missing_keywords"]
+    assert result["cv_suggestions"] == "Tambahkan Docker"
+    assert "Python" in result["cv_text"]
+    assert result["email_subject"] == "Lamaran Kerja - Backend Engineer - John Doe"
+    assert result["warnings"] == []
+    assert history_manager.load_letter_text(result["application_id"]) == "Yth. HRD, saya melamar."
+    # Salinan CV milik pekerjaan dihapus setelah pekerjaan selesai
+    assert not os.path.exists(job.payload["cv_path"])
+
+
+def test_cover_letter_job_records_token_usage(queue):
+    response = MagicMock(text=json.dumps({"cover_letter": "Surat", "match_score": 70, "cv_suggestions": "Saran"}))
+    response.usage_metadata.prompt_token_count = 900
+    response.usage_metadata.candidates_token_count = 250
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(return_value=response)
+    with patch("src.ai_service.get_model", return_value=model), patch(
+        "src.ai_service.response_cache", ResponseCache(":memory:")
+    ):
+        job_id = submit_cover_letter_job(CONFIG, "Dev", "Acme", "", CV_PDF, job_desc=JOB_DESC, queue=queue)
+        queue.process_pending()
+
+    result = queue.get(job_id).result
+    assert (result["prompt_tokens"], result["output_tokens"]) == (900, 250)
+    usage = history_manager.weekly_usage()
+    assert usage[0]["prompt_tokens"] == 900 and usage[0]["output_tokens"] == 250
+
+
+class _LoopBoundModel:
+    """Meniru klien grpc.aio: terikat pada event loop pertama dan gagal bila loop itu sudah ditutup."""
+
+    def __init__(self):
+        self.loop = None
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        loop = asyncio.get_running_loop()
+        if self.loop is None:
+            self.loop = loop
+        if self.loop is not loop or self.loop.is_closed():
+            raise RuntimeError("Event loop is closed")
+        self.calls += 1
+        return MagicMock(text=json.dumps({"cover_letter": f"Surat {self.calls}", "match_score": 70, "cv_suggestions": "Saran"}))
+
+
+def test_consecutive_cover_letter_jobs_share_one_event_loop(queue):
+    model = _LoopBoundModel()
+    with patch("src.ai_service.get_model", return_value=model), patch(
+        "src.ai_service.response_cache", ResponseCache(":memory:")
+    ):
+        first = submit_cover_letter_job(CONFIG, "Dev", "Acme", "", CV_PDF, job_desc=JOB_DESC, queue=queue)
+        queue.process_pending()
+        second = submit_cover_letter_job(CONFIG, "QA", "Acme", "", CV_PDF, job_desc=JOB_DESC, queue=queue)
+        queue.process_pending()
+
+    assert queue.get(first).status == JOB_SUCCEEDED
+    assert queue.get(second).status == JOB_SUCCEEDED
+    assert queue.get(second).result["cover_letter"] == "Surat 2"
+
+
+def test_cover_letter_job_uses_bundle_and_scrapes_url(queue):
+    bundle = AsyncMock(
+        return_value={"cover_letter": "Surat gabungan", "match_score": 70, "cv_suggestions": "Saran"}
+    )
+    with patch("src.generation_jobs.agenerate_application_bundle", bundle), patch(
+        "src.generation_jobs.scrape_job_description", return_value=JOB_DESC
+    ) as scrape:
+        job_id = submit_cover_letter_job(
+            CONFIG, "Dev", "Acme", "", CV_PDF, job_url="https://example.com/job", queue=queue
+        )
+        queue.process_pending()
+
+    scrape.assert_called_once_with("https://example.com/job")
+    assert bundle.call_args.args[5] == JOB_DESC
+    result = queue.get(job_id).result
+    assert result["cover_letter"] == "Surat gabungan"
+    assert result["cv_suggestions"] == "Saran"
+
+
+def test_scrape_failure_becomes_warning(queue):
+    letter = json.dumps({"cover_letter": "Surat", "match_score": 55})
+    with patch("src.generation_jobs.astream_cover_letter", _stream(letter)), patch(
+        "src.generation_jobs.scrape_job_description", side_effect=RuntimeError("timeout")
+    ):
+        job_id = submit_cover_letter_job(
+            CONFIG, "Dev", "Acme", "", CV_PDF, job_url="https://example.com/job", queue=queue
+        )
+        queue.process_pending()
+
+    result = queue.get(job_id).result
+    assert result["match_score"] == 55
+    assert result["missing_keywords"] is None
+    assert any("scraping URL: timeout" in warning for warning in result["warnings"])
+
+
+def test_failed_generation_fails_job(queue):
+    with patch("src.generation_jobs.astream_cover_letter", _stream("{")):
+        job_id = submit_cover_letter_job(CONFIG, "Dev", "Acme", "", CV_PDF, queue=queue)
+        queue.process_pending()
+
+    job = queue.get(job_id)
+    assert job.status == JOB_FAILED
+    assert FAILED_COVER_LETTER in job.error
+    assert history_manager.load_history() == []
+
+
+def test_follow_up_email_job(queue):
+    with patch("src.generation_jobs.stream_follow_up_email", return_value=iter(["Yth. ", "HRD"])):
+        job_id = queue.submit(
+            JOB_FOLLOW_UP_EMAIL, {"config": CONFIG, "posisi": "Dev", "perusahaan": "Acme"}
+        )
+        queue.process_pending()
+
+    assert queue.get(job_id).result == {
+        "text": "Yth. HRD",
+        "email_subject": "Tindak Lanjut Lamaran - Dev - John Doe",
+    }
+
+
+def test_shared_cv_is_kept_until_last_job_and_removed_on_cancel(queue):
+    letter = json.dumps({"cover_letter": "Surat", "match_score": 55})
+    with patch("src.generation_jobs.astream_cover_letter", _stream(letter)):
+        first = submit_cover_letter_job(CONFIG, "Dev", "Acme", "", CV_PDF, queue=queue, owner="sesi-a")
+        second = submit_cover_letter_job(CONFIG, "QA", "Acme", "", CV_PDF, queue=queue, owner="sesi-a")
+        cv_path = queue.get(first).payload["cv_path"]
+        assert queue.get(second).payload["cv_path"] == cv_path
+
+        queue.process_pending(limit=1)
+        # Pekerjaan kedua masih antre dengan CV yang sama
+        assert os.path.exists(cv_path)
+        assert not cancel_job(queue, second, owner="sesi-b")
+        assert cancel_job(queue, second, owner="sesi-a")
+
+    assert not os.path.exists(cv_path)
@@ -1,4 +1,7 @@
 import sqlite3
+import threading
+from datetime import date
+
 import pytest
 from unittest.mock import patch
 import importlib
@@ -46,3 +49,270 @@ def test_save_and_load_history():
         assert history[0]["company"] == "Test Corp"
         assert history[0]["position"] == "Software Engineer"
         assert history[0]["file_path"] == "/path/to/file"
+
+
+@pytest.fixture
+def pooled_db(tmp_path):
+    with patch("src.history_manager.DB_FILE", str(tmp_path / "history.db")):
+        yield history_manager.get_pool()
+    history_manager.close_pool()
+
+
+def test_pool_uses_wal_and_reuses_connections(pooled_db):
+    history_manager.init_db()
+    history_manager.save_application("A", "Dev", "/a")
+    history_manager.load_history()
+
+    with pooled_db.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert len(pooled_db._all) == 1
+
+
+def test_save_applications_batches_in_one_transaction(pooled_db):
+    saved = history_manager.save_applications(
+        [("A", "Dev", "/a"), ("B", "QA", "/b"), ("C", "PM", "/c")]
+    )
+
+    assert saved == 3
+    assert {entry["company"] for entry in history_manager.load_history()} == {"A", "B", "C"}
+    assert history_manager.save_applications([]) == 0
+
+
+def test_concurrent_saves_do_not_lock(pooled_db):
+    def worker(n):
+        for i in range(20):
+            history_manager.save_application(f"Perusahaan {n}", f"Posisi {i}", "/x")
+            history_manager.load_history()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(history_manager.load_history()) == 160
+    assert len(pooled_db._all) <= history_manager.POOL_SIZE
+
+
+def test_memory_database_shares_one_connection():
+    with patch("src.history_manager.DB_FILE", ":memory:"):
+        history_manager.save_application("Memori", "Dev", "/m")
+        assert [entry["company"] for entry in history_manager.load_history()] == ["Memori"]
+    history_manager.close_pool()
+
+
+def _insert(pool, rows):
+    with pool.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO applications (timestamp, company, position, file_path) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+
+def test_query_history_paginates_newest_first(pooled_db):
+    _insert(pooled_db, [(f"2024-01-{day:02d}T10:00:00", f"P{day}", "Dev", "/x") for day in range(1, 26)])
+
+    first = history_manager.query_history(limit=10)
+    second = history_manager.query_history(limit=10, offset=first.next_offset)
+    last = history_manager.query_history(limit=10, offset=20)
+
+    assert [e["company"] for e in first.entries] == [f"P{day}" for day in range(25, 15, -1)]
+    assert first.has_more and second.has_more
+    assert second.entries[0]["company"] == "P15"
+    assert len(last.entries) == 5 and not last.has_more
+
+
+def test_query_history_filters(pooled_db):
+    _insert(
+        pooled_db,
+        [
+            ("2024-03-01T09:00:00", "Tokopedia", "Backend Engineer", "/a"),
+            ("2024-03-05T23:59:00", "tokopedia", "Data Analyst", "/b"),
+            ("2024-03-10T08:00:00", "Gojek", "Senior Backend Developer", "/c"),
+        ],
+    )
+
+    assert history_manager.count_history(company="TOKOPEDIA") == 2
+    assert history_manager.count_history(position="backend") == 2
+    by_date = history_manager.query_history(date_from="2024-03-02", date_to=date(2024, 3, 5))
+    assert [e["company"] for e in by_date.entries] == ["tokopedia"]
+    assert history_manager.count_history(date_to="2024-03-10T07:00:00") == 2
+
+
+def test_full_text_search_matches_prefixes_and_ignores_fts_syntax(pooled_db):
+    _insert(
+        pooled_db,
+        [
+            ("2024-03-01T09:00:00", "Bank Mandiri", "Frontend Developer", "/a"),
+            ("2024-03-02T09:00:00", "Traveloka", "Product Manager", "/b"),
+        ],
+    )
+
+    assert pooled_db.fts_enabled
+    assert [e["company"] for e in history_manager.query_history(search="mandi").entries] == ["Bank Mandiri"]
+    assert history_manager.count_history(search="front dev") == 1
+    assert history_manager.count_history(search='"product* manager(') == 1
+    history_manager.save_application("Bukalapak", "Frontend Engineer", "/c")
+    assert history_manager.count_history(search="frontend") == 2
+
+
+def test_schema_creates_indexes_and_backfills_fts(tmp_path):
+    path = str(tmp_path / "lama.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE applications (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+        "company TEXT NOT NULL, position TEXT NOT NULL, file_path TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO applications (timestamp, company, position, file_path) VALUES ('2023-01-01', 'Lama', 'Dev', '/x')")
+    conn.commit()
+    conn.close()
+
+    with patch("src.history_manager.DB_FILE", path):
+        assert history_manager.count_history(search="lama") == 1
+        with history_manager.get_pool().connection() as pooled:
+            indexes = {row[0] for row in pooled.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            plan = " ".join(
+                str(row[-1])
+                for row in pooled.execute(
+                    "EXPLAIN QUERY PLAN SELECT id FROM applications ORDER BY timestamp DESC, id DESC LIMIT 20"
+                )
+            )
+    history_manager.close_pool()
+
+    assert {"idx_applications_timestamp", "idx_applications_company", "idx_applications_position"} <= indexes
+    assert "idx_applications_timestamp" in plan
+
+
+def test_migrations_upgrade_legacy_database_once(tmp_path):
+    path = str(tmp_path / "lama.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE applications (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+        "company TEXT NOT NULL, position TEXT NOT NULL, file_path TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO applications (timestamp, company, position, file_path) VALUES ('2023-01-01', 'Lama', 'Dev', '/x')")
+    conn.commit()
+
+    assert history_manager.migrate(conn) == history_manager.SCHEMA_VERSION
+    assert history_manager.migrate(conn) == history_manager.SCHEMA_VERSION
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(applications)")}
+    status = conn.execute("SELECT status FROM applications").fetchone()[0]
+    conn.close()
+
+    assert {name for name, _ in history_manager.GENERATION_COLUMNS} <= columns
+    assert status == history_manager.STATUS_GENERATED
+
+
+def test_failed_migration_rolls_back_version(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "gagal.db"))
+
+    def broken(conn):
+        conn.execute("CREATE TABLE setengah_jadi (id INTEGER)")
+        raise sqlite3.OperationalError("gagal")
+
+    with patch.object(history_manager, "MIGRATIONS", history_manager.MIGRATIONS + (broken,)), patch.object(
+        history_manager, "SCHEMA_VERSION", history_manager.SCHEMA_VERSION + 1
+    ):
+        with pytest.raises(sqlite3.OperationalError):
+            history_manager.migrate(conn)
+
+    assert history_manager.schema_version(conn) == history_manager.SCHEMA_VERSION
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'setengah_jadi'").fetchone() is None
+    conn.close()
+
+
+def test_save_generation_stores_compressed_letter_and_details(pooled_db):
+    letter = "Dengan hormat,\n" + "Saya tertarik melamar posisi ini. " * 50
+    application_id = history_manager.save_generation(
+        history_manager.GenerationRecord(
+            company="Tokopedia",
+            position="Backend Engineer",
+            letter_text=letter,
+            job_url="https://example.com/job",
+            job_desc_hash=history_manager.hash_job_description("Butuh  Python\nengineer"),
+            match_score=82,
+            model="gemini-1.5-flash",
+            writing_style="Formal",
+            prompt_tokens=1200,
+            output_tokens=400,
+            latency_ms=2500.0,
+        )
+    )
+
+    with pooled_db.connection() as conn:
+        stored = conn.execute("SELECT letter_text FROM applications WHERE id = ?", (application_id,)).fetchone()[0]
+    entry = history_manager.load_history()[0]
+
+    assert len(stored) < len(letter.encode("utf-8"))
+    assert history_manager.load_letter_text(application_id) == letter
+    assert entry["match_score"] == 82 and entry["status"] == "generated"
+    assert history_manager.hash_job_description("butuh python engineer") == history_manager.hash_job_description(
+        "Butuh  Python\nengineer"
+    )
+    assert history_manager.update_status(application_id, history_manager.STATUS_SENT)
+    assert history_manager.query_history().entries[0]["status"] == "sent"
+    assert history_manager.count_history(search="tokopedia") == 1
+
+
+def _insert_generations(pool, rows):
+    with pool.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO applications (timestamp, company, position, file_path, match_score, "
+            "prompt_tokens, output_tokens, latency_ms) VALUES (?, 'P', 'Dev', '', ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def test_aggregate_queries(pooled_db):
+    _insert_generations(
+        pooled_db,
+        [
+            ("2024-03-04T09:00:00.123456", 45, 1000, 200, 1000.0),
+            ("2024-03-10T23:00:00", 100, 3000, 800, 3000.0),
+            ("2024-03-11T08:00:00", 47, 2000, 0, None),
+            ("2024-03-12T08:00:00", None, None, None, 2000.0),
+        ],
+    )
+
+    latency = history_manager.latency_summary()
+    weeks = history_manager.weekly_usage(prompt_price_per_1m=1.0, output_price_per_1m=10.0)
+
+    assert latency == {"count": 3, "avg_ms": 2000.0, "min_ms": 1000.0, "max_ms": 3000.0}
+    assert history_manager.latency_summary(date_to="2024-03-10")["count"] == 2
+    assert history_manager.score_distribution() == [(40, 2), (90, 1)]
+    assert [(w["week_start"], w["generations"]) for w in weeks] == [("2024-03-04", 2), ("2024-03-11", 2)]
+    assert weeks[0]["prompt_tokens"] == 4000 and weeks[0]["output_tokens"] == 1000
+    assert weeks[0]["cost"] == pytest.approx((4000 * 1.0 + 1000 * 10.0) / 1_000_000)
+    assert weeks[1]["avg_latency_ms"] == 2000.0
+
+
+def test_save_letter_is_idempotent_per_generation(pooled_db, tmp_path):
+    from src.artifact_store import ArtifactStore
+
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+
+    def record():
+        return history_manager.GenerationRecord(
+            company="Gojek", position="Data Analyst", letter_text="Dengan hormat, " * 30, match_score=70
+        )
+
+    first = history_manager.save_letter(record(), store)
+    mtime = os.stat(history_manager.load_history()[0]["file_path"]).st_mtime_ns
+    for _ in range(5):
+        assert history_manager.save_letter(record(), store) == first
+    other = history_manager.GenerationRecord(company="Grab", position="Data Analyst", letter_text="Dengan hormat, " * 30)
+    other_id = history_manager.save_letter(other, store)
+
+    history = history_manager.load_history()
+    assert other_id != first and len(history) == 2
+    assert history[0]["file_path"] == history[1]["file_path"]
+    assert os.stat(history[0]["file_path"]).st_mtime_ns == mtime
+    assert store.read(history[0]["file_path"]).decode("utf-8") == "Dengan hormat, " * 30
+    assert history_manager.save_generations([record(), record()]) == [first, first]
+    with pytest.raises(sqlite3.IntegrityError):
+        with pooled_db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO applications (timestamp, company, position, file_path, content_hash) "
+                "SELECT timestamp, company, position, file_path, content_hash FROM applications WHERE id = ?",
+                (first,),
+            )
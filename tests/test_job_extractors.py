@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+from src import job_extractors
+from src.job_extractors import (
+    MIN_DESCRIPTION_CHARS,
+    available_extractors,
+    extract_job_description,
+    extract_json_ld,
+    get_extractor,
+    html_fragment_to_text,
+    register_extractor,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "job_pages")
+with open(os.path.join(FIXTURES_DIR, "expected.json"), "r", encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_fixture_pages_contain_expected_phrases(name):
+    text = extract_job_description(_load(name), EXPECTED[name]["url"])
+
+    for phrase in EXPECTED[name]["phrases"]:
+        assert phrase in text
+
+
+@pytest.mark.parametrize("name", ["linkedin.html", "jobstreet.html", "glints.html", "kalibrr.html"])
+def test_site_extractors_skip_navigation_and_footer(name):
+    text = extract_job_description(_load(name), EXPECTED[name]["url"])
+
+    for noise in EXPECTED[name]["noise"]:
+        assert noise not in text
+
+
+def test_get_extractor_matches_host_suffix():
+    assert get_extractor("https://id.linkedin.com/jobs/view/1").__name__ == "extract_linkedin"
+    assert get_extractor("https://www.jobstreet.co.id/job/1").__name__ == "extract_jobstreet"
+    assert get_extractor("https://notlinkedin.com/jobs") is None
+    assert get_extractor(None) is None
+    assert "glints.com" in available_extractors()
+
+
+def test_json_ld_reads_job_posting_from_graph():
+    text = extract_json_ld(_load("json_ld.html"))
+
+    assert text.splitlines()[0] == "Mobile Engineer - PT Sentosa Teknologi"
+    assert "<p>" not in text
+
+
+def test_json_ld_ignores_invalid_and_non_job_scripts():
+    html = (
+        '<script type="application/ld+json">{bukan json</script>'
+        '<script type="application/ld+json">{"@type": "Organization", "name": "X"}</script>'
+    )
+
+    assert extract_json_ld(html) is None
+
+
+def test_short_site_result_falls_back_to_generic():
+    html = (
+        '<div itemprop="description">Singkat</div>'
+        '<div class="job-description">Deskripsi lengkap dari halaman lowongan</div>'
+    )
+
+    result = extract_job_description(html, "https://www.kalibrr.id/job/1")
+
+    assert len("Singkat") < MIN_DESCRIPTION_CHARS
+    assert result == "Deskripsi lengkap dari halaman lowongan"
+
+
+def test_failing_extractor_does_not_break_extraction(monkeypatch):
+    monkeypatch.setattr(job_extractors, "_EXTRACTORS", dict(job_extractors._EXTRACTORS))
+
+    @register_extractor("rusak.example")
+    def extract_broken(html):
+        raise RuntimeError("selector berubah")
+
+    result = extract_job_description(
+        '<div class="job-description">Tetap terbaca</div>', "https://rusak.example/job"
+    )
+
+    assert result == "Tetap terbaca"
+
+
+def test_html_fragment_to_text_keeps_line_breaks():
+    assert html_fragment_to_text("<p>Satu &amp; dua</p><ul><li>A</li><li>B</li></ul>") == (
+        "Satu & dua\nA\nB"
+    )
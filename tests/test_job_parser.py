@@ -1,11 +1,23 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 from unittest.mock import patch, MagicMock
-from src.job_parser import scrape_job_description
+from src.job_parser import JobScraper, scrape_job_description
+from src.page_cache import PageCache
+
+
+@pytest.fixture(autouse=True)
+def uncached_default_scraper():
+    # Scraper default memakai cache di disk; tes memakai scraper tanpa cache agar terisolasi
+    with JobScraper() as scraper, patch("src.job_parser._default_scraper", scraper):
+        yield scraper
 
 
 @pytest.fixture
 def mock_requests_get():
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         yield mock_get
 
 
@@ -37,3 +49,171 @@ def test_scrape_job_description_request_exception(mock_requests_get):
     result = scrape_job_description("http://example.com")
 
     assert result is None
+
+
+class _JobBoardHandler(BaseHTTPRequestHandler):
+    state = {"active": 0, "peak": 0, "flaky_calls": 0, "etag_calls": 0, "not_modified": 0}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send_html(self, status, body):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        with self.lock:
+            self.state["active"] += 1
+            self.state["peak"] = max(self.state["peak"], self.state["active"])
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(1.0)
+                self._send_html(200, "<html><body>lambat</body></html>")
+            elif self.path.startswith("/etag"):
+                with self.lock:
+                    self.state["etag_calls"] += 1
+                if self.headers.get("If-None-Match") == '"v1"':
+                    with self.lock:
+                        self.state["not_modified"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", '"v1"')
+                    self.end_headers()
+                else:
+                    payload = b'<div class="job-description">Versi 1</div>'
+                    self.send_response(200)
+                    self.send_header("ETag", '"v1"')
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+            elif self.path.startswith("/flaky"):
+                with self.lock:
+                    self.state["flaky_calls"] += 1
+                    calls = self.state["flaky_calls"]
+                if calls == 1:
+                    self._send_html(503, "sibuk")
+                else:
+                    self._send_html(200, '<div class="job-description">Pulih</div>')
+            elif self.path.startswith("/throttled"):
+                with self.lock:
+                    self.state["flaky_calls"] += 1
+                    calls = self.state["flaky_calls"]
+                if calls == 1:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "3600")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                else:
+                    self._send_html(200, '<div class="job-description">Dilayani</div>')
+            else:
+                time.sleep(0.05)
+                self._send_html(
+                    200, f'<div class="job-description">Lowongan {self.path}</div>'
+                )
+        finally:
+            with self.lock:
+                self.state["active"] -= 1
+
+
+@pytest.fixture
+def job_board():
+    _JobBoardHandler.state.update(
+        active=0, peak=0, flaky_calls=0, etag_calls=0, not_modified=0
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _JobBoardHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", _JobBoardHandler.state
+    server.shutdown()
+    server.server_close()
+
+
+def test_scrape_many_preserves_order_and_limits_per_host(job_board):
+    base_url, state = job_board
+    urls = [f"{base_url}/job/{i}" for i in range(8)]
+
+    with JobScraper(per_host_limit=2, max_workers=8) as scraper:
+        results = scraper.scrape_many(urls)
+
+    assert results == [f"Lowongan /job/{i}" for i in range(8)]
+    assert state["peak"] <= 2
+
+
+def test_scraper_times_out_on_slow_host(job_board):
+    base_url, _ = job_board
+
+    with JobScraper(timeout=(1.0, 0.2), max_retries=0) as scraper:
+        started = time.perf_counter()
+        result = scraper.scrape(f"{base_url}/slow")
+
+    assert result is None
+    assert time.perf_counter() - started < 1.0
+
+
+def test_scraper_retries_transient_errors(job_board):
+    base_url, state = job_board
+
+    with JobScraper(max_retries=2, backoff_factor=0) as scraper:
+        result = scraper.scrape(f"{base_url}/flaky")
+
+    assert result == "Pulih"
+    assert state["flaky_calls"] == 2
+
+
+def test_scraper_caps_retry_after_wait(job_board):
+    base_url, state = job_board
+
+    with patch("src.job_parser.MAX_RETRY_WAIT_S", 0.2), JobScraper(max_retries=2) as scraper:
+        started = time.perf_counter()
+        result = scraper.scrape(f"{base_url}/throttled")
+
+    assert result == "Dilayani"
+    assert state["flaky_calls"] == 2
+    assert time.perf_counter() - started < 2.0
+
+
+def test_page_cache_serves_fresh_pages_without_network(job_board, tmp_path):
+    base_url, state = job_board
+    cache = PageCache(str(tmp_path / "pages.db"), ttl_s=3600)
+
+    with JobScraper(cache=cache) as scraper:
+        first = scraper.scrape(f"{base_url}/etag")
+        second = scraper.scrape(f"{base_url}/etag")
+
+    assert first == second == "Versi 1"
+    assert state["etag_calls"] == 1
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_page_cache_revalidates_stale_pages_with_etag(job_board, tmp_path):
+    base_url, state = job_board
+    cache = PageCache(str(tmp_path / "pages.db"), ttl_s=0)
+
+    with JobScraper(cache=cache) as scraper:
+        first = scraper.scrape(f"{base_url}/etag")
+        second = scraper.scrape(f"{base_url}/etag")
+
+    assert first == second == "Versi 1"
+    assert state["etag_calls"] == 2
+    assert state["not_modified"] == 1
+    assert cache.revalidated == 1
+
+
+def test_revalidated_page_is_extracted_again_from_stored_body(job_board, tmp_path):
+    base_url, state = job_board
+    cache = PageCache(str(tmp_path / "pages.db"), ttl_s=0)
+    url = f"{base_url}/etag"
+
+    with JobScraper(cache=cache) as scraper:
+        assert scraper.scrape(url) == "Versi 1"
+        # Ekstraktor diperbaiki setelah halaman di-cache; respons 304 tetap memakai hasil baru
+        with patch("src.job_parser.extract_job_description", return_value="Versi 1 (diperbaiki)") as extract:
+            assert scraper.scrape(url) == "Versi 1 (diperbaiki)"
+
+    assert state["not_modified"] == 1
+    assert extract.call_args.args == ('<div class="job-description">Versi 1</div>', url)
+    assert cache.get(url).description == "Versi 1 (diperbaiki)"
@@ -0,0 +1,102 @@
+import csv
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.job_pipeline import (
+    JobPosting,
+    load_postings,
+    normalize_postings,
+    rank_postings,
+    run_pipeline,
+)
+
+CV = "Desain grafis: poster, banner, Instagram, Adobe Photoshop, Illustrator, CorelDRAW."
+
+
+@pytest.fixture
+def sample_config():
+    return {
+        "nama": "John Doe",
+        "email": "john.doe@example.com",
+        "telepon": "1234567890",
+        "keahlian": {"teknis": ["Canva"], "non_teknis": ["Komunikasi"]},
+    }
+
+
+def test_load_postings_formats(tmp_path):
+    urls = tmp_path / "urls.txt"
+    urls.write_text("# komentar\nhttps://a.example/job/1\n\nhttps://b.example/job/2\n")
+    feed = tmp_path / "feed.json"
+    feed.write_text(json.dumps({"jobs": [{"title": "Designer", "company": "Acme", "description": "Desain"}]}))
+    page = tmp_path / "job.html"
+    page.write_text("<html><head><title>Admin</title></head><body><p>Input data</p></body></html>")
+
+    assert [p.url for p in load_postings(str(urls))] == ["https://a.example/job/1", "https://b.example/job/2"]
+    assert load_postings(str(feed))[0].perusahaan == "Acme"
+    html_posting = load_postings(str(page))[0]
+    assert (html_posting.posisi, html_posting.description) == ("Admin", "Input data")
+
+
+def test_normalize_postings_dedupes_and_fills_defaults():
+    postings = normalize_postings(
+        [
+            JobPosting(url="https://jobs.example.com/1", description="  Desain \n grafis "),
+            JobPosting(url="https://jobs.example.com/1", description="duplikat"),
+        ]
+    )
+
+    assert len(postings) == 1
+    assert postings[0].description == "Desain grafis"
+    assert postings[0].perusahaan == "jobs.example.com"
+    assert postings[0].posisi == "Lowongan"
+
+
+def test_rank_postings_orders_by_local_score(sample_config):
+    postings = [
+        JobPosting(url="1", description="Akuntan pajak, SAP, audit internal."),
+        JobPosting(url="2", description="Desainer grafis, Photoshop, Illustrator, poster."),
+        JobPosting(url="3", error="Gagal"),
+    ]
+
+    ranked = rank_postings(postings, CV, sample_config)
+
+    assert [p.url for p in ranked] == ["2", "1", "3"]
+    assert ranked[0].score > ranked[1].score
+
+
+def test_run_pipeline_only_generates_top_n(tmp_path, sample_config):
+    feed = tmp_path / "feed.jsonl"
+    feed.write_text(
+        "\n".join(
+            json.dumps(record)
+            for record in [
+                {"posisi": "Akuntan", "perusahaan": "A", "job_desc": "Akuntan pajak SAP audit."},
+                {"posisi": "Desainer", "perusahaan": "B", "job_desc": "Desainer grafis Photoshop poster."},
+                {"posisi": "Ilustrator", "perusahaan": "C", "job_desc": "Illustrator CorelDRAW banner."},
+                {"posisi": "Scraped", "perusahaan": "D", "job_url": "https://d.example/job"},
+            ]
+        )
+    )
+    report_path = tmp_path / "report.csv"
+    letters_path = tmp_path / "letters.jsonl"
+
+    with patch(
+        "src.job_pipeline.scrape_many", return_value=["Kasir minimarket."]
+    ) as mock_scrape, patch(
+        "src.batch_generator.generate_cover_letter",
+        return_value={"cover_letter": "Surat", "match_score": 50},
+    ) as mock_generate:
+        batch_report = run_pipeline(
+            [str(feed)], sample_config, CV, 2, str(report_path), str(letters_path)
+        )
+
+    mock_scrape.assert_called_once_with(["https://d.example/job"], 8)
+    assert mock_generate.call_count == 2
+    assert batch_report.succeeded == 2
+    with open(report_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 4
+    assert {row["perusahaan"] for row in rows if row["surat_dibuat"] == "ya"} == {"B", "C"}
+    assert [int(row["rank"]) for row in rows] == [1, 2, 3, 4]
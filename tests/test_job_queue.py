@@ -0,0 +1,284 @@
+import sqlite3
+import threading
+import time
+
+from src import job_queue as job_queue_module
+from src.job_queue import (
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JobQueue,
+)
+
+
+def _queue(tmp_path, **kwargs):
+    kwargs.setdefault("poll_interval_s", 0.05)
+    return JobQueue(path=str(tmp_path / "jobs.db"), **kwargs)
+
+
+def _wait_for(queue, job_id, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if condition(job):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Pekerjaan #{job_id} tidak mencapai kondisi yang diharapkan: {queue.get(job_id)}")
+
+
+def test_process_pending_stores_result(tmp_path):
+    queue = _queue(tmp_path)
+    queue.register("double", lambda payload, ctx: {"value": payload["n"] * 2})
+    job_id = queue.submit("double", {"n": 21})
+
+    assert queue.get(job_id).status == JOB_QUEUED
+    assert queue.process_pending() == 1
+    job = queue.get(job_id)
+    assert job.status == JOB_SUCCEEDED
+    assert job.result == {"value": 42}
+    assert job.progress == 1.0 and job.attempts == 1 and job.finished_at is not None
+    queue.close()
+
+
+def test_handler_error_marks_job_failed(tmp_path):
+    queue = _queue(tmp_path)
+
+    def explode(payload, ctx):
+        ctx.progress(0.4, "Setengah jalan")
+        raise ValueError("rusak")
+
+    queue.register("explode", explode)
+    queue.register("not_json", lambda payload, ctx: {"value": object()})
+    failed_id = queue.submit("explode", {})
+    not_json_id = queue.submit("not_json", {})
+    queue.process_pending()
+
+    failed = queue.get(failed_id)
+    assert failed.status == JOB_FAILED
+    assert failed.error == "ValueError: rusak"
+    assert failed.progress == 0.4
+    assert queue.get(not_json_id).status == JOB_FAILED
+    queue.close()
+
+
+def test_worker_reports_progress_and_partial_result(tmp_path):
+    queue = _queue(tmp_path)
+    release = threading.Event()
+
+    def slow(payload, ctx):
+        ctx.progress(0.5, "Menulis...", partial="Yth. HRD")
+        release.wait(5)
+        return {"text": "Yth. HRD, selesai"}
+
+    queue.register("slow", slow)
+    queue.start()
+    job_id = queue.submit("slow", {})
+
+    running = _wait_for(queue, job_id, lambda job: job.partial == "Yth. HRD")
+    assert running.status == JOB_RUNNING
+    assert running.progress == 0.5 and running.message == "Menulis..."
+    release.set()
+    done = _wait_for(queue, job_id, lambda job: job.finished)
+    assert done.result == {"text": "Yth. HRD, selesai"}
+    assert done.partial is None
+    queue.close()
+
+
+def test_workers_run_jobs_in_parallel(tmp_path):
+    queue = _queue(tmp_path, workers=3)
+    barrier = threading.Barrier(3, timeout=5)
+    queue.register("wait", lambda payload, ctx: {"party": barrier.wait()})
+    queue.start()
+    ids = [queue.submit("wait", {}) for _ in range(3)]
+
+    # Barrier hanya terlewati bila ketiga pekerjaan berjalan bersamaan
+    results = [_wait_for(queue, job_id, lambda job: job.finished) for job_id in ids]
+    assert [job.status for job in results] == [JOB_SUCCEEDED] * 3
+    queue.close()
+
+
+def test_stale_running_jobs_are_requeued_after_restart(tmp_path):
+    queue = _queue(tmp_path)
+    queue.register("work", lambda payload, ctx: {"ok": True})
+    job_id = queue.submit("work", {})
+    # Pekerjaan diambil worker lalu proses berhenti sebelum selesai
+    assert queue._claim().id == job_id
+    queue.close()
+
+    # Heartbeat masih baru: proses lain mungkin masih menjalankannya, jadi tidak diulang
+    other = _queue(tmp_path)
+    assert other.get(job_id).status == JOB_RUNNING
+    other.close()
+
+    restarted = _queue(tmp_path, stale_after_s=0)
+    assert restarted.get(job_id).status == JOB_QUEUED
+    restarted.register("work", lambda payload, ctx: {"ok": True})
+    restarted.process_pending()
+    job = restarted.get(job_id)
+    assert job.status == JOB_SUCCEEDED and job.attempts == 2
+    restarted.close()
+
+
+def test_processes_sharing_a_database_never_claim_the_same_job(tmp_path, monkeypatch):
+    first, second = _queue(tmp_path), _queue(tmp_path)
+    for queue in (first, second):
+        queue.register("work", lambda payload, ctx: {})
+    job_id = first.submit("work", {})
+    claimed = first._claim()
+
+    assert claimed.id == job_id
+    assert second._claim() is None
+    assert second.get(job_id).status == JOB_RUNNING
+
+    # Proses lain mengambil baris di antara SELECT dan UPDATE: baris itu dilewati
+    raced_id = first.submit("work", {})
+    next_id = first.submit("work", {})
+    original = job_queue_module._job_from_row
+
+    def race(row):
+        if row[0] == raced_id:
+            with sqlite3.connect(str(tmp_path / "jobs.db")) as conn:
+                conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (JOB_RUNNING, raced_id))
+            conn.close()
+        return original(row)
+
+    monkeypatch.setattr("src.job_queue._job_from_row", race)
+    assert second._claim().id == next_id
+
+    first.close()
+    second.close()
+
+
+def test_heartbeat_keeps_long_jobs_from_being_requeued(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.job_queue.HEARTBEAT_INTERVAL_S", 0.05)
+    queue = _queue(tmp_path)
+    queue.register("work", lambda payload, ctx: {})
+    job_id = queue.submit("work", {})
+    queue._claim()
+    time.sleep(0.3)
+
+    # started_at sudah lewat batas, tetapi heartbeat dari proses pemilik masih baru
+    watcher = _queue(tmp_path, stale_after_s=0.2)
+    watcher.register("work", lambda payload, ctx: {})
+    assert watcher._claim() is None
+    assert watcher.get(job_id).status == JOB_RUNNING
+    watcher.close()
+    queue.close()
+
+
+def test_only_registered_kinds_are_claimed(tmp_path):
+    queue = _queue(tmp_path)
+    unknown_id = queue.submit("unknown", {})
+    queue.register("known", lambda payload, ctx: {})
+    known_id = queue.submit("known", {})
+
+    assert queue.process_pending() == 1
+    assert queue.get(unknown_id).status == JOB_QUEUED
+    assert queue.get(known_id).status == JOB_SUCCEEDED
+    queue.close()
+
+
+def test_cancel_only_affects_queued_jobs(tmp_path):
+    queue = _queue(tmp_path)
+    queue.register("work", lambda payload, ctx: {})
+    job_id = queue.submit("work", {})
+
+    assert queue.cancel(job_id)
+    assert queue.process_pending() == 0
+    assert queue.get(job_id).status == JOB_CANCELLED
+    assert not queue.cancel(job_id)
+    queue.close()
+
+
+def test_counts_recent_and_purge(tmp_path):
+    queue = _queue(tmp_path)
+    queue.register("work", lambda payload, ctx: {})
+    ids = [queue.submit("work", {"i": i}) for i in range(3)]
+    queue.process_pending(limit=2)
+
+    assert queue.counts() == {JOB_SUCCEEDED: 2, JOB_QUEUED: 1}
+    assert [job.id for job in queue.recent(2)] == ids[::-1][:2]
+    assert queue.recent(1)[0].payload == {"i": 2}
+    assert queue.purge(max_age_s=0) == 2
+    assert queue.counts() == {JOB_QUEUED: 1}
+    queue.close()
+
+
+def test_jobs_are_only_visible_to_their_owner(tmp_path):
+    queue = _queue(tmp_path)
+    queue.register("work", lambda payload, ctx: {"secret": payload["cv"]})
+    mine = queue.submit("work", {"cv": "CV saya"}, owner="sesi-a")
+    theirs = queue.submit("work", {"cv": "CV orang lain"}, owner="sesi-b")
+    queue.process_pending()
+
+    assert queue.get(mine, owner="sesi-a").result == {"secret": "CV saya"}
+    assert queue.get(theirs, owner="sesi-a") is None
+    assert [job.id for job in queue.recent(5, owner="sesi-a")] == [mine]
+    assert queue.counts(owner="sesi-b") == {JOB_SUCCEEDED: 1}
+    assert queue.get(theirs).owner == "sesi-b"
+    queued = queue.submit("unknown", {}, owner="sesi-b")
+    assert not queue.cancel(queued, owner="sesi-a")
+    assert [job.id for job in queue.pending()] == [queued]
+    queue.close()
+
+
+def test_resume_token_moves_job_to_new_session_once(tmp_path, monkeypatch):
+    queue = _queue(tmp_path)
+    job_id = queue.submit("work", {"cv": "CV saya"}, owner="sesi-a")
+    assert queue.issue_resume_token(job_id, "sesi-b") is None
+    token = queue.issue_resume_token(job_id, "sesi-a")
+
+    assert not queue.resume(job_id, "salah", "sesi-c")
+    assert queue.resume(job_id, token, "sesi-c")
+    assert queue.get(job_id, owner="sesi-c") is not None
+    assert queue.get(job_id, owner="sesi-a") is None
+    # Token sekali pakai: URL yang bocor tidak bisa dipakai lagi
+    assert not queue.resume(job_id, token, "sesi-d")
+
+    token = queue.issue_resume_token(job_id, "sesi-c")
+    queue.revoke_resume_token(job_id, "sesi-c")
+    assert not queue.resume(job_id, token, "sesi-d")
+
+    token = queue.issue_resume_token(job_id, "sesi-c")
+    monkeypatch.setattr(job_queue_module, "RESUME_TOKEN_TTL_S", -1)
+    assert not queue.resume(job_id, token, "sesi-d")
+    queue.close()
+
+
+def test_owner_column_is_added_to_existing_database(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0, message TEXT NOT NULL DEFAULT '', partial TEXT,
+                payload TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL, started_at REAL, finished_at REAL
+            )
+        """)
+        conn.execute(
+            "INSERT INTO jobs (kind, status, payload, created_at) VALUES ('work', 'queued', '{}', 0)"
+        )
+    conn.close()
+
+    queue = JobQueue(path=path)
+    assert queue.get(1).owner is None
+    assert queue.get(queue.submit("work", {}, owner="sesi-a"), owner="sesi-a") is not None
+    queue.close()
+
+
+def test_default_queue_purges_old_jobs_on_startup(tmp_path, monkeypatch):
+    old = _queue(tmp_path)
+    old.register("work", lambda payload, ctx: {})
+    job_id = old.submit("work", {})
+    old.process_pending()
+    old.close()
+
+    monkeypatch.setenv("JOB_QUEUE_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr("src.job_queue._default_queue", None)
+    monkeypatch.setattr("src.job_queue.JOB_RETENTION_S", 0)
+    queue = job_queue_module.get_job_queue()
+    assert queue.get(job_id) is None
+    queue.close()
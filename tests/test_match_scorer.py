@@ -0,0 +1,51 @@
+import time
+
+from src.match_scorer import MatchScorer, score_match, skills_from_config
+
+CV = "Desain grafis di Funcom: poster, banner, feed Instagram dengan Adobe Photoshop dan Illustrator."
+JOB_MATCH = "Dicari desainer grafis. Wajib menguasai Photoshop, Illustrator, dan membuat poster Instagram."
+JOB_OTHER = "Dicari akuntan pajak. Wajib menguasai SAP, laporan keuangan, dan audit internal."
+
+
+def test_score_match_ranks_relevant_job_higher():
+    relevant = score_match(CV, JOB_MATCH)
+    unrelated = score_match(CV, JOB_OTHER)
+
+    assert 0 <= unrelated.score < relevant.score <= 100
+    assert "photoshop" in relevant.matched_keywords
+    assert "sap" in unrelated.missing_keywords
+
+
+def test_score_is_deterministic_and_batch_consistent():
+    scorer = MatchScorer(CV)
+    batch = scorer.score_many([JOB_MATCH, JOB_OTHER])
+
+    assert batch == scorer.score_many([JOB_MATCH, JOB_OTHER])
+    assert [r.score for r in batch] == [r.score for r in scorer.score_many([JOB_MATCH, JOB_OTHER], with_keywords=False)]
+
+
+def test_config_skills_count_as_profile_terms():
+    config = {"keahlian": {"teknis": ["SAP", "Audit Internal"], "non_teknis": []}}
+
+    without_skills = score_match(CV, JOB_OTHER)
+    with_skills = score_match(CV, JOB_OTHER, skills_from_config(config))
+
+    assert with_skills.score > without_skills.score
+    assert {"sap", "audit", "internal"} <= set(with_skills.matched_keywords)
+
+
+def test_empty_inputs():
+    scorer = MatchScorer(None)
+    assert scorer.score_many([]) == []
+    assert scorer.score("").score == 0
+    assert scorer.score(JOB_MATCH).score == 0
+
+
+def test_scores_thousands_of_postings_quickly():
+    jobs = [f"{JOB_MATCH} Lowongan nomor {i} di kota {i % 37}." for i in range(2000)]
+    started = time.perf_counter()
+    results = MatchScorer(CV).score_many(jobs)
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 2000
+    assert elapsed < 2.0
@@ -0,0 +1,49 @@
+import time
+from unittest.mock import patch
+
+from src.page_cache import PageCache
+
+
+def test_put_get_roundtrip_and_conditional_headers(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.db"))
+    cache.put("http://a", "<html>a</html>", "a", etag='"e1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    page = cache.get("http://a")
+
+    assert page.body == "<html>a</html>"
+    assert page.description == "a"
+    assert page.conditional_headers() == {
+        "If-None-Match": '"e1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert cache.get("http://b") is None
+    cache.close()
+
+
+def test_ttl_and_touch(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.db"), ttl_s=60)
+    cache.put("http://a", "body", "desc")
+    page = cache.get("http://a")
+    assert cache.is_fresh(page)
+
+    with patch("src.page_cache.time.time", return_value=time.time() + 120):
+        assert not cache.is_fresh(page)
+        cache.touch("http://a")
+        assert cache.is_fresh(cache.get("http://a"))
+    cache.close()
+
+
+def test_evicts_least_recently_used_pages_over_size_cap(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.db"), max_bytes=5000)
+    body = "".join(chr(0x4E00 + (i * 7919) % 20000) for i in range(1000))  # sulit dikompresi
+
+    cache.put("http://a", body, "a")
+    cache.put("http://b", body[::-1], "b")
+    cache.get("http://a")  # a menjadi yang terakhir diakses
+    cache.put("http://c", body[500:] + body[:500], "c")
+
+    assert cache.total_bytes() <= 5000
+    assert cache.get("http://b") is None
+    assert cache.get("http://a") is not None
+    assert cache.get("http://c") is not None
+    cache.close()
@@ -0,0 +1,18 @@
+import os
+
+from src import ai_service, history_manager
+from src.job_queue import JobQueue
+from src.paths import PROJECT_ROOT, project_path
+
+
+def test_relative_paths_resolve_from_project_root(tmp_path):
+    assert project_path("jobs.db") == os.path.join(PROJECT_ROOT, "jobs.db")
+    assert project_path("data/jobs.db") == os.path.join(PROJECT_ROOT, "data", "jobs.db")
+    assert project_path(str(tmp_path / "jobs.db")) == str(tmp_path / "jobs.db")
+    assert project_path(":memory:") == ":memory:"
+
+
+def test_default_databases_do_not_depend_on_working_directory():
+    assert history_manager.DB_FILE == os.path.join(PROJECT_ROOT, "application_history.db")
+    assert JobQueue().path == os.path.join(PROJECT_ROOT, "jobs.db")
+    assert os.path.isabs(ai_service.response_cache.path)
@@ -0,0 +1,43 @@
+import io
+
+import PyPDF2
+
+from src.pdf_writer import MARGIN, PAGE_WIDTH, render_text_pdf, text_width, wrap_text
+
+
+def _pages(data):
+    return PyPDF2.PdfReader(io.BytesIO(data)).pages
+
+
+def test_render_text_pdf_is_readable_and_deterministic():
+    text = "Dengan hormat,\nSaya (Budi) melamar di PT Maju \\ Jaya.\nSalam, café"
+
+    data = render_text_pdf(text, title="Surat")
+    extracted = _pages(data)[0].extract_text()
+
+    assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+    assert "Saya (Budi) melamar di PT Maju \\ Jaya." in extracted
+    assert "café" in extracted
+    assert render_text_pdf(text, title="Surat") == data
+
+
+def test_long_text_wraps_and_spans_pages():
+    text = "\n".join(f"Paragraf {i}: " + "kata " * 40 for i in range(40))
+
+    pages = _pages(render_text_pdf(text))
+
+    assert len(pages) > 1
+    assert "Paragraf 39" in pages[-1].extract_text()
+
+
+def test_wrap_text_respects_width_and_splits_long_words():
+    max_width = PAGE_WIDTH - 2 * MARGIN
+    lines = wrap_text("a " * 200 + "x" * 300, max_width)
+
+    assert all(text_width(line) <= max_width for line in lines)
+    assert "".join(lines).count("x") == 300
+    assert wrap_text("satu\n\ndua", max_width) == ["satu", "", "dua"]
+
+
+def test_empty_text_still_produces_one_page():
+    assert len(_pages(render_text_pdf(""))) == 1
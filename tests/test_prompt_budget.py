@@ -0,0 +1,64 @@
+from src.prompt_budget import (
+    estimate_tokens,
+    fit_prompt_inputs,
+    split_sections,
+    trim_to_budget,
+)
+
+NAV = "Beranda Lowongan Perusahaan Masuk Daftar Bantuan Kebijakan Privasi Syarat Ketentuan."
+JOB = (
+    "Kami mencari Desainer Grafis yang menguasai Adobe Photoshop dan Illustrator. "
+    "Kandidat akan membuat poster, banner, dan konten Instagram."
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens(None) == 0
+    assert estimate_tokens("abcd" * 10) == 10
+
+
+def test_split_sections_breaks_long_scraped_lines():
+    scraped = " ".join([NAV] * 20 + [JOB])
+    sections = split_sections(scraped, max_section_tokens=40)
+
+    assert len(sections) > 20
+    assert all(section.strip() for section in sections)
+
+
+def test_trim_to_budget_keeps_relevant_sections_in_order():
+    text = "\n\n".join([NAV, JOB, NAV + " Footer © 2024.", "Persyaratan: Illustrator, Canva."])
+    trimmed = trim_to_budget(text, 70, {"illustrator", "photoshop", "canva", "poster"})
+
+    assert estimate_tokens(trimmed) <= 70
+    assert "Adobe Photoshop" in trimmed
+    assert trimmed.index("Adobe Photoshop") < trimmed.index("Persyaratan")
+    assert "Footer" not in trimmed
+
+
+def test_trim_to_budget_uses_custom_counter_once_per_text():
+    calls = []
+
+    def counter(text):
+        calls.append(text)
+        return estimate_tokens(text) * 2
+
+    trim_to_budget("\n\n".join([NAV, JOB] * 5), 100, {"photoshop"}, counter)
+    assert len(calls) == 1
+
+
+def test_fit_prompt_inputs_leaves_small_inputs_untouched(capsys):
+    assert fit_prompt_inputs("CV", "Job", 100) == ("CV", "Job")
+    assert capsys.readouterr().out == ""
+
+
+def test_fit_prompt_inputs_trims_and_logs(capsys):
+    cv = "Pengalaman: Desain Grafis di Funcom dengan Photoshop dan Illustrator."
+    job = "\n\n".join([NAV] * 40 + [JOB])
+
+    trimmed_cv, trimmed_job = fit_prompt_inputs(cv, job, 120, context="Desainer Grafis")
+
+    assert trimmed_cv == cv  # CV pendek tidak dipotong, sisa anggaran untuk deskripsi
+    assert estimate_tokens(trimmed_job) <= 120 - estimate_tokens(cv)
+    assert "Adobe Photoshop" in trimmed_job
+    assert "Anggaran prompt" in capsys.readouterr().out
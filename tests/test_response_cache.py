@@ -0,0 +1,70 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_entries=3, max_age_s=60)
+    yield cache
+    cache.close()
+
+
+def test_make_key_depends_on_model_prompt_and_settings():
+    base = ResponseCache.make_key("model-a", "prompt", {"temperature": 0.5})
+
+    assert base == ResponseCache.make_key("model-a", "prompt", {"temperature": 0.5})
+    assert base != ResponseCache.make_key("model-b", "prompt", {"temperature": 0.5})
+    assert base != ResponseCache.make_key("model-a", "prompt 2", {"temperature": 0.5})
+    assert base != ResponseCache.make_key("model-a", "prompt", {"temperature": 0.9})
+
+
+def test_get_set_and_counters(cache):
+    assert cache.get("k") is None
+    cache.set("k", "nilai")
+
+    assert cache.get("k") == "nilai"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ResponseCache(path)
+    first.set("k", "nilai")
+    first.close()
+
+    second = ResponseCache(path)
+    assert second.get("k") == "nilai"
+    second.close()
+
+
+def test_evicts_least_recently_used_when_full(cache):
+    now = time.time()
+    ticks = [now + i for i in range(5)]
+    with patch("src.response_cache.time.time", side_effect=ticks):
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.set("c", "3")
+        cache.get("a")  # a menjadi yang terbaru diakses
+        cache.set("d", "4")
+
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+
+def test_expired_entries_are_misses(cache):
+    cache.set("k", "nilai")
+    with patch("src.response_cache.time.time", return_value=time.time() + 120):
+        assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_disabled_cache_never_stores():
+    cache = ResponseCache(":memory:", enabled=False)
+    cache.set("k", "nilai")
+    assert cache.get("k") is None
+    assert len(cache) == 0
@@ -0,0 +1,146 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src import history_manager
+from src.cv_cache import CVCache
+from src.pdf_writer import render_text_pdf
+
+pytest.importorskip("fastapi")
+testclient = pytest.importorskip("fastapi.testclient")
+
+from src.service_api import create_app  # noqa: E402
+
+CONFIG = {
+    "nama": "John Doe",
+    "email": "john.doe@example.com",
+    "telepon": "1234567890",
+    "keahlian": {"teknis": ["Python", "SQL"], "non_teknis": ["Komunikasi"]},
+}
+JOB_DESC = "Kami mencari Backend Engineer yang menguasai Python, SQL, dan Docker untuk tim data."
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.cv_cache._default_cache", CVCache(str(tmp_path / "cv.db")))
+    monkeypatch.setenv("ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr("src.artifact_store._default_store", None)
+    with patch("src.history_manager.DB_FILE", str(tmp_path / "history.db")):
+        with testclient.TestClient(create_app(CONFIG, max_concurrency=2)) as test_client:
+            yield test_client
+        history_manager.close_pool()
+
+
+@pytest.fixture
+def fake_letter():
+    letter = AsyncMock(return_value={"cover_letter": "Yth. HRD, saya melamar.", "match_score": 40})
+    with patch("src.service_api.agenerate_cover_letter", letter):
+        yield letter
+
+
+def test_health_and_metrics(client):
+    assert client.get("/health").json()["status"] == "ok"
+    client.get("/history/999/letter")
+
+    metrics = client.get("/metrics").json()
+
+    assert metrics["routes"]["/health"]["requests"] == 1
+    # Dikelompokkan per templat rute, bukan per id
+    assert metrics["routes"]["/history/{application_id}/letter"]["requests"] == 1
+    assert {"response", "cv", "attachments"} <= set(metrics["caches"])
+
+
+def test_cover_letter_scores_locally_and_records_history(client, fake_letter):
+    response = client.post(
+        "/cover-letter",
+        json={"posisi": "Backend Engineer", "perusahaan": "Acme", "job_desc": JOB_DESC, "cv_text": "Python SQL"},
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["cover_letter"] == "Yth. HRD, saya melamar."
+    assert body["match_score"] != 40
+    assert "docker" in body["missing_keywords"]
+    assert body["application_id"] is not None
+
+    letter = client.get(f"/history/{body['application_id']}/letter").json()
+    assert letter["letter_text"] == "Yth. HRD, saya melamar."
+    history = client.get("/history").json()
+    assert history["total"] == 1
+    assert history["entries"][0]["model"]
+
+
+def test_cover_letter_scrapes_url_when_description_missing(client, fake_letter):
+    with patch("src.service_api.scrape_job_description", return_value=JOB_DESC) as scrape:
+        response = client.post(
+            "/cover-letter",
+            json={"posisi": "Dev", "perusahaan": "Acme", "job_url": "https://example.com/job", "save": False},
+        )
+
+    scrape.assert_called_once_with("https://example.com/job")
+    assert fake_letter.call_args.args[5] == JOB_DESC
+    assert response.json()["application_id"] is None
+
+
+def test_cover_letter_batch_reports_each_item(client, fake_letter):
+    items = [
+        {"posisi": "Dev", "perusahaan": "A", "save": False},
+        {"posisi": "Dev", "perusahaan": "B", "cv_digest": "tidak-ada", "save": False},
+    ]
+
+    body = client.post("/cover-letter/batch", json={"items": items}).json()
+
+    assert body["total"] == 2
+    assert body["succeeded"] == 1
+    assert body["results"][0]["perusahaan"] == "A"
+    assert "tidak ditemukan" in body["results"][1]["error"]
+
+
+def test_batch_rejects_empty_request(client):
+    assert client.post("/cover-letter/batch", json={"items": []}).status_code == 422
+
+
+def test_cv_upload_is_reusable_by_digest(client, fake_letter):
+    pdf = render_text_pdf("John Doe\nKETERAMPILAN\nPython, SQL, Docker")
+
+    parsed = client.post("/cv", content=pdf, headers={"Content-Type": "application/pdf"}).json()
+
+    assert "Python" in parsed["text"]
+    client.post(
+        "/cover-letter",
+        json={"posisi": "Dev", "perusahaan": "Acme", "cv_digest": parsed["digest"], "save": False},
+    )
+    assert "Python" in fake_letter.call_args.args[4]
+    assert client.post("/cv", content=b"").status_code == 400
+
+
+def test_email_endpoints(client):
+    with patch("src.service_api.agenerate_thank_you_email", AsyncMock(return_value="Terima kasih")):
+        thanks = client.post("/emails/thank-you", json={"posisi": "Dev", "perusahaan": "Acme"}).json()
+    with patch("src.service_api.agenerate_follow_up_email", AsyncMock(return_value="Tindak lanjut")):
+        follow_up = client.post("/emails/follow-up", json={"posisi": "Dev", "perusahaan": "Acme"}).json()
+
+    assert thanks == {"subject": "Terima Kasih - Dev - John Doe", "body": "Terima kasih"}
+    assert follow_up["body"] == "Tindak lanjut"
+
+
+def test_scrape_batch_keeps_order(client):
+    with patch("src.service_api.scrape_many", return_value=["Satu", None]) as scrape_many:
+        body = client.post("/scrape/batch", json={"urls": ["https://a", "https://b"]}).json()
+
+    scrape_many.assert_called_once_with(["https://a", "https://b"])
+    assert body["results"] == [{"url": "https://a", "job_desc": "Satu"}, {"url": "https://b", "job_desc": None}]
+
+
+def test_history_status_and_analytics(client, fake_letter):
+    application_id = client.post(
+        "/cover-letter", json={"posisi": "Dev", "perusahaan": "Acme", "job_desc": JOB_DESC}
+    ).json()["application_id"]
+
+    assert client.post(f"/history/{application_id}/status", json={"status": "sent"}).status_code == 200
+    assert client.post("/history/999/status", json={"status": "sent"}).status_code == 404
+    analytics = client.get("/history/analytics").json()
+
+    assert analytics["latency"]["count"] == 1
+    assert sum(bucket["count"] for bucket in analytics["score_distribution"]) == 1
+    assert analytics["weekly_usage"][0]["generations"] == 1
@@ -0,0 +1,86 @@
+import gc
+import os
+import time
+
+from src.session_files import SessionFileStore, purge_stale_sessions, session_store
+
+
+def test_sessions_get_isolated_directories(tmp_path):
+    first = SessionFileStore(str(tmp_path))
+    second = SessionFileStore(str(tmp_path))
+
+    path_a = first.path_for("CV Saya.pdf", b"cv pertama")
+    path_b = second.path_for("CV Saya.pdf", b"cv kedua")
+
+    assert path_a != path_b
+    assert first.id != second.id
+    assert os.path.basename(path_a) == "CV_Saya.pdf"
+    with open(path_a, "rb") as f:
+        assert f.read() == b"cv pertama"
+    with open(path_b, "rb") as f:
+        assert f.read() == b"cv kedua"
+    first.cleanup()
+    second.cleanup()
+
+
+def test_path_for_only_rewrites_changed_content(tmp_path):
+    store = SessionFileStore(str(tmp_path))
+    path = store.path_for("cv.pdf", b"isi")
+    mtime = os.stat(path).st_mtime_ns
+
+    assert store.path_for("cv.pdf", b"isi") == path
+    assert os.stat(path).st_mtime_ns == mtime
+
+    store.path_for("cv.pdf", b"isi baru")
+    with open(path, "rb") as f:
+        assert f.read() == b"isi baru"
+    store.cleanup()
+
+
+def test_unsafe_names_stay_inside_session_directory(tmp_path):
+    store = SessionFileStore(str(tmp_path))
+
+    path = store.path_for("../../etc/passwd", b"x")
+
+    assert os.path.dirname(path) == store.directory
+    store.cleanup()
+
+
+def test_cleanup_on_explicit_call_and_garbage_collection(tmp_path):
+    store = SessionFileStore(str(tmp_path))
+    store.path_for("cv.pdf", b"x")
+    directory = store.directory
+
+    store.cleanup()
+    assert store.closed
+    assert not os.path.exists(directory)
+
+    dropped = SessionFileStore(str(tmp_path))
+    directory = dropped.directory
+    del dropped
+    gc.collect()
+    assert not os.path.exists(directory)
+
+
+def test_session_store_reuses_store_per_state(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.session_files.SESSION_ROOT", str(tmp_path))
+    state = {}
+
+    store = session_store(state)
+    assert session_store(state) is store
+    store.cleanup()
+    assert session_store(state) is not store
+    state["session_files"].cleanup()
+
+
+def test_purge_stale_sessions(tmp_path):
+    old = tmp_path / "session_old"
+    old.mkdir()
+    fresh = tmp_path / "session_fresh"
+    fresh.mkdir()
+    past = time.time() - 3600
+    os.utime(old, (past, past))
+
+    assert purge_stale_sessions(str(tmp_path), max_age_s=60) == 1
+    assert not old.exists()
+    assert fresh.exists()
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from src.stream_parser import CoverLetterStreamParser
+
+
+def feed_in_chunks(text, size):
+    parser = CoverLetterStreamParser()
+    snapshots = []
+    for start in range(0, len(text), size):
+        parser.feed(text[start : start + size])
+        snapshots.append(parser.letter)
+    return parser, snapshots
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 50])
+def test_letter_is_decoded_incrementally(chunk_size):
+    letter = 'Yth. HRD,\n\nSaya "Dina" \\ melamar é \U0001F600 posisi ini.'
+    payload = "```json\n" + json.dumps(
+        {"cover_letter": letter, "match_score": 85}
+    ) + "\n```"
+
+    parser, snapshots = feed_in_chunks(payload, chunk_size)
+
+    assert parser.letter == letter
+    assert parser.letter_complete
+    assert parser.match_score == 85
+    # Teks parsial selalu merupakan awalan dari surat akhir
+    assert all(letter.startswith(snapshot) for snapshot in snapshots)
+    assert parser.result() == {"cover_letter": letter, "match_score": 85}
+
+
+def test_match_score_only_reported_when_complete():
+    parser = CoverLetterStreamParser()
+    parser.feed('{"match_score": 8')
+    assert parser.match_score is None
+    parser.feed('5, "cover_letter": "Halo')
+    assert parser.match_score == 85
+    assert parser.letter == "Halo"
+    assert not parser.letter_complete
+
+
+def test_plain_text_response_is_shown_as_letter():
+    parser = CoverLetterStreamParser()
+    parser.feed("Yth. Bapak/Ibu HRD, ")
+    parser.feed("saya melamar.")
+
+    assert parser.letter == "Yth. Bapak/Ibu HRD, saya melamar."
+    assert parser.result() == {
+        "cover_letter": "Yth. Bapak/Ibu HRD, saya melamar.",
+        "match_score": 0,
+    }
+
+
+def test_truncated_json_raises_on_result():
+    parser = CoverLetterStreamParser()
+    parser.feed('{"cover_letter": "Surat yang terpot')
+
+    with pytest.raises(ValueError):
+        parser.result()
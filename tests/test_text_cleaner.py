@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.text_cleaner import (
+    TextBlock,
+    clean_text,
+    extract_blocks,
+    select_content_blocks,
+    strip_boilerplate,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "job_pages")
+with open(os.path.join(FIXTURES_DIR, "expected.json"), "r", encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", ["company_page.html", "startup_page.html", "linkedin.html", "jobstreet.html"])
+def test_strip_boilerplate_keeps_description_and_drops_noise(name):
+    text = strip_boilerplate(_load(name))
+
+    for phrase in EXPECTED[name]["phrases"]:
+        assert phrase in text
+    for noise in EXPECTED[name]["noise"]:
+        assert noise not in text
+
+
+def test_strip_boilerplate_is_much_shorter_than_body_text():
+    html = _load("company_page.html")
+    body_text = BeautifulSoup(html, "html.parser").body.get_text(separator=" ", strip=True)
+
+    assert len(strip_boilerplate(html)) < len(body_text) * 0.7
+
+
+def test_link_heavy_blocks_are_dropped_and_headings_follow_content():
+    html = """
+    <body>
+      <div><a href="/a">Beranda</a> <a href="/b">Lowongan</a> <a href="/c">Kontak</a></div>
+      <h2>Tanggung Jawab</h2>
+      <p>Mengembangkan fitur baru untuk aplikasi internal perusahaan kami.</p>
+      <h3>Lowongan lain</h3>
+      <ul><li><a href="/1">Analis Data</a></li><li><a href="/2">Desainer</a></li></ul>
+    </body>
+    """
+
+    assert strip_boilerplate(html) == (
+        "Tanggung Jawab\nMengembangkan fitur baru untuk aplikasi internal perusahaan kami."
+    )
+
+
+def test_short_page_keeps_non_link_text():
+    assert strip_boilerplate("<html><body><p>This is the body</p></body></html>") == "This is the body"
+
+
+def test_block_link_density():
+    blocks = extract_blocks('<p>Lihat <a href="/x">tautan ini</a></p>')
+
+    assert [block.text for block in blocks] == ["Lihat tautan ini"]
+    assert blocks[0].link_density == pytest.approx(len("tautan ini") / len("Lihat tautan ini"))
+
+
+def test_select_content_blocks_without_good_blocks_drops_only_links():
+    blocks = [
+        TextBlock(tag="p", parts=["Judul"]),
+        TextBlock(tag="a", parts=["Menu"], link_chars=4),
+    ]
+
+    assert [block.text for block in select_content_blocks(blocks)] == ["Judul"]
+
+
+def test_clean_text_collapses_repeated_lines_and_whitespace():
+    text = "Lamar sekarang\n\n  Deskripsi   pekerjaan utama \nlamar SEKARANG\nDeskripsi pekerjaan utama"
+
+    assert clean_text(text) == "Lamar sekarang\nDeskripsi pekerjaan utama"
+    assert clean_text(None) == ""